@@ -1,13 +1,33 @@
 """
 Authentication utilities – JWT creation, password hashing, token verification.
+
+bcrypt is deliberately CPU-heavy, so request handlers use the *_async helpers,
+which run it on a dedicated, size-limited executor (a process pool by default,
+escaping the GIL) instead of the shared request threadpool.
 """
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, Tuple
 import jwt
 from passlib.context import CryptContext
-from config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from config import (
+    SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES,
+    BCRYPT_ROUNDS, PASSWORD_HASH_EXECUTOR, PASSWORD_HASH_WORKERS,
+)
+
+# Pinning min/max to the configured cost makes any hash with a different cost
+# "need update", which drives rehash-on-login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+_hash_executor: Optional[Executor] = None
 
 
 def hash_password(password: str) -> str:
@@ -20,6 +40,52 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and, if the stored hash uses an outdated cost,
+    return a fresh hash to persist. Returns (valid, new_hash_or_None).
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def _get_hash_executor() -> Executor:
+    global _hash_executor
+    if _hash_executor is None:
+        if PASSWORD_HASH_EXECUTOR == "process":
+            # spawn, not fork: the server process is multi-threaded
+            _hash_executor = ProcessPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        else:
+            _hash_executor = ThreadPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash",
+            )
+    return _hash_executor
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password() on the dedicated hashing executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_hash_executor(), hash_password, password)
+
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """verify_and_update_password() on the dedicated hashing executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_hash_executor(), verify_and_update_password, plain_password, hashed_password,
+    )
+
+
+def shutdown_hash_executor():
+    """Stop hashing workers (called on application shutdown)."""
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=True, cancel_futures=True)
+        _hash_executor = None
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT token embedding user data (sub=email, role, user_id).
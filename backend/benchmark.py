@@ -0,0 +1,581 @@
+"""
+Endpoint benchmark with deterministic synthetic datasets.
+
+Generates a dataset of the requested scale in a separate SQLite database
+(bulk executemany inserts, then the monthly rollup and driver counters are
+rebuilt), starts the app in-process and drives every router over ASGI:
+reads first (lists, details, dashboard, finance analytics, audit), then
+writes (trip lifecycle, fuel/expense/maintenance entries, fleet edits).
+
+The report is JSON: per endpoint p50/p95/p99/mean/max latency in ms,
+requests, errors and SQL statements per request, plus peak RSS. The same
+--seed, scale and --end-date always produce the same dataset. It is kept
+as a snapshot and every run works on a fresh copy, so runs stay comparable;
+it is regenerated when the parameters change or with --regenerate.
+
+Usage:
+    python benchmark.py --scale small --output bench.json
+    python benchmark.py --trips 5000000 --vehicles 10000 --drivers 2000 --iterations 50
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import date, datetime, time as dt_time, timedelta, timezone
+
+SCALES = {
+    "small": dict(vehicles=500, drivers=100, trips=50_000, fuel_logs=25_000, expenses=10_000, maintenance=1_000),
+    "medium": dict(vehicles=2_000, drivers=500, trips=500_000, fuel_logs=250_000, expenses=100_000, maintenance=5_000),
+    "large": dict(vehicles=10_000, drivers=2_000, trips=5_000_000, fuel_logs=2_500_000, expenses=1_000_000,
+                  maintenance=20_000),
+}
+REGIONS = ["North", "South", "East", "West", "Central"]
+VEHICLE_TYPES = [("Truck", 8_000, 25_000, 40), ("Van", 1_000, 3_500, 45), ("Bike", 20, 60, 15)]
+EXPENSE_CATEGORIES = ["Tolls", "Parking", "Insurance", "Repairs", "Permits"]
+USERS = [
+    ("fleet@demo.com", "Alex Fleet Manager", "fleet_manager"),
+    ("dispatch@demo.com", "Jordan Dispatcher", "dispatcher"),
+    ("safety@demo.com", "Sam Safety Officer", "safety_officer"),
+    ("finance@demo.com", "Taylor Financial Analyst", "financial_analyst"),
+]
+PASSWORD = "password123"
+INSERT_CHUNK = 20_000
+
+log = logging.getLogger("fleet.benchmark")
+
+
+# ── Dataset generation ─────────────────────────────────────────
+
+def _insert(conn, table, rows):
+    """Bulk insert an iterable of row dicts in executemany chunks."""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= INSERT_CHUNK:
+            conn.execute(table.insert(), chunk)
+            chunk = []
+    if chunk:
+        conn.execute(table.insert(), chunk)
+
+
+def _vehicle_rows(rng, n):
+    weights = [t[3] for t in VEHICLE_TYPES]
+    for i in range(1, n + 1):
+        vtype, low, high, _ = rng.choices(VEHICLE_TYPES, weights)[0]
+        yield {
+            "id": i, "name": f"Vehicle {i}", "model": f"{vtype} Model {rng.randrange(20)}",
+            "license_plate": f"BEN-{i:07d}", "max_capacity": float(rng.randint(low, high)),
+            "odometer": round(rng.uniform(0, 300_000), 1), "vehicle_type": vtype,
+            "acquisition_cost": float(rng.randint(5_000, 150_000)),
+            "status": rng.choices(["Available", "In Shop", "Retired"], [85, 8, 7])[0],
+            "region": rng.choice(REGIONS),
+        }
+
+
+def _driver_rows(rng, n, end):
+    for i in range(1, n + 1):
+        expired = rng.random() < 0.05
+        yield {
+            "id": i, "full_name": f"Driver {i}", "license_number": f"BDL-{i:07d}",
+            "license_expiry": end - timedelta(days=rng.randint(1, 700)) if expired
+            else end + timedelta(days=rng.randint(30, 1_500)),
+            "phone": f"+1-555-{i:07d}", "safety_score": round(rng.uniform(60, 100), 1),
+            "complaints": rng.randint(0, 5),
+            "status": rng.choices(["On Duty", "Off Duty", "Suspended"], [80, 15, 5])[0],
+        }
+
+
+def _moment(rng, end, days):
+    """Random UTC datetime within the `days` days before the end date."""
+    start = datetime.combine(end, dt_time.min, tzinfo=timezone.utc) - timedelta(days=days)
+    return start + timedelta(seconds=rng.randrange(days * 86_400))
+
+
+def _trip_rows(rng, n, capacities, n_drivers, end, days):
+    n_vehicles = len(capacities)
+    for _ in range(n):
+        v = rng.randrange(n_vehicles)
+        created = _moment(rng, end, days)
+        status = rng.choices(["Completed", "Cancelled", "Draft"], [85, 10, 5])[0]
+        distance = round(rng.uniform(20, 1_500), 1) if status == "Completed" else 0.0
+        yield {
+            "vehicle_id": v + 1, "driver_id": rng.randrange(n_drivers) + 1,
+            "cargo_weight": round(capacities[v] * rng.uniform(0.1, 1.0), 1),
+            "origin": f"Hub {rng.randrange(50)}", "destination": f"Hub {rng.randrange(50)}",
+            "distance": distance, "estimated_fuel_cost": round(distance * 0.3, 2),
+            "revenue": round(distance * rng.uniform(1.5, 4.0), 2), "status": status,
+            "scheduled_date": created.date(),
+            "completed_date": created + timedelta(hours=rng.randint(1, 48)) if status == "Completed" else None,
+            "created_at": created,
+        }
+
+
+def _fuel_rows(rng, n, n_vehicles, end, days):
+    for _ in range(n):
+        liters = round(rng.uniform(20, 400), 1)
+        moment = _moment(rng, end, days)
+        yield {
+            "vehicle_id": rng.randrange(n_vehicles) + 1, "trip_id": None, "date": moment.date(),
+            "liters": liters, "cost": round(liters * rng.uniform(1.2, 1.9), 2),
+            "odometer_reading": round(rng.uniform(0, 300_000), 1), "created_at": moment,
+        }
+
+
+def _expense_rows(rng, n, n_vehicles, end, days):
+    for _ in range(n):
+        moment = _moment(rng, end, days)
+        yield {
+            "vehicle_id": rng.randrange(n_vehicles) + 1, "trip_id": None,
+            "category": rng.choice(EXPENSE_CATEGORIES), "description": None,
+            "amount": round(rng.uniform(5, 800), 2), "date": moment.date(), "created_at": moment,
+        }
+
+
+def _maintenance_rows(rng, n, in_shop, n_vehicles, end, days):
+    for _ in range(n):
+        moment = _moment(rng, end, days)
+        yield {
+            "vehicle_id": rng.randrange(n_vehicles) + 1, "issue": "Scheduled service", "description": None,
+            "date": moment.date(), "cost": round(rng.uniform(50, 5_000), 2), "status": "Resolved",
+            "created_at": moment,
+        }
+    for vehicle_id in in_shop:  # every In Shop vehicle has an open log, as the API would leave it
+        moment = _moment(rng, end, 14)
+        yield {
+            "vehicle_id": vehicle_id, "issue": "Brake inspection", "description": None, "date": moment.date(),
+            "cost": round(rng.uniform(50, 5_000), 2), "status": "Open", "created_at": moment,
+        }
+
+
+def generate_dataset(params: dict) -> dict:
+    """Build the dataset described by `params` into the configured (empty) database."""
+    from sqlalchemy import select, func
+    from database import engine, SessionLocal, Base
+    from auth import hash_password
+    from migrations import run_migrations
+    from models.user import User
+    from models.vehicle import Vehicle
+    from models.driver import Driver
+    from models.trip import Trip
+    from models.maintenance import MaintenanceLog
+    from models.fuel_log import FuelLog
+    from models.expense import Expense
+    from models.audit_log import AuditLog
+    from models.monthly_rollup import MonthlyRollup
+    from services.rollup_service import rebuild_monthly_rollup
+    from services.driver_service import recompute_all_driver_stats
+
+    rng = random.Random(params["seed"])
+    end, days = date.fromisoformat(params["end_date"]), params["days"]
+    Base.metadata.create_all(bind=engine)
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        hashed = hash_password(PASSWORD)
+        _insert(conn, User.__table__, (
+            {"email": email, "hashed_password": hashed, "full_name": name, "role": role, "is_active": True}
+            for email, name, role in USERS
+        ))
+        vehicles = list(_vehicle_rows(rng, params["vehicles"]))
+        _insert(conn, Vehicle.__table__, vehicles)
+        _insert(conn, Driver.__table__, _driver_rows(rng, params["drivers"], end))
+    capacities = [v["max_capacity"] for v in vehicles]
+    in_shop = [v["id"] for v in vehicles if v["status"] == "In Shop"]
+    del vehicles
+
+    for label, table, rows in (
+        ("trips", Trip.__table__, _trip_rows(rng, params["trips"], capacities, params["drivers"], end, days)),
+        ("fuel_logs", FuelLog.__table__, _fuel_rows(rng, params["fuel_logs"], len(capacities), end, days)),
+        ("expenses", Expense.__table__, _expense_rows(rng, params["expenses"], len(capacities), end, days)),
+        ("maintenance_logs", MaintenanceLog.__table__,
+         _maintenance_rows(rng, params["maintenance"], in_shop, len(capacities), end, days)),
+    ):
+        t0 = time.perf_counter()
+        with engine.begin() as conn:
+            _insert(conn, table, rows)
+        log.warning("Inserted %s in %.1fs", label, time.perf_counter() - t0)
+
+    db = SessionLocal()
+    try:
+        rebuild_monthly_rollup(db)
+        recompute_all_driver_stats(db)
+        db.commit()
+    finally:
+        db.close()
+    run_migrations(engine)
+
+    with engine.connect() as conn:
+        counts = {
+            model.__tablename__: conn.execute(select(func.count()).select_from(model)).scalar()
+            for model in (Vehicle, Driver, Trip, FuelLog, Expense, MaintenanceLog, MonthlyRollup)
+        }
+    return {"counts": counts, "generation_seconds": round(time.perf_counter() - started, 1)}
+
+
+def _remove_database(path: str):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def prepare_dataset(params: dict, snapshot_path: str, work_path: str, regenerate: bool) -> dict:
+    """
+    Leave a fresh copy of the dataset at `work_path` (the configured database).
+    The pristine dataset is kept at `snapshot_path` and reused while its
+    parameters match, so the write phase of one run never leaks into the next.
+    """
+    meta_path = snapshot_path + ".json"
+    os.makedirs(os.path.dirname(os.path.abspath(snapshot_path)), exist_ok=True)
+    _remove_database(work_path)
+    if not regenerate and os.path.exists(snapshot_path) and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get("params") == params:
+            log.warning("Reusing dataset %s", snapshot_path)
+            shutil.copyfile(snapshot_path, work_path)
+            return {**meta, "reused": True}
+    _remove_database(snapshot_path)
+
+    log.warning("Generating dataset %s: %s", snapshot_path, params)
+    meta = {"params": params, **generate_dataset(params)}
+    from database import engine
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+    engine.dispose()
+    shutil.copyfile(work_path, snapshot_path)
+    with open(meta_path, "w") as f:
+        json.dump(meta, f, indent=2)
+    return {**meta, "reused": False}
+
+
+# ── Measurement ────────────────────────────────────────────────
+
+def _percentile(ordered: list, pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class Recorder:
+    """Sends requests through the ASGI client and records latency and SQL statements per endpoint."""
+
+    def __init__(self, client, tokens: dict):
+        self.client = client
+        self.tokens = tokens
+        self.record = True
+        self.queries = 0
+        self.results = {}
+
+    def count_query(self, *args):
+        self.queries += 1
+
+    async def call(self, name: str, role: str, method: str, path: str, **kwargs):
+        headers = {"Authorization": f"Bearer {self.tokens[role]}"} if role else {}
+        self.queries = 0
+        t0 = time.perf_counter()
+        response = await self.client.request(method, path, headers=headers, **kwargs)
+        elapsed = (time.perf_counter() - t0) * 1000
+        if self.record:
+            entry = self.results.setdefault(name, {
+                "method": method, "path": path.split("?")[0], "latencies": [], "queries": [], "errors": 0,
+            })
+            entry["latencies"].append(elapsed)
+            entry["queries"].append(self.queries)
+            if response.status_code >= 400:
+                entry["errors"] += 1
+                entry.setdefault("first_error", f"{response.status_code} {response.text[:200]}")
+        if response.status_code >= 400:
+            return None
+        return response.json() if response.headers.get("content-type", "").startswith("application/json") else None
+
+    def report(self) -> dict:
+        out = {}
+        for name, entry in sorted(self.results.items()):
+            ordered = sorted(entry["latencies"])
+            out[name] = {
+                "method": entry["method"],
+                "path": entry["path"],
+                "requests": len(ordered),
+                "errors": entry["errors"],
+                "p50_ms": round(_percentile(ordered, 50), 3),
+                "p95_ms": round(_percentile(ordered, 95), 3),
+                "p99_ms": round(_percentile(ordered, 99), 3),
+                "mean_ms": round(sum(ordered) / len(ordered), 3),
+                "max_ms": round(ordered[-1], 3),
+                "queries_per_request": {
+                    "mean": round(sum(entry["queries"]) / len(entry["queries"]), 2),
+                    "max": max(entry["queries"]),
+                },
+            }
+            if "first_error" in entry:
+                out[name]["first_error"] = entry["first_error"]
+        return out
+
+
+# ── Scenarios ──────────────────────────────────────────────────
+
+def _pools(params: dict) -> dict:
+    """Ids the scenarios work on, read from the dataset."""
+    from sqlalchemy import select
+    from database import engine
+    from models.vehicle import Vehicle
+    from models.driver import Driver
+    from models.maintenance import MaintenanceLog
+
+    with engine.connect() as conn:
+        available = conn.execute(
+            select(Vehicle.id, Vehicle.max_capacity).where(Vehicle.status == "Available").order_by(Vehicle.id)
+        ).all()
+        drivers = conn.execute(
+            select(Driver.id).where(Driver.status == "On Duty", Driver.license_expiry >= date.today())
+            .order_by(Driver.id)
+        ).scalars().all()
+        maintenance = conn.execute(select(MaintenanceLog.id).order_by(MaintenanceLog.id).limit(1_000)).scalars().all()
+    half = len(available) // 2
+    return {
+        "trip_vehicles": available[:half], "shop_vehicles": available[half:], "drivers": drivers,
+        "maintenance": maintenance or [1],
+    }
+
+
+async def read_scenario(b: Recorder, rng: random.Random, params: dict, pools: dict, state: dict):
+    vehicle_id = rng.randint(1, params["vehicles"])
+    driver_id = rng.randint(1, params["drivers"])
+    trip_id = rng.randint(1, max(1, params["trips"]))
+    region = rng.choice(REGIONS)
+
+    await b.call("auth.me", "fleet", "GET", "/api/auth/me")
+    await b.call("dashboard.kpis", "fleet", "GET", "/api/dashboard/kpis")
+    await b.call("dashboard.kpis_region", "fleet", "GET", "/api/dashboard/kpis", params={"region": region})
+
+    page = await b.call("vehicles.list", "fleet", "GET", "/api/vehicles/", params={"limit": 100})
+    if page and page["next_cursor"]:
+        await b.call("vehicles.list_page2", "fleet", "GET", "/api/vehicles/",
+                     params={"limit": 100, "after": page["next_cursor"]})
+    await b.call("vehicles.list_filtered", "fleet", "GET", "/api/vehicles/",
+                 params={"status": "Available", "region": region, "limit": 100})
+    await b.call("vehicles.detail", "fleet", "GET", f"/api/vehicles/{vehicle_id}")
+
+    await b.call("drivers.list", "safety", "GET", "/api/drivers/", params={"limit": 100})
+    await b.call("drivers.list_on_duty", "safety", "GET", "/api/drivers/", params={"status": "On Duty", "limit": 100})
+    await b.call("drivers.detail", "safety", "GET", f"/api/drivers/{driver_id}")
+
+    await b.call("trips.list", "dispatch", "GET", "/api/trips/", params={"limit": 100})
+    await b.call("trips.list_completed", "dispatch", "GET", "/api/trips/", params={"status": "Completed", "limit": 100})
+    await b.call("trips.search", "dispatch", "GET", "/api/trips/", params={"search": "Hub 7", "limit": 100})
+    await b.call("trips.detail", "dispatch", "GET", f"/api/trips/{trip_id}")
+    await b.call("trips.export_vehicle", "finance", "GET", "/api/trips/export",
+                 params={"format": "csv", "vehicle_id": vehicle_id})
+
+    await b.call("maintenance.list", "fleet", "GET", "/api/maintenance/", params={"limit": 100})
+    await b.call("maintenance.list_open", "fleet", "GET", "/api/maintenance/", params={"status": "Open", "limit": 100})
+    await b.call("maintenance.detail", "fleet", "GET", f"/api/maintenance/{rng.choice(pools['maintenance'])}")
+
+    await b.call("finance.fuel_logs", "finance", "GET", "/api/finance/fuel-logs", params={"limit": 100})
+    await b.call("finance.fuel_logs_vehicle", "finance", "GET", "/api/finance/fuel-logs",
+                 params={"vehicle_id": vehicle_id, "limit": 100})
+    await b.call("finance.expenses", "finance", "GET", "/api/finance/expenses", params={"limit": 100})
+    await b.call("finance.expenses_category", "finance", "GET", "/api/finance/expenses",
+                 params={"category": rng.choice(EXPENSE_CATEGORIES), "limit": 100})
+    await b.call("finance.summary", "finance", "GET", "/api/finance/summary")
+    await b.call("finance.monthly", "finance", "GET", "/api/finance/monthly")
+    await b.call("finance.monthly_region", "finance", "GET", "/api/finance/monthly", params={"region": region})
+    await b.call("finance.top_expensive", "finance", "GET", "/api/finance/top-expensive", params={"limit": 10})
+    end = date.fromisoformat(params["end_date"])
+    await b.call("finance.top_expensive_range", "finance", "GET", "/api/finance/top-expensive",
+                 params={"limit": 10, "date_from": (end - timedelta(days=90)).isoformat(), "date_to": end.isoformat()})
+    await b.call("finance.idle_vehicles", "finance", "GET", "/api/finance/idle-vehicles", params={"days": 30})
+
+    await b.call("audit.logs", "fleet", "GET", "/api/audit/logs", params={"limit": 100})
+    if state.get("trip_id"):
+        await b.call("audit.timeline", "fleet", "GET", f"/api/audit/entity/trip/{state['trip_id']}/timeline")
+
+
+async def write_scenario(b: Recorder, rng: random.Random, params: dict, pools: dict, state: dict, i: int):
+    end = date.fromisoformat(params["end_date"])
+    vehicle_id, capacity = pools["trip_vehicles"][i % len(pools["trip_vehicles"])]
+    driver_id = pools["drivers"][i % len(pools["drivers"])]
+    trip = {"vehicle_id": vehicle_id, "driver_id": driver_id, "cargo_weight": round(capacity / 2, 1),
+            "origin": "Hub 1", "destination": "Hub 2", "estimated_fuel_cost": 40, "scheduled_date": end.isoformat()}
+
+    created = await b.call("trips.create", "dispatch", "POST", "/api/trips/", json=trip)
+    if created:
+        state["trip_id"] = created["id"]
+        await b.call("trips.dispatch", "dispatch", "POST", f"/api/trips/{created['id']}/dispatch")
+        await b.call("trips.complete", "dispatch", "POST", f"/api/trips/{created['id']}/complete",
+                     json={"distance": 250, "revenue": 900})
+    cancelled = await b.call("trips.create_for_cancel", "dispatch", "POST", "/api/trips/", json=trip)
+    if cancelled:
+        await b.call("trips.cancel", "dispatch", "POST", f"/api/trips/{cancelled['id']}/cancel")
+    jobs = [{"cargo_weight": round(rng.uniform(10, 20_000), 1), "origin": "Hub 3", "destination": "Hub 4"}
+            for _ in range(20)]
+    await b.call("trips.optimize_assignment", "dispatch", "POST", "/api/trips/optimize-assignment", json={"jobs": jobs})
+
+    await b.call("finance.fuel_log_create", "finance", "POST", "/api/finance/fuel-logs", json={
+        "vehicle_id": vehicle_id, "date": end.isoformat(), "liters": 80, "cost": 120, "odometer_reading": 1000,
+    })
+    await b.call("finance.expense_create", "finance", "POST", "/api/finance/expenses", json={
+        "vehicle_id": vehicle_id, "category": "Tolls", "amount": 25, "date": end.isoformat(),
+    })
+
+    shop_vehicle, _ = pools["shop_vehicles"][i % len(pools["shop_vehicles"])]
+    log_entry = await b.call("maintenance.create", "fleet", "POST", "/api/maintenance/", json={
+        "vehicle_id": shop_vehicle, "issue": "Benchmark check", "date": end.isoformat(), "cost": 100,
+    })
+    if log_entry:
+        await b.call("maintenance.resolve", "fleet", "PUT", f"/api/maintenance/{log_entry['id']}",
+                     json={"status": "Resolved"})
+
+    tag = f"{params['seed']}-{i}-{time.time_ns()}"
+    vehicle = await b.call("vehicles.create", "fleet", "POST", "/api/vehicles/", json={
+        "name": f"Bench {tag}", "model": "Bench", "license_plate": f"BNC-{tag}", "max_capacity": 1_000,
+        "vehicle_type": "Van", "region": rng.choice(REGIONS),
+    })
+    if vehicle:
+        await b.call("vehicles.update", "fleet", "PUT", f"/api/vehicles/{vehicle['id']}", json={"odometer": 10})
+    driver = await b.call("drivers.create", "safety", "POST", "/api/drivers/", json={
+        "full_name": f"Bench {tag}", "license_number": f"BNC-{tag}",
+        "license_expiry": (end + timedelta(days=365)).isoformat(), "status": "Off Duty",
+    })
+    if driver:
+        await b.call("drivers.update", "safety", "PUT", f"/api/drivers/{driver['id']}", json={"complaints": 1})
+
+
+async def run_benchmark(params: dict, iterations: int, warmup: int, login_iterations: int) -> dict:
+    import httpx
+    from sqlalchemy import event
+    from database import engine, async_engine
+    import main
+
+    if not (pools := _pools(params))["trip_vehicles"] or not pools["drivers"]:
+        raise SystemExit("Dataset has no available vehicles or eligible drivers for the write scenario")
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            b = Recorder(client, {})
+            for target in (engine, async_engine.sync_engine):
+                event.listen(target, "before_cursor_execute", b.count_query)
+
+            for email, _, _ in USERS:
+                response = await client.post("/api/auth/login", json={"email": email, "password": PASSWORD})
+                response.raise_for_status()
+                b.tokens[email.split("@")[0]] = response.json()["access_token"]
+
+            for i in range(login_iterations):
+                await b.call("auth.login", None, "POST", "/api/auth/login",
+                             json={"email": USERS[i % len(USERS)][0], "password": PASSWORD})
+
+            state = {}
+            for phase, scenario in (("read", read_scenario), ("write", write_scenario)):
+                rng = random.Random(params["seed"])
+                started = time.perf_counter()
+                for i in range(warmup + iterations):
+                    b.record = i >= warmup
+                    if phase == "read":
+                        await scenario(b, rng, params, pools, state)
+                    else:
+                        await scenario(b, rng, params, pools, state, i)
+                log.warning("%s phase: %d iterations in %.1fs", phase, warmup + iterations,
+                            time.perf_counter() - started)
+            # one more read pass to cover the audit timeline of a trip written above
+            b.record = True
+            await read_scenario(b, random.Random(params["seed"]), params, pools, state)
+
+            for target in (engine, async_engine.sync_engine):
+                event.remove(target, "before_cursor_execute", b.count_query)
+    return b.report()
+
+
+def benchmark():
+    parser = argparse.ArgumentParser(description="Benchmark every API router against a synthetic dataset.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small",
+                        help="Dataset size preset; the count options below override it")
+    for name in SCALES["small"]:
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, dest=name)
+    parser.add_argument("--days", type=int, default=365, help="History window ending at --end-date")
+    parser.add_argument("--end-date", default=date.today().isoformat(), help="Last day of the generated history")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", default=os.path.join(tempfile.gettempdir(), "fleetcommand-bench.db"),
+                        help="SQLite file holding the pristine dataset; each run works on a copy")
+    parser.add_argument("--regenerate", action="store_true", help="Rebuild the dataset even if it matches")
+    parser.add_argument("--generate-only", action="store_true")
+    parser.add_argument("--iterations", type=int, default=30, help="Measured iterations per phase")
+    parser.add_argument("--warmup", type=int, default=2, help="Unmeasured iterations per phase")
+    parser.add_argument("--login-iterations", type=int, default=5, help="Measured /auth/login calls (bcrypt-bound)")
+    parser.add_argument("--no-cache", action="store_true", help="Run with CACHE_ENABLED=false")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    params = {name: getattr(args, name) if getattr(args, name) is not None else default
+              for name, default in SCALES[args.scale].items()}
+    if params["vehicles"] < 2 or params["drivers"] < 1:
+        parser.error("need at least 2 vehicles and 1 driver")
+    params.update(days=args.days, end_date=args.end_date, seed=args.seed)
+
+    # configuration is read at import time, so the environment is set before importing the app
+    snapshot = os.path.abspath(args.db)
+    work = os.path.splitext(snapshot)[0] + ".run.db"
+    os.environ["DATABASE_URL"] = f"sqlite:///{work}"
+    os.environ["DB_STARTUP_LOCK_PATH"] = work + ".lock"
+    if args.no_cache:
+        os.environ["CACHE_ENABLED"] = "false"
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s | %(levelname)-7s | %(name)s | %(message)s")
+
+    dataset = prepare_dataset(params, snapshot, work, args.regenerate)
+    rss_after_dataset = _peak_rss_mb()
+    if args.generate_only:
+        print(json.dumps(dataset, indent=2))
+        return
+
+    import sqlite3
+    from config import CACHE_ENABLED, AUDIT_WRITE_MODE
+    import main  # noqa: F401  (sets up logging at import; quieten it for the run)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    started = time.perf_counter()
+    endpoints = asyncio.run(run_benchmark(params, args.iterations, args.warmup, args.login_iterations))
+    report = {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+            "cache_enabled": CACHE_ENABLED,
+            "audit_write_mode": AUDIT_WRITE_MODE,
+            "duration_seconds": round(time.perf_counter() - started, 1),
+        },
+        "dataset": dataset,
+        "peak_rss_mb": _peak_rss_mb(),
+        "peak_rss_mb_after_dataset": rss_after_dataset,
+        "endpoints": endpoints,
+    }
+    payload = json.dumps(report, indent=2, default=str)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(payload + "\n")
+        log.warning("Report written to %s", args.output)
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,141 @@
+"""
+Negotiated response compression.
+
+CompressionMiddleware compresses JSON, NDJSON, CSV and other text bodies of at
+least COMPRESSION_MINIMUM_SIZE bytes with the client's preferred coding from
+Accept-Encoding: brotli when the `brotli` package is installed, else gzip.
+Streamed responses (exports) are compressed chunk by chunk with a sync flush,
+so clients still receive rows as they are produced. Responses that already
+carry a Content-Encoding are passed through untouched.
+"""
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from config import COMPRESSION_MINIMUM_SIZE, COMPRESSION_GZIP_LEVEL, COMPRESSION_BROTLI_QUALITY
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip is offered
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "text/", "application/json", "application/x-ndjson", "application/javascript",
+    "application/xml", "image/svg+xml",
+)
+
+
+class _GzipCompressor:
+    def __init__(self):
+        self._zlib = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes) -> bytes:
+        return self._zlib.compress(data) + self._zlib.flush()
+
+
+class _BrotliCompressor:
+    def __init__(self):
+        self._brotli = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._brotli.process(data) + self._brotli.flush()
+
+    def finish(self, data: bytes) -> bytes:
+        return self._brotli.process(data) + self._brotli.finish()
+
+
+# Supported codings in server preference order (used to break q-value ties)
+COMPRESSORS = {"br": _BrotliCompressor, "gzip": _GzipCompressor} if brotli else {"gzip": _GzipCompressor}
+
+
+def negotiate_encoding(accept_encoding: str, available=COMPRESSORS) -> Optional[str]:
+    """Best coding of `available` for an Accept-Encoding header, or None for identity."""
+    weights = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[coding.strip()] = quality
+
+    best, best_quality = None, 0.0
+    for coding in available:
+        quality = weights.get(coding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def compressible(content_type: str) -> bool:
+    """Whether a body of this Content-Type is worth compressing."""
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware, so streamed bodies are compressed as they are sent."""
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        coding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                passthrough = "content-encoding" in headers or not compressible(headers.get("content-type", ""))
+                if passthrough:
+                    await send(message)
+                else:
+                    headers.add_vary_header("Accept-Encoding")
+                    start = message  # held back until the first body chunk decides the headers
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = COMPRESSORS[coding]()
+                headers = MutableHeaders(scope=start)
+                headers["Content-Encoding"] = coding
+                if more_body:
+                    del headers["Content-Length"]
+                    message["body"] = compressor.compress(body)
+                else:
+                    message["body"] = compressor.finish(body)
+                    headers["Content-Length"] = str(len(message["body"]))
+                await send(start)
+                await send(message)
+                return
+
+            message["body"] = compressor.compress(body) if more_body else compressor.finish(body)
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
@@ -4,6 +4,7 @@ Centralizes all settings for the Fleet Management ERP backend.
 All values are overridable via environment variables for deployment.
 """
 import os
+import tempfile
 from datetime import timedelta
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./fleet_manager.db")
@@ -20,3 +21,81 @@ _default_origins = "http://localhost:5173,http://localhost:8000,http://127.0.0.1
 CORS_ORIGINS = os.getenv("CORS_ORIGINS", _default_origins).split(",")
 
 PORT = int(os.getenv("PORT", "8000"))
+
+# Keyset pagination for list endpoints
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "1000"))
+
+# In-process cache for dashboard / finance aggregates (invalidated on commit)
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "60"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "256"))
+
+# Authenticated-user cache used by middleware.get_current_user
+AUTH_USER_CACHE_TTL_SECONDS = float(os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "60"))
+AUTH_USER_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_USER_CACHE_MAX_ENTRIES", "1024"))
+
+# Password hashing – bcrypt cost and the dedicated executor that runs it.
+# Raising/lowering BCRYPT_ROUNDS transparently rehashes passwords on next login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "process")  # process | thread
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+
+# SQLite tuning profile, applied to every new connection (ignored for other databases).
+# WAL lets readers proceed while a writer commits; NORMAL sync is durable in WAL mode
+# except for the last transactions on power loss. Set a value to "" to keep SQLite's default.
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")
+SQLITE_MMAP_SIZE = os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))
+SQLITE_CACHE_SIZE = os.getenv("SQLITE_CACHE_SIZE", "-20000")  # negative = KiB, i.e. ~20 MB
+SQLITE_TEMP_STORE = os.getenv("SQLITE_TEMP_STORE", "MEMORY")
+
+# Connection pool (per process – each gunicorn worker has its own)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+# Lock file serializing create_all / seed / backfills when several workers boot at once
+DB_STARTUP_LOCK_PATH = os.getenv(
+    "DB_STARTUP_LOCK_PATH", os.path.join(tempfile.gettempdir(), "fleetcommand-startup.lock")
+)
+
+# Audit trail writer: "sync" inserts each entry inside the business transaction;
+# "buffered" queues committed entries in memory and batch-inserts them in the
+# background (entries still queued at a hard crash are lost – bounded by the knobs below).
+AUDIT_WRITE_MODE = os.getenv("AUDIT_WRITE_MODE", "sync")  # sync | buffered
+AUDIT_QUEUE_MAX = int(os.getenv("AUDIT_QUEUE_MAX", "10000"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+AUDIT_FLUSH_INTERVAL_SECONDS = float(os.getenv("AUDIT_FLUSH_INTERVAL_SECONDS", "1.0"))
+
+# Bulk CSV import (fuel logs / expenses)
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+
+# Batch trip endpoints (/api/trips/batch, /api/trips/dispatch-batch)
+TRIP_BATCH_MAX_ITEMS = int(os.getenv("TRIP_BATCH_MAX_ITEMS", "500"))
+
+# Per-request instrumentation: Server-Timing header + structured request log.
+# A request running more SQL statements than the threshold logs a warning (0 disables).
+REQUEST_INSTRUMENTATION_ENABLED = os.getenv("REQUEST_INSTRUMENTATION_ENABLED", "true").lower() == "true"
+SQL_QUERY_WARN_THRESHOLD = int(os.getenv("SQL_QUERY_WARN_THRESHOLD", "30"))
+
+# Prometheus metrics at /api/metrics. With gunicorn running several workers, point
+# METRICS_MULTIPROC_DIR at a directory shared by them (empty it on each deploy):
+# every worker snapshots its metrics there and a scrape of any worker sums them all.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+METRICS_SNAPSHOT_INTERVAL_SECONDS = float(os.getenv("METRICS_SNAPSHOT_INTERVAL_SECONDS", "5"))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")  # optional bearer token required by /api/metrics
+
+# Response encoding. FAST_JSON_RESPONSES serializes server-built list pages with orjson
+# instead of re-validating them through response_model (see responses.py).
+# Bodies from COMPRESSION_MINIMUM_SIZE bytes are compressed with the client's preferred
+# Accept-Encoding – brotli when the package is installed, else gzip.
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "true").lower() == "true"
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
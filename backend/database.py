@@ -1,37 +1,163 @@
+import time
+from contextlib import contextmanager
 from sqlalchemy import create_engine, event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from config import DATABASE_URL
+from sqlalchemy.orm import Session, sessionmaker
+from config import (
+    DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_STARTUP_LOCK_PATH,
+    SQLITE_JOURNAL_MODE, SQLITE_SYNCHRONOUS, SQLITE_BUSY_TIMEOUT_MS, SQLITE_MMAP_SIZE,
+    SQLITE_CACHE_SIZE, SQLITE_TEMP_STORE,
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows dev boxes – single worker only
+    fcntl = None
 
 _is_sqlite = DATABASE_URL.startswith("sqlite")
+_is_memory = _is_sqlite and (":memory:" in DATABASE_URL or DATABASE_URL.rstrip("/") in ("sqlite:", "sqlite:/"))
+
+
+def _async_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto its asyncio driver (aiosqlite / asyncpg)."""
+    if url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + url[len("sqlite:"):]
+    for prefix in ("postgres://", "postgresql://", "postgresql+psycopg2://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
 
 _connect_args = {"check_same_thread": False} if _is_sqlite else {}
+
+# Callables (engine_label, seconds) told how long each pool checkout waited; see metrics.py.
+pool_wait_listeners = []
+
+
+class _TimedCheckout:
+    """Pool mixin reporting the time spent waiting for a connection."""
+    engine_label = ""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started
+            for listener in pool_wait_listeners:
+                listener(self.engine_label, waited)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    engine_label = "sync"
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    engine_label = "async"
+
+
+def _pool_options(queue_pool) -> dict:
+    """
+    Explicit pool settings. SQLite connections are local file handles: they
+    never go stale, so pre-ping is skipped and connections are kept for the
+    life of the worker (the PRAGMA profile then runs once per connection).
+    In-memory databases must share one connection.
+    """
+    if _is_memory:
+        return {"poolclass": StaticPool}
+    options = {
+        "poolclass": queue_pool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+    }
+    if not _is_sqlite:
+        options.update(pool_pre_ping=True, pool_recycle=DB_POOL_RECYCLE)  # auto-reconnect stale connections
+    return options
+
+
+# Sync engine – startup (create_all, seed) and maintenance scripts.
 engine = create_engine(
     DATABASE_URL,
     connect_args=_connect_args,
-    pool_pre_ping=True,  # auto-reconnect stale connections
     echo=False,
+    **_pool_options(TimedQueuePool),
+)
+
+# Async engine – every request handler.
+async_engine = create_async_engine(
+    _async_url(DATABASE_URL),
+    connect_args=_connect_args,
+    echo=False,
+    **_pool_options(TimedAsyncAdaptedQueuePool),
 )
 
+# Applied in this order: busy_timeout first so the journal-mode switch waits
+# on other workers instead of failing with "database is locked".
+SQLITE_PRAGMAS = [
+    ("busy_timeout", SQLITE_BUSY_TIMEOUT_MS),
+    ("journal_mode", SQLITE_JOURNAL_MODE),
+    ("synchronous", SQLITE_SYNCHRONOUS),
+    ("mmap_size", SQLITE_MMAP_SIZE),
+    ("cache_size", SQLITE_CACHE_SIZE),
+    ("temp_store", SQLITE_TEMP_STORE),
+    ("foreign_keys", "ON"),  # SQLite ignores FK constraints by default
+]
+
+
+def _set_sqlite_pragma(dbapi_connection, connection_record):
+    """Apply the SQLite tuning profile (config.SQLITE_*) to a new connection."""
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS:
+        if value != "":
+            cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
 
 if _is_sqlite:
-    @event.listens_for(engine, "connect")
-    def _set_sqlite_pragma(dbapi_connection, connection_record):
-        """SQLite ignores FK constraints by default. This enables them."""
-        cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON")
-        cursor.close()
+    event.listen(engine, "connect", _set_sqlite_pragma)
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragma)
+
 
+class FleetSession(Session):
+    """
+    Session class shared by the sync and async session factories, so
+    session-level event hooks (cache invalidation, etc.) cover both.
+    """
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+SessionLocal = sessionmaker(class_=FleetSession, autocommit=False, autoflush=False, bind=engine)
+
+# expire_on_commit=False: attributes must stay readable after commit without
+# an implicit (and, under asyncio, illegal) lazy refresh.
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, sync_session_class=FleetSession,
+    autoflush=False, expire_on_commit=False,
+)
 
 Base = declarative_base()
 
 
-def get_db():
-    """FastAPI dependency – yields a DB session and ensures cleanup."""
-    db = SessionLocal()
-    try:
+@contextmanager
+def startup_lock():
+    """
+    Serialize one-time startup work (create_all, seed, backfills) across the
+    gunicorn workers on this host, so only one of them initializes the schema.
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(DB_STARTUP_LOCK_PATH, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+async def get_db():
+    """FastAPI dependency – yields an AsyncSession and ensures cleanup."""
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -0,0 +1,119 @@
+"""
+Request-scoped SQL instrumentation.
+
+Cursor-execute hooks on both engines add every statement's count and
+duration to the stats of the request that issued it (tracked in a
+ContextVar, so concurrent requests never mix). RequestInstrumentationMiddleware
+opens those stats per HTTP request, sends them as a Server-Timing header and
+logs one structured line per request, with a warning above
+SQL_QUERY_WARN_THRESHOLD statements – the usual sign of an N+1 loop.
+"""
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+from config import SQL_QUERY_WARN_THRESHOLD
+from database import engine, async_engine
+
+logger = logging.getLogger("fleet.requests")
+
+
+class RequestStats:
+    """Timing and SQL counters of one request."""
+
+    __slots__ = ("started", "queries", "db_seconds")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self) -> str:
+        queries = f"{self.queries} {'query' if self.queries == 1 else 'queries'}"
+        return f'db;dur={self.db_seconds * 1000:.2f};desc="{queries}", app;dur={self.elapsed_ms():.2f}'
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Stats of the request being handled, or None outside a request."""
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - started
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
+
+
+for _engine in (engine, async_engine.sync_engine):
+    event.listen(_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(_engine, "handle_error", _handle_error)
+
+
+class RequestInstrumentationMiddleware:
+    """Pure ASGI middleware, so streamed responses are measured to their last byte."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            _log_request(scope, status_code, stats)
+
+
+def _log_request(scope, status_code: int, stats: RequestStats):
+    duration_ms = stats.elapsed_ms()
+    fields = {
+        "http_method": scope["method"],
+        "http_path": scope["path"],
+        "http_status": status_code,
+        "duration_ms": round(duration_ms, 2),
+        "db_queries": stats.queries,
+        "db_ms": round(stats.db_seconds * 1000, 2),
+    }
+    message = "%s %s %d %.1fms db=%dq/%.1fms"
+    args = (scope["method"], scope["path"], status_code, duration_ms, stats.queries, stats.db_seconds * 1000)
+    if SQL_QUERY_WARN_THRESHOLD and stats.queries > SQL_QUERY_WARN_THRESHOLD:
+        logger.warning(message + " – exceeds %d queries (N+1?)", *args, SQL_QUERY_WARN_THRESHOLD, extra=fields)
+    else:
+        logger.info(message, *args, extra=fields)
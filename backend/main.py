@@ -3,13 +3,25 @@ import os
 import traceback
 from pathlib import Path
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse
 
-from config import CORS_ORIGINS
-from database import engine, Base
+from config import (
+    CORS_ORIGINS, CACHE_ENABLED, AUDIT_WRITE_MODE, REQUEST_INSTRUMENTATION_ENABLED, METRICS_ENABLED, METRICS_TOKEN,
+    COMPRESSION_ENABLED,
+)
+from auth import shutdown_hash_executor
+from database import engine, async_engine, Base, SessionLocal, startup_lock
+from services.cache_service import cache
+from services.audit_service import audit_writer
+from middleware import user_cache
+from instrumentation import RequestInstrumentationMiddleware
+from compression import CompressionMiddleware
+from static_files import SPAStatic
+from metrics import MetricsMiddleware, render_latest, start_snapshots, stop_snapshots
+from services.rollup_service import ensure_monthly_rollup
+from migrations import run_migrations
 
 logging.basicConfig(
     level=logging.INFO,
@@ -26,6 +38,8 @@ from models.maintenance import MaintenanceLog
 from models.fuel_log import FuelLog
 from models.expense import Expense
 from models.audit_log import AuditLog
+from models.monthly_rollup import MonthlyRollup
+from models.table_version import TableVersion
 
 from routers.auth_router import router as auth_router
 from routers.dashboard_router import router as dashboard_router
@@ -36,7 +50,9 @@ from routers.maintenance_router import router as maintenance_router
 from routers.finance_router import router as finance_router
 from routers.audit_router import router as audit_router
 
-Base.metadata.create_all(bind=engine)
+with startup_lock():
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
 
 STATIC_DIR = Path(os.getenv("STATIC_DIR", str(Path(__file__).resolve().parent.parent / "frontend" / "dist")))
 
@@ -44,6 +60,7 @@ app = FastAPI(
     title="Fleet Management ERP",
     description="Centralized, rule-based digital hub for delivery fleet lifecycle management",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
 
@@ -70,6 +87,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+if REQUEST_INSTRUMENTATION_ENABLED:
+    app.add_middleware(RequestInstrumentationMiddleware)  # outermost: times the whole stack
 
 app.include_router(auth_router)
 app.include_router(dashboard_router)
@@ -83,25 +106,34 @@ app.include_router(audit_router)
 
 @app.get("/api/health")
 def health():
-    return {"status": "ok", "version": "1.0.0"}
+    return {
+        "status": "ok",
+        "version": "1.0.0",
+        "cache": {"enabled": CACHE_ENABLED, **cache.stats()},
+        "auth_cache": user_cache.stats(),
+        "audit_writer": audit_writer.stats(),
+    }
+
+
+if METRICS_ENABLED:
+    @app.get("/api/metrics", include_in_schema=False)
+    async def metrics(request: Request):
+        """Prometheus text exposition (all workers when METRICS_MULTIPROC_DIR is set)."""
+        if METRICS_TOKEN and request.headers.get("authorization") != f"Bearer {METRICS_TOKEN}":
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+        return PlainTextResponse(render_latest(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 if STATIC_DIR.is_dir():
-    # Mount the assets directory (JS, CSS, images)
-    app.mount("/assets", StaticFiles(directory=STATIC_DIR / "assets"), name="assets")
+    spa = SPAStatic(STATIC_DIR)
 
-    @app.get("/{full_path:path}")
+    @app.api_route("/{full_path:path}", methods=["GET", "HEAD"])
     async def serve_spa(request: Request, full_path: str):
         """
-        Catch-all route: serves the SPA index.html for any non-API path,
-        enabling client-side routing (React Router).
+        Catch-all route: serves built files (hashed assets, favicon, etc.) from the
+        static index and index.html for any other path, enabling client-side routing.
         """
-        # Try serving a static file first (e.g., favicon, manifest, etc.)
-        file_path = STATIC_DIR / full_path
-        if full_path and file_path.is_file():
-            return FileResponse(file_path)
-        # Otherwise, serve the SPA entry point
-        return FileResponse(STATIC_DIR / "index.html")
+        return spa.response(request, full_path)
 else:
     @app.get("/")
     def root():
@@ -114,5 +146,23 @@ def on_startup():
     logger.info("Starting Fleet Management ERP v1.0.0")
     logger.info("Static dir: %s (exists=%s)", STATIC_DIR, STATIC_DIR.is_dir())
     from seed import seed
-    seed()
+    with startup_lock():
+        seed()
+        db = SessionLocal()
+        try:
+            ensure_monthly_rollup(db)
+        finally:
+            db.close()
+    if AUDIT_WRITE_MODE == "buffered":
+        audit_writer.start()
+    if METRICS_ENABLED:
+        start_snapshots()
     logger.info("Server ready — all routes registered")
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await audit_writer.stop()  # drain buffered audit entries before the pool goes away
+    await stop_snapshots()
+    shutdown_hash_executor()
+    await async_engine.dispose()
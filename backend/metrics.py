@@ -0,0 +1,361 @@
+"""
+In-process metrics registry, rendered in Prometheus text format at /api/metrics.
+
+Counters and histograms are updated on the hot path under a lock; gauges
+and cache counters are read from their owners when a snapshot is taken.
+
+Multiprocess mode (METRICS_MULTIPROC_DIR): every worker writes its snapshot
+to <dir>/metrics-<pid>.json every METRICS_SNAPSHOT_INTERVAL_SECONDS and on
+shutdown. A scrape of any worker sums counters and histograms over all files
+(exited workers included, so totals never go backwards) and gauges over the
+workers that are still alive.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+
+import anyio
+
+from config import METRICS_MULTIPROC_DIR, METRICS_SNAPSHOT_INTERVAL_SECONDS
+from database import engine, async_engine, pool_wait_listeners
+from middleware import user_cache
+from services.cache_service import cache
+
+logger = logging.getLogger("fleet.metrics")
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+REGISTRY = []
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def describe(self) -> dict:
+        return {"kind": self.kind, "help": self.documentation, "labelnames": list(self.labelnames)}
+
+    def samples(self) -> list:
+        """[label values, value] pairs."""
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> list:
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self._values = {}  # key -> [per-bucket counts (last = +Inf), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)  # first bucket with value <= le
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def describe(self) -> dict:
+        return {**super().describe(), "buckets": list(self.buckets)}
+
+    def samples(self) -> list:
+        with self._lock:
+            return [[list(key), [list(counts), total]] for key, (counts, total) in self._values.items()]
+
+
+class CallbackMetric(_Metric):
+    """Gauge or counter read from `collect()` ({label values tuple: value}) at snapshot time."""
+
+    def __init__(self, kind: str, name: str, documentation: str, labelnames, collect):
+        self.kind = kind
+        self._collect = collect
+        super().__init__(name, documentation, labelnames)
+
+    def samples(self) -> list:
+        return [[list(key), value] for key, value in self._collect().items()]
+
+
+# ── Metrics ────────────────────────────────────────────────────
+
+http_requests = Counter(
+    "fleet_http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status"))
+http_request_duration = Histogram(
+    "fleet_http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route"))
+db_pool_checkout_wait = Histogram(
+    "fleet_db_pool_checkout_wait_seconds", "Time spent waiting for a pooled database connection.", ("engine",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0))
+trip_events = Counter("fleet_trip_events_total", "Trip lifecycle transitions committed.", ("event",))
+fuel_logs_ingested = Counter("fleet_fuel_logs_ingested_total", "Fuel log entries committed.", ("source",))
+
+pool_wait_listeners.append(lambda label, seconds: db_pool_checkout_wait.observe(seconds, engine=label))
+
+
+def _pool_connections() -> dict:
+    values = {}
+    for label, pool in (("sync", engine.pool), ("async", async_engine.sync_engine.pool)):
+        if hasattr(pool, "checkedout"):  # StaticPool (in-memory SQLite) keeps no counts
+            values[(label, "checked_out")] = pool.checkedout()
+            values[(label, "idle")] = pool.checkedin()
+            values[(label, "capacity")] = pool.size() + max(pool._max_overflow, 0)
+    return values
+
+
+def _threadpool_threads() -> dict:
+    try:
+        limiter = anyio.to_thread.current_default_thread_limiter()
+    except (RuntimeError, LookupError):  # no running event loop
+        return {}
+    return {("busy",): limiter.borrowed_tokens, ("limit",): limiter.total_tokens}
+
+
+CallbackMetric("gauge", "fleet_db_pool_connections", "Database pool connections by state.",
+               ("engine", "state"), _pool_connections)
+CallbackMetric("gauge", "fleet_threadpool_threads",
+               "Worker threads running sync endpoints and dependencies (busy) and their cap (limit).",
+               ("state",), _threadpool_threads)
+
+_CACHES = (("aggregates", cache), ("auth_user", user_cache))
+
+
+def _cache_stat(field: str):
+    return lambda: {(name,): c.stats()[field] for name, c in _CACHES}
+
+
+CallbackMetric("counter", "fleet_cache_hits_total", "Cache lookups served from the cache.",
+               ("cache",), _cache_stat("hits"))
+CallbackMetric("counter", "fleet_cache_misses_total", "Cache lookups that missed.",
+               ("cache",), _cache_stat("misses"))
+CallbackMetric("counter", "fleet_cache_invalidations_total", "Entries dropped because a source table changed.",
+               ("cache",), _cache_stat("invalidations"))
+CallbackMetric("gauge", "fleet_cache_entries", "Entries currently held by the cache.",
+               ("cache",), _cache_stat("size"))
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording request count and latency per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # the router stores the matched route in the scope; unmatched paths share one label
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            http_requests.inc(method=scope["method"], route=route, status=status_code)
+            http_request_duration.observe(time.perf_counter() - started, method=scope["method"], route=route)
+
+
+# ── Snapshots, aggregation and rendering ───────────────────────
+
+def snapshot() -> dict:
+    """JSON-serializable state of every registered metric in this process."""
+    metrics = {}
+    for metric in REGISTRY:
+        try:
+            samples = metric.samples()
+        except Exception:
+            logger.exception("Collecting metric %s failed", metric.name)
+            samples = []
+        metrics[metric.name] = {**metric.describe(), "samples": samples}
+    return {"pid": os.getpid(), "metrics": metrics}
+
+
+def _snapshot_path(pid: int) -> str:
+    return os.path.join(METRICS_MULTIPROC_DIR, f"metrics-{pid}.json")
+
+
+def write_snapshot():
+    """Atomically replace this worker's snapshot file."""
+    path = _snapshot_path(os.getpid())
+    with open(path + ".tmp", "w") as f:
+        json.dump(snapshot(), f)
+    os.replace(path + ".tmp", path)
+
+
+def _read_snapshots() -> list:
+    write_snapshot()
+    snapshots = []
+    for name in os.listdir(METRICS_MULTIPROC_DIR):
+        if name.startswith("metrics-") and name.endswith(".json"):
+            try:
+                with open(os.path.join(METRICS_MULTIPROC_DIR, name)) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # worker replaced or removed it meanwhile
+    return snapshots
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _merge(snapshots: list) -> dict:
+    """Sum samples across processes; gauges only from live ones."""
+    merged = {}
+    for snap in snapshots:
+        alive = snap["pid"] == os.getpid() or _is_alive(snap["pid"])
+        for name, metric in snap["metrics"].items():
+            if metric["kind"] == "gauge" and not alive:
+                continue
+            target = merged.setdefault(name, {**metric, "samples": {}})["samples"]
+            for labels, value in metric["samples"]:
+                key = tuple(labels)
+                if metric["kind"] == "histogram":
+                    counts, total = target.get(key, ([0] * len(value[0]), 0.0))
+                    target[key] = ([a + b for a, b in zip(counts, value[0])], total + value[1])
+                else:
+                    target[key] = target.get(key, 0) + value
+    return merged
+
+
+def _add_hit_ratio(merged: dict) -> dict:
+    """Derive fleet_cache_hit_ratio from the (summed) hit and miss counters."""
+    hits = merged.get("fleet_cache_hits_total", {}).get("samples", {})
+    misses = merged.get("fleet_cache_misses_total", {}).get("samples", {})
+    ratios = {}
+    for key in hits.keys() | misses.keys():
+        lookups = hits.get(key, 0) + misses.get(key, 0)
+        ratios[key] = hits.get(key, 0) / lookups if lookups else 0.0
+    merged["fleet_cache_hit_ratio"] = {
+        "kind": "gauge", "help": "Share of cache lookups served from the cache.",
+        "labelnames": ["cache"], "samples": ratios,
+    }
+    return merged
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value) -> str:
+    if isinstance(value, float):
+        return "+Inf" if value == float("inf") else repr(value)
+    return str(value)
+
+
+def _render(merged: dict) -> str:
+    lines = []
+    for name in sorted(merged):
+        metric = merged[name]
+        names = metric["labelnames"]
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['kind']}")
+        for key in sorted(metric["samples"]):
+            value = metric["samples"][key]
+            if metric["kind"] != "histogram":
+                lines.append(f"{name}{_labels(names, key)} {_number(value)}")
+                continue
+            counts, total = value
+            cumulative = 0
+            for bound, count in zip(list(metric["buckets"]) + [float("inf")], counts):
+                cumulative += count
+                le = 'le="%s"' % _number(float(bound))
+                lines.append(f"{name}_bucket{_labels(names, key, le)} {cumulative}")
+            lines.append(f"{name}_sum{_labels(names, key)} {_number(float(total))}")
+            lines.append(f"{name}_count{_labels(names, key)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def render_latest() -> str:
+    """Prometheus text exposition of this worker, or of all workers in multiprocess mode."""
+    snapshots = _read_snapshots() if METRICS_MULTIPROC_DIR else [snapshot()]
+    return _render(_add_hit_ratio(_merge(snapshots)))
+
+
+# ── Multiprocess snapshot writer ───────────────────────────────
+
+_snapshot_task = None
+
+
+async def _snapshot_loop():
+    while True:
+        await asyncio.sleep(METRICS_SNAPSHOT_INTERVAL_SECONDS)
+        try:
+            write_snapshot()
+        except OSError:
+            logger.exception("Writing metrics snapshot failed")
+
+
+def start_snapshots():
+    """Begin periodic snapshots (multiprocess mode only). Call from the running event loop."""
+    global _snapshot_task
+    if not METRICS_MULTIPROC_DIR or _snapshot_task is not None:
+        return
+    os.makedirs(METRICS_MULTIPROC_DIR, exist_ok=True)
+    write_snapshot()
+    _snapshot_task = asyncio.get_running_loop().create_task(_snapshot_loop())
+
+
+async def stop_snapshots():
+    """Stop the snapshot loop and write the final counts of this worker."""
+    global _snapshot_task
+    if _snapshot_task is None:
+        return
+    _snapshot_task.cancel()
+    try:
+        await _snapshot_task
+    except asyncio.CancelledError:
+        pass
+    _snapshot_task = None
+    write_snapshot()
@@ -1,21 +1,63 @@
-from typing import List
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import get_db
 from auth import decode_access_token
+from config import AUTH_USER_CACHE_TTL_SECONDS, AUTH_USER_CACHE_MAX_ENTRIES
 from models.user import User
+from services.cache_service import TTLCache, persisted_versions
 
 security = HTTPBearer()
 
 
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """Immutable snapshot of an active user, safe to share across requests."""
+    id: int
+    email: str
+    full_name: str
+    role: str
+    is_active: bool
+    created_at: Optional[datetime] = None
+
+
+# Active users keyed by (user_id, persisted users version). Any committed write
+# to users bumps the shared version, so a deactivation or role change takes
+# effect on every worker with the next request, not after the TTL.
+user_cache = TTLCache(max_entries=AUTH_USER_CACHE_MAX_ENTRIES, ttl=AUTH_USER_CACHE_TTL_SECONDS)
+
+
+async def _load_active_user(db: AsyncSession, user_id: int) -> Optional[AuthenticatedUser]:
+    key = (user_id, await persisted_versions(db, ("users",)))
+    found, user = user_cache.get(key)
+    if found:
+        return user
+    row = (await db.execute(
+        select(User).where(User.id == user_id, User.is_active == True)
+    )).scalars().first()
+    if row is None:
+        return None
+    user = AuthenticatedUser(
+        id=row.id, email=row.email, full_name=row.full_name,
+        role=row.role, is_active=row.is_active, created_at=row.created_at,
+    )
+    user_cache.set(key, user)
+    return user
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-) -> User:
+    db: AsyncSession = Depends(get_db),
+) -> AuthenticatedUser:
     """
-    Dependency that extracts the JWT, validates it, and returns the User ORM object.
+    Dependency that extracts the JWT, validates it, and returns the active user.
+    Served from user_cache on the hot path (one version read); falls back to
+    the database on a miss.
     Raises 401 if token is invalid/expired or user not found.
     """
     token = credentials.credentials
@@ -31,7 +73,7 @@ async def get_current_user(
     if user_id is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
 
-    user = db.query(User).filter(User.id == user_id, User.is_active == True).first()
+    user = await _load_active_user(db, user_id)
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found or inactive")
 
@@ -45,7 +87,7 @@ def require_roles(allowed_roles: List[str]):
     Usage:
         @router.get("/vehicles", dependencies=[Depends(require_roles(["fleet_manager", "dispatcher"]))])
     """
-    async def role_checker(current_user: User = Depends(get_current_user)):
+    async def role_checker(current_user: AuthenticatedUser = Depends(get_current_user)):
         if current_user.role not in allowed_roles:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,112 @@
+"""
+Lightweight versioned schema migrations.
+
+Base.metadata.create_all only creates missing tables; it never touches
+existing ones. Anything added to an existing table (indexes, columns) is
+listed in MIGRATIONS and applied once, in version order, at startup.
+Applied versions are recorded in the schema_migrations table, and each
+migration runs in its own transaction together with its bookkeeping row.
+
+Migrations must be idempotent (IF NOT EXISTS / existence checks): on a
+fresh database create_all has already built the current schema and the
+runner only records the versions.
+
+Usage: python migrations.py
+"""
+import logging
+from sqlalchemy import Table, Column, Integer, String, DateTime, MetaData, select, text, inspect
+from sqlalchemy.sql import func
+from database import engine, Base
+from models.user import User
+from models.vehicle import Vehicle
+from models.driver import Driver
+from models.trip import Trip
+from models.maintenance import MaintenanceLog
+from models.fuel_log import FuelLog
+from models.expense import Expense
+from models.audit_log import AuditLog
+from models.monthly_rollup import MonthlyRollup
+from models.table_version import TableVersion
+from services.driver_service import recompute_all_driver_stats
+
+logger = logging.getLogger("fleet.migrations")
+
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations", _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String(200), nullable=False),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+
+def _create_indexes(*ddl: str):
+    """Migration step issuing CREATE INDEX IF NOT EXISTS statements."""
+    def apply(conn):
+        for statement in ddl:
+            conn.execute(text(statement))
+    return apply
+
+
+def _add_driver_cancelled_trips(conn):
+    """drivers.cancelled_trips counter; all trip counters and derived stats rebuilt from trips."""
+    columns = {c["name"] for c in inspect(conn).get_columns("drivers")}
+    if "cancelled_trips" not in columns:
+        conn.execute(text("ALTER TABLE drivers ADD COLUMN cancelled_trips INTEGER DEFAULT 0"))
+    recompute_all_driver_stats(conn)
+
+
+def _audit_timeline(conn):
+    """Entity timeline index; normalize SQLite CURRENT_TIMESTAMP values to full precision."""
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_audit_logs_entity_timeline ON audit_logs (entity_type, entity_id, timestamp)"
+    ))
+    if conn.dialect.name == "sqlite":
+        conn.execute(text(
+            "UPDATE audit_logs SET timestamp = timestamp || '.000000' WHERE length(timestamp) = 19"
+        ))
+
+
+# (version, name, apply(connection)) – append only, never renumber.
+MIGRATIONS = [
+    (1, "trips (vehicle_id, created_at) index", _create_indexes(
+        "CREATE INDEX IF NOT EXISTS ix_trips_vehicle_id_created_at ON trips (vehicle_id, created_at)",
+    )),
+    (2, "hot-path composite indexes", _create_indexes(
+        "CREATE INDEX IF NOT EXISTS ix_trips_vehicle_id_status ON trips (vehicle_id, status)",
+        "CREATE INDEX IF NOT EXISTS ix_trips_driver_id_status ON trips (driver_id, status)",
+        "CREATE INDEX IF NOT EXISTS ix_fuel_logs_vehicle_id_date ON fuel_logs (vehicle_id, date)",
+        "CREATE INDEX IF NOT EXISTS ix_maintenance_logs_vehicle_id_status ON maintenance_logs (vehicle_id, status)",
+        "CREATE INDEX IF NOT EXISTS ix_expenses_vehicle_id_date ON expenses (vehicle_id, date)",
+    )),
+    (3, "drivers.cancelled_trips counter", _add_driver_cancelled_trips),
+    (4, "audit_logs entity timeline index", _audit_timeline),
+]
+
+
+def run_migrations(engine) -> list:
+    """Apply pending migrations in order. Returns the versions applied."""
+    _metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        applied = set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+    done = []
+    for version, name, apply in sorted(MIGRATIONS, key=lambda m: m[0]):
+        if version in applied:
+            continue
+        with engine.begin() as conn:
+            apply(conn)
+            conn.execute(schema_migrations.insert().values(version=version, name=name))
+        logger.info("Applied migration %d: %s", version, name)
+        done.append(version)
+    return done
+
+
+def migrate():
+    Base.metadata.create_all(bind=engine)
+    versions = run_migrations(engine)
+    print(f"Applied migrations: {versions}" if versions else "Schema up to date")
+
+
+if __name__ == "__main__":
+    migrate()
@@ -2,14 +2,22 @@
 AuditLog model – immutable record of state-changing operations.
 Tracks who did what, when, and to which entity.
 """
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database import Base
 
 
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        Index("ix_audit_logs_entity_timeline", "entity_type", "entity_id", "timestamp"),  # entity timeline
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -17,7 +25,8 @@ class AuditLog(Base):
     entity_type = Column(String(50), nullable=False, index=True)  # trip, vehicle, driver, etc.
     entity_id = Column(Integer, nullable=False)
     details = Column(String(1000), nullable=True)  # Human-readable summary
-    timestamp = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+    # Set in Python (full precision) so (timestamp, id) keyset cursors compare consistently
+    timestamp = Column(DateTime(timezone=True), default=_utcnow, server_default=func.now(), nullable=False, index=True)
 
     # Relationship
     user = relationship("User")
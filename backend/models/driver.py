@@ -27,6 +27,7 @@ class Driver(Base):
     completion_rate = Column(Float, default=0.0)     # percentage
     total_trips = Column(Integer, default=0)
     completed_trips = Column(Integer, default=0)
+    cancelled_trips = Column(Integer, default=0)
     complaints = Column(Integer, default=0)
     status = Column(String(20), default=DriverStatus.ON_DUTY.value)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
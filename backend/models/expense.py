@@ -1,7 +1,7 @@
 """
 Expense model – miscellaneous expenses linked to vehicles/trips.
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Date
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Date, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database import Base
@@ -9,6 +9,9 @@ from database import Base
 
 class Expense(Base):
     __tablename__ = "expenses"
+    __table_args__ = (
+        Index("ix_expenses_vehicle_id_date", "vehicle_id", "date"),  # per-vehicle totals / date ranges
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=False)
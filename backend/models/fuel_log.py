@@ -1,7 +1,7 @@
 """
 FuelLog model – records fuel consumption per trip/vehicle.
 """
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Date
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Date, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database import Base
@@ -9,6 +9,9 @@ from database import Base
 
 class FuelLog(Base):
     __tablename__ = "fuel_logs"
+    __table_args__ = (
+        Index("ix_fuel_logs_vehicle_id_date", "vehicle_id", "date"),  # per-vehicle totals / date ranges
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=False)
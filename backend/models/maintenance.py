@@ -2,7 +2,7 @@
 MaintenanceLog model – tracks vehicle service events.
 Creating a log automatically moves vehicle to "In Shop".
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Date
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Date, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database import Base
@@ -17,6 +17,9 @@ class MaintenanceStatus(str, enum.Enum):
 
 class MaintenanceLog(Base):
     __tablename__ = "maintenance_logs"
+    __table_args__ = (
+        Index("ix_maintenance_logs_vehicle_id_status", "vehicle_id", "status"),  # open-log checks
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=False)
@@ -0,0 +1,28 @@
+"""
+MonthlyRollup model – pre-aggregated monthly P&L, maintained incrementally.
+
+Each write updates three grains of the same month:
+  (month, vehicle_id, "")   – per vehicle
+  (month, 0, region)        – per region
+  (month, 0, "")            – fleet-wide total
+so every report is a primary-key range read.
+"""
+from sqlalchemy import Column, Integer, String, Float
+from database import Base
+
+ALL_VEHICLES = 0
+ALL_REGIONS = ""
+
+
+class MonthlyRollup(Base):
+    __tablename__ = "monthly_rollup"
+
+    month = Column(String(7), primary_key=True)                     # "YYYY-MM"
+    vehicle_id = Column(Integer, primary_key=True, default=ALL_VEHICLES)
+    region = Column(String(100), primary_key=True, default=ALL_REGIONS)
+    fuel_cost = Column(Float, nullable=False, default=0.0)
+    liters = Column(Float, nullable=False, default=0.0)
+    maintenance_cost = Column(Float, nullable=False, default=0.0)
+    expenses = Column(Float, nullable=False, default=0.0)
+    revenue = Column(Float, nullable=False, default=0.0)
+    distance = Column(Float, nullable=False, default=0.0)
@@ -0,0 +1,16 @@
+"""
+TableVersion model – committed-write counter per table, shared by all workers.
+
+Bumped right after each committed write (see cache_service) for the tables
+in PERSISTED_VERSION_TABLES, so conditional GETs (ETags) stay correct no
+matter which worker served the write.
+"""
+from sqlalchemy import Column, Integer, String
+from database import Base
+
+
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+
+    table_name = Column(String(100), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
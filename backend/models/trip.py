@@ -2,7 +2,7 @@
 Trip model – core workflow entity with lifecycle state machine.
 Draft → Dispatched → Completed | Cancelled
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Date
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Date, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from database import Base
@@ -18,6 +18,11 @@ class TripStatus(str, enum.Enum):
 
 class Trip(Base):
     __tablename__ = "trips"
+    __table_args__ = (
+        Index("ix_trips_vehicle_id_created_at", "vehicle_id", "created_at"),  # idle-vehicle detection
+        Index("ix_trips_vehicle_id_status", "vehicle_id", "status"),          # active-trip checks
+        Index("ix_trips_driver_id_status", "driver_id", "status"),            # driver checks / stats
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     vehicle_id = Column(Integer, ForeignKey("vehicles.id"), nullable=False)
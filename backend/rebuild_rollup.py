@@ -0,0 +1,33 @@
+"""
+Rebuild the monthly_rollup table from source data.
+Usage: python rebuild_rollup.py
+"""
+from database import SessionLocal, engine, Base
+from models.user import User
+from models.vehicle import Vehicle
+from models.driver import Driver
+from models.trip import Trip
+from models.maintenance import MaintenanceLog
+from models.fuel_log import FuelLog
+from models.expense import Expense
+from models.monthly_rollup import MonthlyRollup
+from services.rollup_service import rebuild_monthly_rollup
+
+
+def rebuild():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        rows = rebuild_monthly_rollup(db)
+        db.commit()
+        print(f"Monthly rollup rebuilt: {rows} rows")
+    except Exception as e:
+        db.rollback()
+        print(f"Rebuild error: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild()
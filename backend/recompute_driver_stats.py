@@ -0,0 +1,33 @@
+"""
+Recompute every driver's trip counters, completion rate and safety score
+from the trips table (repair for the incrementally maintained counters).
+Usage: python recompute_driver_stats.py
+"""
+from database import SessionLocal, engine, Base
+from models.user import User
+from models.vehicle import Vehicle
+from models.driver import Driver
+from models.trip import Trip
+from models.maintenance import MaintenanceLog
+from models.fuel_log import FuelLog
+from models.expense import Expense
+from services.driver_service import recompute_all_driver_stats
+
+
+def recompute():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        rows = recompute_all_driver_stats(db)
+        db.commit()
+        print(f"Driver stats recomputed: {rows} drivers with trips")
+    except Exception as e:
+        db.rollback()
+        print(f"Recompute error: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    recompute()
@@ -0,0 +1,37 @@
+"""
+JSON fast path for server-built payloads.
+
+List endpoints assemble their rows in the enrich_* helpers straight from ORM
+columns, already in the exact shape of the route's *Out schema. Returning
+them as plain dicts makes FastAPI re-validate every row against
+response_model and run jsonable_encoder over the result before encoding it.
+fast_json skips both and serializes the payload once with orjson (dates and
+datetimes natively). response_model stays on the route for the OpenAPI
+schema; set FAST_JSON_RESPONSES=false to route everything through
+validation again, e.g. while changing a schema.
+"""
+from typing import Any, Optional
+
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+
+from config import FAST_JSON_RESPONSES
+
+
+def fast_json(content: Any, response: Optional[Response] = None, status_code: int = 200):
+    """
+    Encode trusted `content` directly. Headers already set on the route's
+    injected `response` (ETag, Cache-Control) are carried over, since FastAPI
+    ignores that object once a handler returns its own Response.
+    """
+    if not FAST_JSON_RESPONSES:
+        return content
+    fast = ORJSONResponse(content, status_code=status_code)
+    if response is not None:
+        fast.headers.update(response.headers)
+    return fast
+
+
+def page_response(items: list, next_cursor: Optional[str], response: Optional[Response] = None):
+    """A Page envelope of enriched rows through fast_json."""
+    return fast_json({"items": items, "next_cursor": next_cursor}, response)
@@ -1,13 +1,15 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from pydantic import BaseModel
 from datetime import datetime
 
 from database import get_db
 from middleware import require_roles
 from models.user import User
-from services.audit_service import get_audit_logs
+from schemas.pagination import Page
+from config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from services.audit_service import get_audit_logs, get_entity_timeline, as_utc
 
 router = APIRouter(prefix="/api/audit", tags=["Audit Trail"])
 
@@ -28,20 +30,45 @@ class AuditLogOut(BaseModel):
 AUDIT_ROLES = ["fleet_manager", "financial_analyst"]
 
 
-@router.get("/logs", response_model=List[AuditLogOut])
-def list_audit_logs(
+@router.get("/logs", response_model=Page[AuditLogOut])
+async def list_audit_logs(
     entity_type: str = Query(None),
     entity_id: int = Query(None),
     action: str = Query(None),
-    limit: int = Query(100, ge=1, le=500),
+    user_id: int = Query(None),
+    since: datetime = Query(None, description="Only entries at or after this time (ISO 8601)"),
+    until: datetime = Query(None, description="Only entries at or before this time (ISO 8601)"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: str = Query(None, description="Cursor from a previous page's next_cursor"),
     current_user: User = Depends(require_roles(AUDIT_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    """Retrieve audit trail entries with optional filters."""
-    return get_audit_logs(
+    """Retrieve audit trail entries (newest first) with optional filters."""
+    if since and until and as_utc(since) > as_utc(until):
+        raise HTTPException(status_code=400, detail="since must be on or before until")
+    logs, next_cursor = await get_audit_logs(
         db,
         entity_type=entity_type,
         entity_id=entity_id,
         action=action,
+        user_id=user_id,
+        since=since,
+        until=until,
         limit=limit,
+        after=after,
     )
+    return {"items": logs, "next_cursor": next_cursor}
+
+
+@router.get("/entity/{entity_type}/{entity_id}/timeline", response_model=Page[AuditLogOut])
+async def entity_timeline(
+    entity_type: str,
+    entity_id: int,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: str = Query(None, description="Cursor from a previous page's next_cursor"),
+    current_user: User = Depends(require_roles(AUDIT_ROLES)),
+    db: AsyncSession = Depends(get_db),
+):
+    """Full history of one entity, oldest first."""
+    logs, next_cursor = await get_entity_timeline(db, entity_type, entity_id, limit=limit, after=after)
+    return {"items": logs, "next_cursor": next_cursor}
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import get_db
-from auth import verify_password, create_access_token, hash_password
+from auth import create_access_token, hash_password_async, verify_and_update_password_async
 from middleware import get_current_user
 from models.user import User
 from schemas.user import LoginRequest, TokenResponse, UserOut, ForgotPasswordRequest
@@ -11,10 +12,17 @@ router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(payload: LoginRequest, db: Session = Depends(get_db)):
-    """Authenticate user and return JWT + user info."""
-    user = db.query(User).filter(User.email == payload.email).first()
-    if not user or not verify_password(payload.password, user.hashed_password):
+async def login(payload: LoginRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Authenticate user and return JWT + user info.
+    bcrypt runs on the dedicated hashing executor; hashes created with an
+    outdated cost are transparently upgraded.
+    """
+    user = (await db.execute(select(User).where(User.email == payload.email))).scalars().first()
+    valid, new_hash = (False, None)
+    if user:
+        valid, new_hash = await verify_and_update_password_async(payload.password, user.hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
@@ -22,6 +30,11 @@ def login(payload: LoginRequest, db: Session = Depends(get_db)):
     if not user.is_active:
         raise HTTPException(status_code=403, detail="Account is deactivated")
 
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+        await db.refresh(user)
+
     token = create_access_token({
         "sub": user.email,
         "user_id": user.id,
@@ -34,23 +47,23 @@ def login(payload: LoginRequest, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserOut)
-def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: User = Depends(get_current_user)):
     """Return current authenticated user profile."""
     return current_user
 
 
 @router.post("/forgot-password")
-def forgot_password(payload: ForgotPasswordRequest, db: Session = Depends(get_db)):
+async def forgot_password(payload: ForgotPasswordRequest, db: AsyncSession = Depends(get_db)):
     """
     Simulated forgot password endpoint.
     In production, this would send a reset email.
     For hackathon, resets to 'password123'.
     """
-    user = db.query(User).filter(User.email == payload.email).first()
+    user = (await db.execute(select(User).where(User.email == payload.email))).scalars().first()
     if not user:
         # Don't reveal user existence
         return {"detail": "If the email exists, a reset link has been sent."}
 
-    user.hashed_password = hash_password("password123")
-    db.commit()
+    user.hashed_password = await hash_password_async("password123")
+    await db.commit()
     return {"detail": "If the email exists, a reset link has been sent. (Demo: password reset to 'password123')"}
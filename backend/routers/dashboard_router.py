@@ -2,27 +2,33 @@
 Dashboard router – Command Center KPIs.
 All roles can view the dashboard.
 """
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import get_db
 from middleware import get_current_user
 from models.user import User
-from services.dashboard_service import get_dashboard_kpis
+from services.dashboard_service import get_dashboard_kpis, KPI_TABLES
+from services.etag_service import not_modified
 
 router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
 
 
 @router.get("/kpis")
-def dashboard_kpis(
+async def dashboard_kpis(
+    request: Request,
+    response: Response,
     vehicle_type: str = Query(None),
     status: str = Query(None),
     region: str = Query(None),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """
     Returns all Command Center KPIs.
     Supports filtering by vehicle_type, status, region.
+    Answers 304 when the client's ETag is still current.
     """
-    return get_dashboard_kpis(db, vehicle_type=vehicle_type, status_filter=status, region=region)
+    if unchanged := await not_modified(db, request, response, KPI_TABLES):
+        return unchanged
+    return await get_dashboard_kpis(db, vehicle_type=vehicle_type, status_filter=status, region=region)
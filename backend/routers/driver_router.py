@@ -1,81 +1,91 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import get_db
 from middleware import require_roles
 from models.user import User
 from schemas.driver import DriverCreate, DriverUpdate, DriverOut
+from schemas.pagination import Page
+from config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from services.driver_service import (
     get_all_drivers, get_driver_by_id, create_driver,
     update_driver, delete_driver, enrich_driver,
 )
 from services.audit_service import log_action, Actions
+from services.etag_service import not_modified
+from responses import page_response
 
 router = APIRouter(prefix="/api/drivers", tags=["Drivers"])
 
 READ_ROLES = ["fleet_manager", "dispatcher", "safety_officer"]
 WRITE_ROLES = ["safety_officer"]
+LIST_TABLES = ("drivers",)  # ETag dependencies of the driver list
 
 
-@router.get("/", response_model=List[DriverOut])
-def list_drivers(
+@router.get("/", response_model=Page[DriverOut])
+async def list_drivers(
+    request: Request,
+    response: Response,
     status: str = Query(None),
     search: str = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: str = Query(None, description="Cursor from a previous page's next_cursor"),
     current_user: User = Depends(require_roles(READ_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    drivers = get_all_drivers(db, status_filter=status, search=search)
-    return [enrich_driver(d) for d in drivers]
+    if unchanged := await not_modified(db, request, response, LIST_TABLES):
+        return unchanged
+    drivers, next_cursor = await get_all_drivers(db, status_filter=status, search=search, limit=limit, after=after)
+    return page_response([enrich_driver(d) for d in drivers], next_cursor, response)
 
 
 @router.get("/{driver_id}", response_model=DriverOut)
-def get_driver(
+async def get_driver(
     driver_id: int,
     current_user: User = Depends(require_roles(READ_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    driver = get_driver_by_id(db, driver_id)
+    driver = await get_driver_by_id(db, driver_id)
     return enrich_driver(driver)
 
 
 @router.post("/", response_model=DriverOut, status_code=201)
-def add_driver(
+async def add_driver(
     data: DriverCreate,
     current_user: User = Depends(require_roles(WRITE_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    driver = create_driver(db, data)
-    log_action(db, current_user.id, Actions.CREATE_DRIVER, "driver", driver.id,
-               f"Created driver {driver.full_name} ({driver.license_number})")
-    db.commit()
-    db.refresh(driver)
+    driver = await create_driver(db, data)
+    await log_action(db, current_user.id, Actions.CREATE_DRIVER, "driver", driver.id,
+                     f"Created driver {driver.full_name} ({driver.license_number})")
+    await db.commit()
+    await db.refresh(driver)
     return enrich_driver(driver)
 
 
 @router.put("/{driver_id}", response_model=DriverOut)
-def edit_driver(
+async def edit_driver(
     driver_id: int,
     data: DriverUpdate,
     current_user: User = Depends(require_roles(WRITE_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    driver = update_driver(db, driver_id, data)
-    log_action(db, current_user.id, Actions.UPDATE_DRIVER, "driver", driver.id,
-               f"Updated driver {driver.full_name}")
-    db.commit()
-    db.refresh(driver)
+    driver = await update_driver(db, driver_id, data)
+    await log_action(db, current_user.id, Actions.UPDATE_DRIVER, "driver", driver.id,
+                     f"Updated driver {driver.full_name}")
+    await db.commit()
+    await db.refresh(driver)
     return enrich_driver(driver)
 
 
 @router.delete("/{driver_id}")
-def remove_driver(
+async def remove_driver(
     driver_id: int,
     current_user: User = Depends(require_roles(WRITE_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    result = delete_driver(db, driver_id)
-    log_action(db, current_user.id, Actions.DELETE_DRIVER, "driver", driver_id,
-               f"Deleted driver #{driver_id}")
-    db.commit()
+    result = await delete_driver(db, driver_id)
+    await log_action(db, current_user.id, Actions.DELETE_DRIVER, "driver", driver_id,
+                     f"Deleted driver #{driver_id}")
+    await db.commit()
     return result
@@ -1,18 +1,24 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, File, Query, UploadFile
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
 
 from database import get_db
 from middleware import require_roles
 from models.user import User
-from schemas.finance import FuelLogCreate, FuelLogOut, ExpenseCreate, ExpenseOut
+from schemas.finance import FuelLogCreate, FuelLogOut, ExpenseCreate, ExpenseOut, ImportResult
+from schemas.pagination import Page
+from config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from services.finance_service import (
-    get_all_fuel_logs, create_fuel_log, delete_fuel_log, enrich_fuel_log,
-    get_all_expenses, create_expense, delete_expense, enrich_expense,
+    get_all_fuel_logs, create_fuel_log, delete_fuel_log, enrich_fuel_log, enrich_fuel_logs,
+    get_all_expenses, create_expense, delete_expense, enrich_expense, enrich_expenses,
     get_financial_summary, get_monthly_summary,
     get_top_expensive_vehicles, get_idle_vehicles,
 )
 from services.audit_service import log_action, Actions
+from services.export_service import export_response
+from services.import_service import import_csv
+from responses import page_response
+from metrics import fuel_logs_ingested
 
 router = APIRouter(prefix="/api/finance", tags=["Finance"])
 
@@ -22,115 +28,174 @@ ANALYTICS_ROLES = ["fleet_manager", "financial_analyst"]
 
 
 
-@router.get("/fuel-logs", response_model=List[FuelLogOut])
-def list_fuel_logs(
+@router.get("/fuel-logs", response_model=Page[FuelLogOut])
+async def list_fuel_logs(
     vehicle_id: int = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: str = Query(None, description="Cursor from a previous page's next_cursor"),
     current_user: User = Depends(require_roles(FUEL_READ_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    logs = get_all_fuel_logs(db, vehicle_id=vehicle_id)
-    return [enrich_fuel_log(db, l) for l in logs]
+    logs, next_cursor = await get_all_fuel_logs(db, vehicle_id=vehicle_id, limit=limit, after=after)
+    return page_response(await enrich_fuel_logs(db, logs), next_cursor)
+
+
+@router.get("/fuel-logs/export")
+async def export_fuel_logs(
+    format: str = Query("csv", description="csv | ndjson"),
+    date_from: date = Query(None),
+    date_to: date = Query(None),
+    vehicle_id: int = Query(None),
+    current_user: User = Depends(require_roles(FUEL_READ_ROLES)),
+):
+    """Stream full fuel log history as CSV or NDJSON."""
+    return export_response("fuel_logs", format, date_from=date_from, date_to=date_to, vehicle_id=vehicle_id)
 
 
 @router.post("/fuel-logs", response_model=FuelLogOut, status_code=201)
-def add_fuel_log(
+async def add_fuel_log(
     data: FuelLogCreate,
     current_user: User = Depends(require_roles(FUEL_WRITE_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    log = create_fuel_log(db, data)
-    log_action(db, current_user.id, Actions.CREATE_FUEL_LOG, "fuel_log", log.id,
-               f"Added fuel log for vehicle #{log.vehicle_id}: {log.liters}L, ${log.cost}")
-    db.commit()
-    db.refresh(log)
-    return enrich_fuel_log(db, log)
+    log = await create_fuel_log(db, data)
+    await log_action(db, current_user.id, Actions.CREATE_FUEL_LOG, "fuel_log", log.id,
+                     f"Added fuel log for vehicle #{log.vehicle_id}: {log.liters}L, ${log.cost}")
+    await db.commit()
+    fuel_logs_ingested.inc(source="api")
+    await db.refresh(log)
+    return await enrich_fuel_log(db, log)
+
+
+@router.post("/fuel-logs/import", response_model=ImportResult)
+async def import_fuel_logs(
+    file: UploadFile = File(..., description="CSV with columns vehicle_id, date, liters, cost[, odometer_reading, trip_id]"),
+    current_user: User = Depends(require_roles(FUEL_WRITE_ROLES)),
+    db: AsyncSession = Depends(get_db),
+):
+    """Bulk-import fuel card transactions; valid rows are stored, invalid rows are reported."""
+    report = await import_csv(db, "fuel_logs", file, current_user.id)
+    fuel_logs_ingested.inc(report["imported"], source="import")
+    return report
 
 
 @router.delete("/fuel-logs/{log_id}")
-def remove_fuel_log(
+async def remove_fuel_log(
     log_id: int,
     current_user: User = Depends(require_roles(FUEL_WRITE_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    result = delete_fuel_log(db, log_id)
-    log_action(db, current_user.id, Actions.DELETE_FUEL_LOG, "fuel_log", log_id,
-               f"Deleted fuel log #{log_id}")
-    db.commit()
+    result = await delete_fuel_log(db, log_id)
+    await log_action(db, current_user.id, Actions.DELETE_FUEL_LOG, "fuel_log", log_id,
+                     f"Deleted fuel log #{log_id}")
+    await db.commit()
     return result
 
 
 
-@router.get("/expenses", response_model=List[ExpenseOut])
-def list_expenses(
+@router.get("/expenses", response_model=Page[ExpenseOut])
+async def list_expenses(
     vehicle_id: int = Query(None),
     category: str = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: str = Query(None, description="Cursor from a previous page's next_cursor"),
     current_user: User = Depends(require_roles(FUEL_READ_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    expenses = get_all_expenses(db, vehicle_id=vehicle_id, category=category)
-    return [enrich_expense(db, e) for e in expenses]
+    expenses, next_cursor = await get_all_expenses(db, vehicle_id=vehicle_id, category=category, limit=limit, after=after)
+    return page_response(await enrich_expenses(db, expenses), next_cursor)
+
+
+@router.get("/expenses/export")
+async def export_expenses(
+    format: str = Query("csv", description="csv | ndjson"),
+    date_from: date = Query(None),
+    date_to: date = Query(None),
+    vehicle_id: int = Query(None),
+    current_user: User = Depends(require_roles(FUEL_READ_ROLES)),
+):
+    """Stream full expense history as CSV or NDJSON."""
+    return export_response("expenses", format, date_from=date_from, date_to=date_to, vehicle_id=vehicle_id)
 
 
 @router.post("/expenses", response_model=ExpenseOut, status_code=201)
-def add_expense(
+async def add_expense(
     data: ExpenseCreate,
     current_user: User = Depends(require_roles(FUEL_WRITE_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
+):
+    expense = await create_expense(db, data)
+    await log_action(db, current_user.id, Actions.CREATE_EXPENSE, "expense", expense.id,
+                     f"Added expense for vehicle #{expense.vehicle_id}: ${expense.amount} ({expense.category})")
+    await db.commit()
+    await db.refresh(expense)
+    return await enrich_expense(db, expense)
+
+
+@router.post("/expenses/import", response_model=ImportResult)
+async def import_expenses(
+    file: UploadFile = File(..., description="CSV with columns vehicle_id, category, amount, date[, description, trip_id]"),
+    current_user: User = Depends(require_roles(FUEL_WRITE_ROLES)),
+    db: AsyncSession = Depends(get_db),
 ):
-    expense = create_expense(db, data)
-    log_action(db, current_user.id, Actions.CREATE_EXPENSE, "expense", expense.id,
-               f"Added expense for vehicle #{expense.vehicle_id}: ${expense.amount} ({expense.category})")
-    db.commit()
-    db.refresh(expense)
-    return enrich_expense(db, expense)
+    """Bulk-import expenses; valid rows are stored, invalid rows are reported."""
+    return await import_csv(db, "expenses", file, current_user.id)
 
 
 @router.delete("/expenses/{expense_id}")
-def remove_expense(
+async def remove_expense(
     expense_id: int,
     current_user: User = Depends(require_roles(FUEL_WRITE_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    result = delete_expense(db, expense_id)
-    log_action(db, current_user.id, Actions.DELETE_EXPENSE, "expense", expense_id,
-               f"Deleted expense #{expense_id}")
-    db.commit()
+    result = await delete_expense(db, expense_id)
+    await log_action(db, current_user.id, Actions.DELETE_EXPENSE, "expense", expense_id,
+                     f"Deleted expense #{expense_id}")
+    await db.commit()
     return result
 
 
 
 @router.get("/summary")
-def financial_summary(
+async def financial_summary(
     current_user: User = Depends(require_roles(ANALYTICS_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Overall financial summary – fuel, maintenance, revenue, ROI."""
-    return get_financial_summary(db)
+    return await get_financial_summary(db)
 
 
 @router.get("/monthly")
-def monthly_summary(
+async def monthly_summary(
+    vehicle_id: int = Query(None),
+    region: str = Query(None),
     current_user: User = Depends(require_roles(ANALYTICS_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    """Monthly breakdown of revenue, costs, profit."""
-    return get_monthly_summary(db)
+    """Monthly breakdown of revenue, costs, profit – fleet-wide, or for one vehicle / region."""
+    return await get_monthly_summary(db, vehicle_id=vehicle_id, region=region)
 
 
 @router.get("/top-expensive")
-def top_expensive(
+async def top_expensive(
     limit: int = Query(5, ge=1, le=20),
+    date_from: date = Query(None),
+    date_to: date = Query(None),
+    region: str = Query(None),
+    vehicle_type: str = Query(None),
     current_user: User = Depends(require_roles(ANALYTICS_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    """Top N most expensive vehicles by total operational cost."""
-    return get_top_expensive_vehicles(db, limit=limit)
+    """Top N most expensive vehicles by total operational cost, optionally sliced by date, region and type."""
+    return await get_top_expensive_vehicles(db, limit=limit, date_from=date_from, date_to=date_to,
+                                            region=region, vehicle_type=vehicle_type)
 
 
 @router.get("/idle-vehicles")
-def idle_vehicles(
+async def idle_vehicles(
+    days: int = Query(30, ge=1, le=3650, description="Idle window in days"),
     current_user: User = Depends(require_roles(ANALYTICS_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    """Dead stock – available vehicles with no trips in last 30 days."""
-    return get_idle_vehicles(db)
+    """Dead stock – available vehicles with no trips in the last `days` days."""
+    return await get_idle_vehicles(db, days=days)
@@ -1,16 +1,18 @@
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import get_db
 from middleware import require_roles
 from models.user import User
 from schemas.maintenance import MaintenanceLogCreate, MaintenanceLogUpdate, MaintenanceLogOut
+from schemas.pagination import Page
+from config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from services.maintenance_service import (
     get_all_logs, get_log_by_id, create_log,
-    update_log, delete_log, enrich_log,
+    update_log, delete_log, enrich_log, enrich_logs,
 )
 from services.audit_service import log_action, Actions
+from responses import page_response
 
 router = APIRouter(prefix="/api/maintenance", tags=["Maintenance"])
 
@@ -18,69 +20,71 @@ READ_ROLES = ["fleet_manager", "financial_analyst"]
 WRITE_ROLES = ["fleet_manager"]
 
 
-@router.get("/", response_model=List[MaintenanceLogOut])
-def list_logs(
+@router.get("/", response_model=Page[MaintenanceLogOut])
+async def list_logs(
     vehicle_id: int = Query(None),
     status: str = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: str = Query(None, description="Cursor from a previous page's next_cursor"),
     current_user: User = Depends(require_roles(READ_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    logs = get_all_logs(db, vehicle_id=vehicle_id, status_filter=status)
-    return [enrich_log(db, l) for l in logs]
+    logs, next_cursor = await get_all_logs(db, vehicle_id=vehicle_id, status_filter=status, limit=limit, after=after)
+    return page_response(await enrich_logs(db, logs), next_cursor)
 
 
 @router.get("/{log_id}", response_model=MaintenanceLogOut)
-def get_log(
+async def get_log(
     log_id: int,
     current_user: User = Depends(require_roles(READ_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    log = get_log_by_id(db, log_id)
-    return enrich_log(db, log)
+    log = await get_log_by_id(db, log_id)
+    return await enrich_log(db, log)
 
 
 @router.post("/", response_model=MaintenanceLogOut, status_code=201)
-def add_log(
+async def add_log(
     data: MaintenanceLogCreate,
     current_user: User = Depends(require_roles(WRITE_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Create maintenance log → vehicle automatically set to 'In Shop'."""
-    log = create_log(db, data)
-    log_action(db, current_user.id, Actions.CREATE_MAINTENANCE, "maintenance", log.id,
-               f"Created maintenance log for vehicle #{log.vehicle_id}: {log.issue}")
-    db.commit()
-    db.refresh(log)
-    return enrich_log(db, log)
+    log = await create_log(db, data)
+    await log_action(db, current_user.id, Actions.CREATE_MAINTENANCE, "maintenance", log.id,
+                     f"Created maintenance log for vehicle #{log.vehicle_id}: {log.issue}")
+    await db.commit()
+    await db.refresh(log)
+    return await enrich_log(db, log)
 
 
 @router.put("/{log_id}", response_model=MaintenanceLogOut)
-def edit_log(
+async def edit_log(
     log_id: int,
     data: MaintenanceLogUpdate,
     current_user: User = Depends(require_roles(WRITE_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Update log. Resolving releases vehicle if no other open logs."""
-    old_log = get_log_by_id(db, log_id)
+    old_log = await get_log_by_id(db, log_id)
     old_status = old_log.status
-    log = update_log(db, log_id, data)
+    log = await update_log(db, log_id, data)
     action = Actions.RESOLVE_MAINTENANCE if log.status == "Resolved" and old_status != "Resolved" else Actions.UPDATE_MAINTENANCE
-    log_action(db, current_user.id, action, "maintenance", log.id,
-               f"{'Resolved' if action == Actions.RESOLVE_MAINTENANCE else 'Updated'} maintenance log #{log.id}")
-    db.commit()
-    db.refresh(log)
-    return enrich_log(db, log)
+    await log_action(db, current_user.id, action, "maintenance", log.id,
+                     f"{'Resolved' if action == Actions.RESOLVE_MAINTENANCE else 'Updated'} maintenance log #{log.id}")
+    await db.commit()
+    await db.refresh(log)
+    return await enrich_log(db, log)
 
 
 @router.delete("/{log_id}")
-def remove_log(
+async def remove_log(
     log_id: int,
     current_user: User = Depends(require_roles(WRITE_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    result = delete_log(db, log_id)
-    log_action(db, current_user.id, Actions.DELETE_MAINTENANCE, "maintenance", log_id,
-               f"Deleted maintenance log #{log_id}")
-    db.commit()
+    result = await delete_log(db, log_id)
+    await log_action(db, current_user.id, Actions.DELETE_MAINTENANCE, "maintenance", log_id,
+                     f"Deleted maintenance log #{log_id}")
+    await db.commit()
     return result
@@ -1,100 +1,192 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date
 
 from database import get_db
 from middleware import require_roles
 from models.user import User
-from schemas.trip import TripCreate, TripUpdate, TripComplete, TripOut
+from schemas.trip import (
+    TripCreate, TripUpdate, TripComplete, TripOut,
+    TripBatchCreate, TripBatchDispatch, TripBatchResult,
+    TripAssignmentRequest, TripAssignmentResult,
+)
+from schemas.pagination import Page
+from config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from services.trip_service import (
     get_all_trips, get_trip_by_id, create_trip,
-    dispatch_trip, complete_trip, cancel_trip, enrich_trip,
+    dispatch_trip, complete_trip, cancel_trip, enrich_trip, enrich_trips,
+    create_trips_batch, dispatch_trips_batch,
 )
+from services.assignment_service import optimize_assignment, planned_trips
 from services.audit_service import log_action, Actions
+from services.export_service import export_response
+from services.etag_service import not_modified
+from responses import page_response
+from metrics import trip_events
 
 router = APIRouter(prefix="/api/trips", tags=["Trips"])
 
 READ_ROLES = ["fleet_manager", "dispatcher", "financial_analyst"]
 WRITE_ROLES = ["dispatcher"]
+LIST_TABLES = ("trips", "vehicles", "drivers")  # ETag dependencies (trips + joined names)
 
 
-@router.get("/", response_model=List[TripOut])
-def list_trips(
+@router.get("/", response_model=Page[TripOut])
+async def list_trips(
+    request: Request,
+    response: Response,
     status: str = Query(None),
     search: str = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: str = Query(None, description="Cursor from a previous page's next_cursor"),
+    current_user: User = Depends(require_roles(READ_ROLES)),
+    db: AsyncSession = Depends(get_db),
+):
+    if unchanged := await not_modified(db, request, response, LIST_TABLES):
+        return unchanged
+    trips, next_cursor = await get_all_trips(db, status_filter=status, search=search, limit=limit, after=after)
+    return page_response(await enrich_trips(db, trips), next_cursor, response)
+
+
+@router.get("/export")
+async def export_trips(
+    format: str = Query("csv", description="csv | ndjson"),
+    date_from: date = Query(None),
+    date_to: date = Query(None),
+    vehicle_id: int = Query(None),
     current_user: User = Depends(require_roles(READ_ROLES)),
-    db: Session = Depends(get_db),
 ):
-    trips = get_all_trips(db, status_filter=status, search=search)
-    return [enrich_trip(db, t) for t in trips]
+    """Stream full trip history as CSV or NDJSON, filtered by creation date and vehicle."""
+    return export_response("trips", format, date_from=date_from, date_to=date_to, vehicle_id=vehicle_id)
 
 
 @router.get("/{trip_id}", response_model=TripOut)
-def get_trip(
+async def get_trip(
     trip_id: int,
     current_user: User = Depends(require_roles(READ_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    trip = get_trip_by_id(db, trip_id)
-    return enrich_trip(db, trip)
+    trip = await get_trip_by_id(db, trip_id)
+    return await enrich_trip(db, trip)
 
 
 @router.post("/", response_model=TripOut, status_code=201)
-def add_trip(
+async def add_trip(
     data: TripCreate,
     current_user: User = Depends(require_roles(WRITE_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Create a new trip in Draft status. Validates capacity + driver eligibility."""
-    trip = create_trip(db, data)
-    log_action(db, current_user.id, Actions.CREATE_TRIP, "trip", trip.id,
-               f"Created trip {trip.origin}→{trip.destination} vehicle={trip.vehicle_id} driver={trip.driver_id}")
-    db.commit()
-    db.refresh(trip)
-    return enrich_trip(db, trip)
+    trip = await create_trip(db, data)
+    await log_action(db, current_user.id, Actions.CREATE_TRIP, "trip", trip.id,
+                     f"Created trip {trip.origin}→{trip.destination} vehicle={trip.vehicle_id} driver={trip.driver_id}")
+    await db.commit()
+    trip_events.inc(event="created")
+    await db.refresh(trip)
+    return await enrich_trip(db, trip)
+
+
+@router.post("/batch", response_model=TripBatchResult, status_code=201)
+async def add_trips_batch(
+    data: TripBatchCreate,
+    current_user: User = Depends(require_roles(WRITE_ROLES)),
+    db: AsyncSession = Depends(get_db),
+):
+    """Create several Draft trips in one transaction. Any invalid item rejects the whole batch (400)."""
+    trips = await create_trips_batch(db, data.trips)
+    for trip in trips:
+        await log_action(db, current_user.id, Actions.CREATE_TRIP, "trip", trip.id,
+                         f"Created trip {trip.origin}→{trip.destination} vehicle={trip.vehicle_id} "
+                         f"driver={trip.driver_id} (batch)")
+    await db.commit()
+    trip_events.inc(len(trips), event="created")
+    return {"results": [{"index": i, "trip": t} for i, t in enumerate(await enrich_trips(db, trips))]}
+
+
+@router.post("/dispatch-batch", response_model=TripBatchResult)
+async def dispatch_batch(
+    data: TripBatchDispatch,
+    current_user: User = Depends(require_roles(WRITE_ROLES)),
+    db: AsyncSession = Depends(get_db),
+):
+    """Dispatch several Draft trips in one transaction. Any invalid item rejects the whole batch (400)."""
+    trips = await dispatch_trips_batch(db, data.trip_ids)
+    for trip in trips:
+        await log_action(db, current_user.id, Actions.DISPATCH_TRIP, "trip", trip.id,
+                         f"Dispatched trip {trip.origin}→{trip.destination} (batch)")
+    await db.commit()
+    trip_events.inc(len(trips), event="dispatched")
+    return {"results": [{"index": i, "trip": t} for i, t in enumerate(await enrich_trips(db, trips))]}
+
+
+@router.post("/optimize-assignment", response_model=TripAssignmentResult)
+async def optimize_trip_assignment(
+    data: TripAssignmentRequest,
+    current_user: User = Depends(require_roles(WRITE_ROLES)),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Propose a vehicle and driver for each cargo job (least wasted capacity,
+    safest drivers on the heaviest loads). With create=true the assigned jobs
+    are created as Draft trips in one transaction.
+    """
+    plan = await optimize_assignment(db, data.jobs)
+    if data.create and plan["assignments"]:
+        trips = await create_trips_batch(db, planned_trips(data.jobs, plan))
+        for assignment, trip in zip(plan["assignments"], trips):
+            assignment["trip_id"] = trip.id
+            await log_action(db, current_user.id, Actions.CREATE_TRIP, "trip", trip.id,
+                             f"Created trip {trip.origin}→{trip.destination} vehicle={trip.vehicle_id} "
+                             f"driver={trip.driver_id} (optimized)")
+        await db.commit()
+        trip_events.inc(len(trips), event="created")
+    return plan
 
 
 @router.post("/{trip_id}/dispatch", response_model=TripOut)
-def dispatch(
+async def dispatch(
     trip_id: int,
     current_user: User = Depends(require_roles(WRITE_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Dispatch a draft trip → sets vehicle/driver to On Trip. ATOMIC commit."""
-    trip = dispatch_trip(db, trip_id)
-    log_action(db, current_user.id, Actions.DISPATCH_TRIP, "trip", trip.id,
-               f"Dispatched trip {trip.origin}→{trip.destination}")
-    db.commit()
-    db.refresh(trip)
-    return enrich_trip(db, trip)
+    trip = await dispatch_trip(db, trip_id)
+    await log_action(db, current_user.id, Actions.DISPATCH_TRIP, "trip", trip.id,
+                     f"Dispatched trip {trip.origin}→{trip.destination}")
+    await db.commit()
+    trip_events.inc(event="dispatched")
+    await db.refresh(trip)
+    return await enrich_trip(db, trip)
 
 
 @router.post("/{trip_id}/complete", response_model=TripOut)
-def complete(
+async def complete(
     trip_id: int,
     data: TripComplete,
     current_user: User = Depends(require_roles(WRITE_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Complete a dispatched trip → resets vehicle/driver, updates odometer. ATOMIC commit."""
-    trip = complete_trip(db, trip_id, data)
-    log_action(db, current_user.id, Actions.COMPLETE_TRIP, "trip", trip.id,
-               f"Completed trip {trip.origin}→{trip.destination} distance={data.distance}km")
-    db.commit()
-    db.refresh(trip)
-    return enrich_trip(db, trip)
+    trip = await complete_trip(db, trip_id, data)
+    await log_action(db, current_user.id, Actions.COMPLETE_TRIP, "trip", trip.id,
+                     f"Completed trip {trip.origin}→{trip.destination} distance={data.distance}km")
+    await db.commit()
+    trip_events.inc(event="completed")
+    await db.refresh(trip)
+    return await enrich_trip(db, trip)
 
 
 @router.post("/{trip_id}/cancel", response_model=TripOut)
-def cancel(
+async def cancel(
     trip_id: int,
     current_user: User = Depends(require_roles(WRITE_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Cancel a trip (draft or dispatched). ATOMIC commit."""
-    trip = cancel_trip(db, trip_id)
-    log_action(db, current_user.id, Actions.CANCEL_TRIP, "trip", trip.id,
-               f"Cancelled trip {trip.origin}→{trip.destination}")
-    db.commit()
-    db.refresh(trip)
-    return enrich_trip(db, trip)
+    trip = await cancel_trip(db, trip_id)
+    await log_action(db, current_user.id, Actions.CANCEL_TRIP, "trip", trip.id,
+                     f"Cancelled trip {trip.origin}→{trip.destination}")
+    await db.commit()
+    trip_events.inc(event="cancelled")
+    await db.refresh(trip)
+    return await enrich_trip(db, trip)
@@ -1,97 +1,109 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import get_db
 from middleware import require_roles, get_current_user
 from models.user import User
 from schemas.vehicle import VehicleCreate, VehicleUpdate, VehicleOut
+from schemas.pagination import Page
+from config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from services.vehicle_service import (
     get_all_vehicles, get_vehicle_by_id, create_vehicle,
-    update_vehicle, retire_vehicle, delete_vehicle, enrich_vehicle,
+    update_vehicle, retire_vehicle, delete_vehicle, enrich_vehicle, enrich_vehicles,
 )
 from services.audit_service import log_action, Actions
+from services.etag_service import not_modified
+from responses import page_response
 
 router = APIRouter(prefix="/api/vehicles", tags=["Vehicles"])
 
 READ_ROLES = ["fleet_manager", "dispatcher", "financial_analyst"]
 WRITE_ROLES = ["fleet_manager"]
+# tables the enriched vehicle list is built from (ETag)
+LIST_TABLES = ("vehicles", "trips", "fuel_logs", "maintenance_logs", "expenses")
 
 
-@router.get("/", response_model=List[VehicleOut])
-def list_vehicles(
+@router.get("/", response_model=Page[VehicleOut])
+async def list_vehicles(
+    request: Request,
+    response: Response,
     vehicle_type: str = Query(None),
     status: str = Query(None),
     region: str = Query(None),
     search: str = Query(None),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: str = Query(None, description="Cursor from a previous page's next_cursor"),
     current_user: User = Depends(require_roles(READ_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    vehicles = get_all_vehicles(db, vehicle_type=vehicle_type, status_filter=status, region=region, search=search)
-    return [enrich_vehicle(db, v) for v in vehicles]
+    if unchanged := await not_modified(db, request, response, LIST_TABLES):
+        return unchanged
+    vehicles, next_cursor = await get_all_vehicles(db, vehicle_type=vehicle_type, status_filter=status, region=region,
+                                                   search=search, limit=limit, after=after)
+    return page_response(await enrich_vehicles(db, vehicles), next_cursor, response)
 
 
 @router.get("/{vehicle_id}", response_model=VehicleOut)
-def get_vehicle(
+async def get_vehicle(
     vehicle_id: int,
     current_user: User = Depends(require_roles(READ_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    vehicle = get_vehicle_by_id(db, vehicle_id)
-    return enrich_vehicle(db, vehicle)
+    vehicle = await get_vehicle_by_id(db, vehicle_id)
+    return await enrich_vehicle(db, vehicle)
 
 
 @router.post("/", response_model=VehicleOut, status_code=201)
-def add_vehicle(
+async def add_vehicle(
     data: VehicleCreate,
     current_user: User = Depends(require_roles(WRITE_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    vehicle = create_vehicle(db, data)
-    log_action(db, current_user.id, Actions.CREATE_VEHICLE, "vehicle", vehicle.id,
-               f"Created vehicle {vehicle.name} ({vehicle.license_plate})")
-    db.commit()
-    db.refresh(vehicle)
-    return enrich_vehicle(db, vehicle)
+    vehicle = await create_vehicle(db, data)
+    await log_action(db, current_user.id, Actions.CREATE_VEHICLE, "vehicle", vehicle.id,
+                     f"Created vehicle {vehicle.name} ({vehicle.license_plate})")
+    await db.commit()
+    await db.refresh(vehicle)
+    return await enrich_vehicle(db, vehicle)
 
 
 @router.put("/{vehicle_id}", response_model=VehicleOut)
-def edit_vehicle(
+async def edit_vehicle(
     vehicle_id: int,
     data: VehicleUpdate,
     current_user: User = Depends(require_roles(WRITE_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    vehicle = update_vehicle(db, vehicle_id, data)
-    log_action(db, current_user.id, Actions.UPDATE_VEHICLE, "vehicle", vehicle.id,
-               f"Updated vehicle {vehicle.name}")
-    db.commit()
-    db.refresh(vehicle)
-    return enrich_vehicle(db, vehicle)
+    vehicle = await update_vehicle(db, vehicle_id, data)
+    await log_action(db, current_user.id, Actions.UPDATE_VEHICLE, "vehicle", vehicle.id,
+                     f"Updated vehicle {vehicle.name}")
+    await db.commit()
+    await db.refresh(vehicle)
+    return await enrich_vehicle(db, vehicle)
 
 
 @router.post("/{vehicle_id}/retire", response_model=VehicleOut)
-def retire(
+async def retire(
     vehicle_id: int,
     current_user: User = Depends(require_roles(WRITE_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    vehicle = retire_vehicle(db, vehicle_id)
-    log_action(db, current_user.id, Actions.RETIRE_VEHICLE, "vehicle", vehicle.id,
-               f"Retired vehicle {vehicle.name}")
-    db.commit()
-    db.refresh(vehicle)
-    return enrich_vehicle(db, vehicle)
+    vehicle = await retire_vehicle(db, vehicle_id)
+    await log_action(db, current_user.id, Actions.RETIRE_VEHICLE, "vehicle", vehicle.id,
+                     f"Retired vehicle {vehicle.name}")
+    await db.commit()
+    await db.refresh(vehicle)
+    return await enrich_vehicle(db, vehicle)
 
 
 @router.delete("/{vehicle_id}")
-def remove_vehicle(
+async def remove_vehicle(
     vehicle_id: int,
     current_user: User = Depends(require_roles(WRITE_ROLES)),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    result = delete_vehicle(db, vehicle_id)
-    log_action(db, current_user.id, Actions.DELETE_VEHICLE, "vehicle", vehicle_id,
-               result["detail"])
-    db.commit()
+    result = await delete_vehicle(db, vehicle_id)
+    await log_action(db, current_user.id, Actions.DELETE_VEHICLE, "vehicle", vehicle_id,
+                     result["detail"])
+    await db.commit()
     return result
@@ -34,6 +34,7 @@ class DriverOut(BaseModel):
     completion_rate: float
     total_trips: int
     completed_trips: int
+    cancelled_trips: int = 0
     complaints: int
     status: str
     created_at: Optional[datetime] = None
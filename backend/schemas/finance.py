@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import date, datetime
 
 
@@ -49,3 +49,16 @@ class ExpenseOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class ImportRowError(BaseModel):
+    row: int                  # CSV line number (header is line 1)
+    errors: List[str]
+
+
+class ImportResult(BaseModel):
+    imported: int
+    failed: int
+    batches: int
+    errors: List[ImportRowError]
+    errors_truncated: bool = False
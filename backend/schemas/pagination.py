@@ -0,0 +1,13 @@
+"""
+Pydantic schemas for paginated list responses.
+"""
+from pydantic import BaseModel
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """Envelope for keyset-paginated lists. Pass next_cursor as `after` to fetch the next page."""
+    items: List[T]
+    next_cursor: Optional[str] = None
@@ -1,11 +1,11 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import date, datetime
+from config import TRIP_BATCH_MAX_ITEMS
 
 
-class TripCreate(BaseModel):
-    vehicle_id: int
-    driver_id: int
+class TripJob(BaseModel):
+    """A cargo job: everything a trip needs except its vehicle and driver."""
     cargo_weight: float = Field(gt=0)
     origin: str
     destination: str
@@ -15,6 +15,11 @@ class TripCreate(BaseModel):
     scheduled_date: Optional[date] = None
 
 
+class TripCreate(TripJob):
+    vehicle_id: int
+    driver_id: int
+
+
 class TripUpdate(BaseModel):
     cargo_weight: Optional[float] = None
     origin: Optional[str] = None
@@ -36,6 +41,16 @@ class TripComplete(BaseModel):
     revenue: Optional[float] = None
 
 
+class TripBatchCreate(BaseModel):
+    """Payload for creating several draft trips atomically."""
+    trips: List[TripCreate] = Field(min_length=1, max_length=TRIP_BATCH_MAX_ITEMS)
+
+
+class TripBatchDispatch(BaseModel):
+    """Payload for dispatching several draft trips atomically."""
+    trip_ids: List[int] = Field(min_length=1, max_length=TRIP_BATCH_MAX_ITEMS)
+
+
 class TripOut(BaseModel):
     id: int
     vehicle_id: int
@@ -56,3 +71,41 @@ class TripOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class TripBatchItem(BaseModel):
+    index: int                # position in the request list
+    trip: TripOut
+
+
+class TripBatchResult(BaseModel):
+    results: List[TripBatchItem]
+
+
+class TripAssignmentRequest(BaseModel):
+    """Cargo jobs to plan; with create=true the planned jobs become Draft trips."""
+    jobs: List[TripJob] = Field(min_length=1, max_length=TRIP_BATCH_MAX_ITEMS)
+    create: bool = False
+
+
+class TripAssignment(BaseModel):
+    index: int                # position in the request's jobs list
+    vehicle_id: int
+    vehicle_name: str
+    max_capacity: float
+    wasted_capacity: float
+    driver_id: int
+    driver_name: str
+    safety_score: float
+    trip_id: Optional[int] = None   # set when the draft trip was created
+
+
+class UnassignedJob(BaseModel):
+    index: int
+    reason: str
+
+
+class TripAssignmentResult(BaseModel):
+    assignments: List[TripAssignment]
+    unassigned: List[UnassignedJob]
+    total_wasted_capacity: float
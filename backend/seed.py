@@ -9,6 +9,7 @@ from models.trip import Trip
 from models.maintenance import MaintenanceLog
 from models.fuel_log import FuelLog
 from models.expense import Expense
+from services.rollup_service import rebuild_monthly_rollup
 
 
 def seed():
@@ -155,6 +156,9 @@ def seed():
             Expense(vehicle_id=3, category="Insurance", description="Monthly premium", amount=200, date=date(2026, 1, 1)),
         ]
         db.add_all(expenses)
+        db.flush()
+
+        rebuild_monthly_rollup(db)
 
         db.commit()
         print("Database seeded successfully!")
@@ -0,0 +1,114 @@
+"""
+Assignment service – proposes a vehicle and a driver for each cargo job.
+
+Candidates are loaded with two column-only queries: Available vehicles and
+eligible drivers (On Duty, valid license), both excluding anyone on a
+Dispatched trip. Any vehicle with enough capacity can carry a job, so the
+feasible vehicles of a lighter job always include those of a heavier one.
+For that structure, taking jobs heaviest first and giving each the smallest
+vehicle that still fits (best-fit decreasing, a bisect on capacity-sorted
+vehicles) assigns the maximum number of jobs with the minimum total wasted
+capacity – the same optimum a full cost-matrix assignment would reach, in
+O(jobs · log vehicles) plus list removals. Drivers carry no vehicle
+constraints, so the safest drivers are simply paired with the heaviest loads.
+"""
+import logging
+from bisect import bisect_left
+from datetime import date
+from sqlalchemy import select, exists
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.trip import Trip, TripStatus
+from models.vehicle import Vehicle, VehicleStatus
+from models.driver import Driver, DriverStatus
+from schemas.trip import TripCreate
+
+logger = logging.getLogger("fleet.assignment")
+
+
+def _on_dispatched_trip(column):
+    return exists().where(Trip.status == TripStatus.DISPATCHED.value, column)
+
+
+async def _candidate_vehicles(db: AsyncSession) -> list:
+    """(id, name, max_capacity) rows of assignable vehicles, smallest capacity first."""
+    return (await db.execute(
+        select(Vehicle.id, Vehicle.name, Vehicle.max_capacity).where(
+            Vehicle.status == VehicleStatus.AVAILABLE.value,
+            ~_on_dispatched_trip(Trip.vehicle_id == Vehicle.id),
+        ).order_by(Vehicle.max_capacity, Vehicle.id)
+    )).all()
+
+
+async def _candidate_drivers(db: AsyncSession, limit: int) -> list:
+    """(id, full_name, safety_score) rows of the `limit` safest eligible drivers."""
+    return (await db.execute(
+        select(Driver.id, Driver.full_name, Driver.safety_score).where(
+            Driver.status == DriverStatus.ON_DUTY.value,
+            Driver.license_expiry >= date.today(),
+            ~_on_dispatched_trip(Trip.driver_id == Driver.id),
+        ).order_by(Driver.safety_score.desc(), Driver.id).limit(limit)
+    )).all()
+
+
+def plan_assignment(weights: list, vehicles: list, drivers: list) -> tuple:
+    """
+    Pure planning step. `vehicles` must be sorted by capacity and `drivers`
+    by preference. Returns ({job index: (vehicle, driver)}, {job index: reason}).
+    """
+    capacities = [v.max_capacity for v in vehicles]
+    pool = list(vehicles)
+    matched, unassigned = [], {}
+    for i in sorted(range(len(weights)), key=lambda i: (-weights[i], i)):
+        pos = bisect_left(capacities, weights[i])
+        if pos == len(capacities):
+            unassigned[i] = f"No available vehicle can carry {weights[i]}kg"
+            continue
+        del capacities[pos]
+        matched.append((i, pool.pop(pos)))
+
+    assignments = {}
+    for (i, vehicle), driver in zip(matched, drivers):
+        assignments[i] = (vehicle, driver)
+    for i, _ in matched[len(drivers):]:
+        unassigned[i] = "No eligible driver left"
+    return assignments, unassigned
+
+
+async def optimize_assignment(db: AsyncSession, jobs: list) -> dict:
+    """
+    Plan vehicle and driver assignments for `jobs` (TripJob items) without
+    writing anything. Returns the plan in TripAssignmentResult shape.
+    """
+    vehicles = await _candidate_vehicles(db)
+    drivers = await _candidate_drivers(db, len(jobs))
+    assignments, unassigned = plan_assignment([job.cargo_weight for job in jobs], vehicles, drivers)
+
+    planned = []
+    for i in sorted(assignments):
+        vehicle, driver = assignments[i]
+        planned.append({
+            "index": i,
+            "vehicle_id": vehicle.id,
+            "vehicle_name": vehicle.name,
+            "max_capacity": vehicle.max_capacity,
+            "wasted_capacity": round(vehicle.max_capacity - jobs[i].cargo_weight, 2),
+            "driver_id": driver.id,
+            "driver_name": driver.full_name,
+            "safety_score": driver.safety_score,
+        })
+
+    logger.info("Assignment planned: jobs=%d assigned=%d vehicles=%d drivers=%d",
+                len(jobs), len(planned), len(vehicles), len(drivers))
+    return {
+        "assignments": planned,
+        "unassigned": [{"index": i, "reason": unassigned[i]} for i in sorted(unassigned)],
+        "total_wasted_capacity": round(sum(a["wasted_capacity"] for a in planned), 2),
+    }
+
+
+def planned_trips(jobs: list, plan: dict) -> list:
+    """TripCreate items for the assigned jobs of `plan`, in plan order."""
+    return [
+        TripCreate(**jobs[a["index"]].model_dump(), vehicle_id=a["vehicle_id"], driver_id=a["driver_id"])
+        for a in plan["assignments"]
+    ]
@@ -1,6 +1,27 @@
+"""
+Audit service – records who did what to which entity.
+
+In the default "sync" mode each entry is inserted inside the business
+transaction. In "buffered" mode (AUDIT_WRITE_MODE) entries are held on the
+session until it commits, then handed to AuditWriter: a bounded in-memory
+buffer drained by a background task with batched executemany inserts.
+Rolled-back transactions never produce entries. When the buffer is full (or
+the writer isn't running) log_action falls back to the synchronous insert.
+Batches failing on a transient error are retried on the next tick; rows the
+database rejects outright are isolated, logged and dropped so they cannot
+hold back the entries queued behind them.
+"""
+import asyncio
 import logging
-from sqlalchemy.orm import Session
+from collections import deque
+from datetime import datetime, timezone
+from sqlalchemy import event, select
+from sqlalchemy.exc import DisconnectionError, OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import FleetSession, async_engine
+from services.pagination import paginate_by_time
 from models.audit_log import AuditLog
+from config import AUDIT_WRITE_MODE, AUDIT_QUEUE_MAX, AUDIT_BATCH_SIZE, AUDIT_FLUSH_INTERVAL_SECONDS, DEFAULT_PAGE_SIZE
 
 logger = logging.getLogger("fleet.audit")
 
@@ -34,10 +55,144 @@ class Actions:
     DELETE_FUEL_LOG = "DELETE_FUEL_LOG"
     CREATE_EXPENSE = "CREATE_EXPENSE"
     DELETE_EXPENSE = "DELETE_EXPENSE"
+    IMPORT_FUEL_LOGS = "IMPORT_FUEL_LOGS"
+    IMPORT_EXPENSES = "IMPORT_EXPENSES"
+
+
+class AuditWriter:
+    """Bounded buffer of committed audit rows, batch-inserted by a background task."""
+
+    def __init__(self, max_size: int, batch_size: int, flush_interval: float):
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer = deque()
+        self._reserved = 0  # slots held by open transactions
+        self._task = None
+        self._wakeup = None
+        self._stopping = False
+        self.written = 0
+        self.failed_batches = 0
+        self.dropped = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._stopping
+
+    def reserve(self) -> bool:
+        """Claim a buffer slot for an entry whose transaction has not committed yet."""
+        if not self.running or len(self._buffer) + self._reserved >= self.max_size:
+            return False
+        self._reserved += 1
+        return True
+
+    def release(self, count: int):
+        self._reserved -= count
+
+    def submit(self, rows: list):
+        """Queue committed rows (their slots were reserved by log_action)."""
+        self._reserved -= len(rows)
+        self._buffer.extend(rows)
+        if len(self._buffer) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self):
+        """Start the drain task on the running event loop (application startup)."""
+        if self._task is None:
+            self._stopping = False
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            logger.info("Buffered audit writer started (batch=%d, interval=%.1fs, max=%d)",
+                        self.batch_size, self.flush_interval, self.max_size)
+
+    async def stop(self):
+        """Stop the drain task and write everything still buffered (application shutdown)."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+        await self.flush()
+        if self._buffer:
+            logger.error("Audit writer stopped with %d unwritten entries", len(self._buffer))
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Insert buffered rows in batches; rows left by a transient failure are requeued for the next tick."""
+        while self._buffer:
+            batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+            unwritten = await self._write(batch)
+            if unwritten:
+                self._buffer.extendleft(reversed(unwritten))
+                return
+
+    async def _write(self, batch: list) -> list:
+        """
+        Insert one batch. When the database rejects it, its halves are retried
+        until the offending rows are isolated; those are logged and dropped.
+        Returns the rows left unwritten by a transient error (empty when done).
+        """
+        try:
+            async with async_engine.begin() as conn:
+                await conn.execute(AuditLog.__table__.insert(), batch)  # executemany
+        except Exception as e:
+            self.failed_batches += 1
+            if _transient(e):
+                logger.exception("Audit batch insert failed; %d entries requeued", len(batch))
+                return batch
+            if len(batch) == 1:
+                self.dropped += 1
+                logger.error("Audit entry rejected by the database and dropped: %r (%s)", batch[0], e)
+                return []
+            half = len(batch) // 2
+            unwritten = await self._write(batch[:half])
+            if unwritten:
+                return unwritten + batch[half:]
+            return await self._write(batch[half:])
+        self.written += len(batch)
+        for row in batch:
+            _log_entry(row)
+        return []
+
+    def stats(self) -> dict:
+        return {
+            "mode": AUDIT_WRITE_MODE,
+            "running": self.running,
+            "queued": len(self._buffer),
+            "reserved": self._reserved,
+            "written": self.written,
+            "failed_batches": self.failed_batches,
+            "dropped": self.dropped,
+        }
+
+
+def _transient(exc: Exception) -> bool:
+    """Failures worth retrying later (locks, lost connections), as opposed to rejected rows."""
+    return isinstance(exc, (OperationalError, DisconnectionError, PoolTimeoutError)) \
+        or getattr(exc, "connection_invalidated", False)
+
+
+audit_writer = AuditWriter(AUDIT_QUEUE_MAX, AUDIT_BATCH_SIZE, AUDIT_FLUSH_INTERVAL_SECONDS)
+
+
+def _log_entry(row: dict):
+    logger.info(
+        "AUDIT | user=%d action=%s entity=%s:%d | %s",
+        row["user_id"], row["action"], row["entity_type"], row["entity_id"], row["details"] or "",
+    )
 
 
-def log_action(
-    db: Session,
+async def log_action(
+    db: AsyncSession,
     user_id: int,
     action: str,
     entity_type: str,
@@ -47,40 +202,92 @@ def log_action(
     """
     Record an audit entry. Uses flush() instead of commit()
     so the caller controls the transaction boundary.
+    In buffered mode the entry is only queued once the caller commits.
     """
-    entry = AuditLog(
-        user_id=user_id,
-        action=action,
-        entity_type=entity_type,
-        entity_id=entity_id,
-        details=details,
-    )
+    row = {
+        "user_id": user_id,
+        "action": action,
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "details": details,
+    }
+    # Buffer only inside an open transaction, whose commit/rollback hooks settle the slot.
+    if AUDIT_WRITE_MODE == "buffered" and db.in_transaction() and audit_writer.reserve():
+        row["timestamp"] = datetime.now(timezone.utc)  # event time, not insert time
+        db.sync_session.info.setdefault("pending_audit", []).append(row)
+        return AuditLog(**row)
+
+    entry = AuditLog(**row)
     db.add(entry)
-    db.flush()  # Write to DB but don't commit — caller owns the transaction
+    await db.flush()  # Write to DB but don't commit — caller owns the transaction
 
-    logger.info(
-        "AUDIT | user=%d action=%s entity=%s:%d | %s",
-        user_id, action, entity_type, entity_id, details or "",
-    )
+    _log_entry(row)
     return entry
 
 
-def get_audit_logs(
-    db: Session,
+@event.listens_for(FleetSession, "after_commit")
+def _submit_pending_audit(session):
+    rows = session.info.pop("pending_audit", None)
+    if rows:
+        audit_writer.submit(rows)
+
+
+@event.listens_for(FleetSession, "after_transaction_end")
+def _discard_pending_audit(session, transaction):
+    """Rollback or close without commit: the entries never happened."""
+    if transaction.parent is not None:
+        return  # savepoint / nested transaction
+    rows = session.info.pop("pending_audit", None)
+    if rows:
+        audit_writer.release(len(rows))
+
+
+def as_utc(value: datetime) -> datetime:
+    """Timestamps are stored in UTC; naive filter values are read as UTC, aware ones converted."""
+    return value.astimezone(timezone.utc) if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+async def get_audit_logs(
+    db: AsyncSession,
     entity_type: str = None,
     entity_id: int = None,
     action: str = None,
     user_id: int = None,
-    limit: int = 100,
-) -> list:
-    """Query audit logs with optional filters."""
-    query = db.query(AuditLog)
+    since: datetime = None,
+    until: datetime = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after: str = None,
+):
+    """
+    One page of audit logs, newest first, with optional filters.
+    `since` / `until` are inclusive. Returns (logs, next_cursor).
+    """
+    stmt = select(AuditLog)
     if entity_type:
-        query = query.filter(AuditLog.entity_type == entity_type)
+        stmt = stmt.where(AuditLog.entity_type == entity_type)
     if entity_id:
-        query = query.filter(AuditLog.entity_id == entity_id)
+        stmt = stmt.where(AuditLog.entity_id == entity_id)
     if action:
-        query = query.filter(AuditLog.action == action)
+        stmt = stmt.where(AuditLog.action == action)
     if user_id:
-        query = query.filter(AuditLog.user_id == user_id)
-    return query.order_by(AuditLog.timestamp.desc()).limit(limit).all()
+        stmt = stmt.where(AuditLog.user_id == user_id)
+    if since:
+        stmt = stmt.where(AuditLog.timestamp >= as_utc(since))
+    if until:
+        stmt = stmt.where(AuditLog.timestamp <= as_utc(until))
+    return await paginate_by_time(db, stmt, AuditLog.timestamp, AuditLog.id, limit, after)
+
+
+async def get_entity_timeline(
+    db: AsyncSession,
+    entity_type: str,
+    entity_id: int,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after: str = None,
+):
+    """
+    Chronological history of one entity (oldest first), served by the
+    (entity_type, entity_id, timestamp) index. Returns (logs, next_cursor).
+    """
+    stmt = select(AuditLog).where(AuditLog.entity_type == entity_type, AuditLog.entity_id == entity_id)
+    return await paginate_by_time(db, stmt, AuditLog.timestamp, AuditLog.id, limit, after, descending=False)
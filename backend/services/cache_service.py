@@ -0,0 +1,226 @@
+"""
+Cache service – in-process, write-invalidated cache for expensive aggregates.
+
+Entries are tagged with the tables they are computed from. A session hook
+records which tables each transaction writes to and, once it commits, bumps a
+per-table version counter and drops every entry tagged with those tables.
+Entries also expire after CACHE_TTL_SECONDS, which bounds staleness when
+several worker processes each hold their own cache. Writes to the tables in
+PERSISTED_VERSION_TABLES additionally bump a table_versions row; those
+counters are shared by all workers, back the ETags and are part of the cache
+key of entries built from those tables. The bump runs in a short transaction
+of its own right after the write commits, so concurrent writers never queue
+on a version row for the length of their business transaction; in exchange,
+other workers may answer from the previous version for that brief window.
+"""
+import functools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import event, select, text
+from sqlalchemy.exc import SQLAlchemyError
+from database import FleetSession
+from models.table_version import TableVersion
+from config import CACHE_ENABLED, CACHE_TTL_SECONDS, CACHE_MAX_ENTRIES
+
+logger = logging.getLogger("fleet.cache")
+
+
+class TTLCache:
+    """Bounded LRU cache with a TTL ceiling and table-tag invalidation."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, tables, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        """Return (found, value). Expired entries count as misses."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[2]
+
+    def set(self, key, value, tables: frozenset = frozenset()):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, tables, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def invalidate(self, tables: set):
+        """Drop every entry that depends on any of the given tables."""
+        with self._lock:
+            stale = [k for k, (_, deps, _) in self._entries.items() if deps & tables]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+cache = TTLCache(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS)
+
+# Monotonic per-table write counters, bumped after every committed write.
+_table_versions = {}
+_versions_lock = threading.Lock()
+
+
+def table_versions(tables) -> tuple:
+    """Current version of each table, in the order given."""
+    with _versions_lock:
+        return tuple(_table_versions.get(t, 0) for t in tables)
+
+
+def mark_tables_changed(tables: set):
+    """Bump versions and invalidate cached entries for the given tables."""
+    if not tables:
+        return
+    with _versions_lock:
+        for t in tables:
+            _table_versions[t] = _table_versions.get(t, 0) + 1
+    cache.invalidate(tables)
+
+
+# Tables whose writes also bump their persisted table_versions row once the
+# write commits, so every worker sees the change (ETag revalidation and the
+# keys of cached aggregates). monthly_rollup is upserted by rollup_service
+# alongside every trip, fuel, maintenance and expense write.
+PERSISTED_VERSION_TABLES = frozenset({
+    "vehicles", "drivers", "trips", "maintenance_logs", "fuel_logs", "expenses", "monthly_rollup",
+    "users",  # auth user cache (middleware)
+})
+
+
+async def persisted_versions(db, tables) -> tuple:
+    """Committed-write counters of `tables`, in the order given (0 if never written)."""
+    rows = dict((await db.execute(
+        select(TableVersion.table_name, TableVersion.version).where(TableVersion.table_name.in_(tables))
+    )).all())
+    return tuple(rows.get(t, 0) for t in tables)
+
+
+def cached(*tables: str):
+    """
+    Decorator for async service functions of the form fn(db, **filters).
+    The cache key is the function name plus its filter arguments; the
+    entry is invalidated whenever one of `tables` is written. Dependencies
+    in PERSISTED_VERSION_TABLES also put their persisted versions in the key,
+    read before computing, so an entry is never older than its key and a write
+    committed by another worker is not answered from this cache once its
+    version bump has landed.
+    """
+    deps = frozenset(tables)
+    ordered = sorted(deps)
+    persisted = sorted(deps & PERSISTED_VERSION_TABLES)
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(db, *args, **kwargs):
+            if not CACHE_ENABLED:
+                return await fn(db, *args, **kwargs)
+            key = (fn.__name__, args, tuple(sorted(kwargs.items())))
+            if persisted:
+                key += (await persisted_versions(db, persisted),)
+            found, value = cache.get(key)
+            if found:
+                return value
+            before = table_versions(ordered)
+            value = await fn(db, *args, **kwargs)
+            # Skip the store if a write committed while we were computing.
+            if table_versions(ordered) == before:
+                cache.set(key, value, deps)
+            return value
+        return wrapper
+    return decorator
+
+
+_BUMP_PERSISTED_VERSION = text(
+    "INSERT INTO table_versions (table_name, version) VALUES (:table_name, 1) "
+    "ON CONFLICT (table_name) DO UPDATE SET version = table_versions.version + 1"
+)
+
+
+# ── Session hooks: track written tables per transaction ──────────────────────
+
+def _pending(session) -> set:
+    return session.info.setdefault("changed_tables", set())
+
+
+def _bump_persisted_versions(session, tables: set):
+    """
+    Bump the versions of committed tables in a separate short transaction
+    (sorted: stable lock order). A failure only leaves other workers on the
+    old version until their entries expire, so it is logged, not raised.
+    """
+    if not tables:
+        return
+    try:
+        with session.get_bind().begin() as conn:
+            conn.execute(_BUMP_PERSISTED_VERSION, [{"table_name": t} for t in sorted(tables)])
+    except SQLAlchemyError:
+        logger.exception("Could not bump table versions for %s", sorted(tables))
+
+
+@event.listens_for(FleetSession, "after_flush")
+def _collect_flushed_tables(session, flush_context):
+    changed = _pending(session)
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        table = getattr(obj, "__tablename__", None)
+        if table:
+            changed.add(table)
+
+
+@event.listens_for(FleetSession, "do_orm_execute")
+def _collect_bulk_tables(orm_execute_state):
+    """Bulk insert/update/delete statements bypass the flush."""
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            _pending(orm_execute_state.session).add(table.name)
+
+
+@event.listens_for(FleetSession, "after_commit")
+def _invalidate_on_commit(session):
+    changed = session.info.pop("changed_tables", set())
+    _bump_persisted_versions(session, changed & PERSISTED_VERSION_TABLES)
+    mark_tables_changed(changed)
+
+
+@event.listens_for(FleetSession, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop("changed_tables", None)
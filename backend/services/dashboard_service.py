@@ -1,12 +1,40 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func as sql_func
+from collections import Counter
+from sqlalchemy import select, func as sql_func
+from sqlalchemy.ext.asyncio import AsyncSession
 from models.vehicle import Vehicle, VehicleStatus
 from models.trip import Trip, TripStatus
 from models.driver import Driver
 from models.maintenance import MaintenanceLog
+from services.cache_service import cached
 
 
-def get_dashboard_kpis(db: Session, vehicle_type: str = None, status_filter: str = None, region: str = None) -> dict:
+def _matches(row, filters: dict, skip: int = None) -> bool:
+    """True if a grouped row satisfies every active filter (except `skip`)."""
+    return all(not value or row[i] == value for i, value in filters.items() if i != skip)
+
+
+def _facet(rows: list, dimension: int, filters: dict) -> dict:
+    """
+    Count rows per value of one dimension, applying every filter except the
+    one on that dimension (standard faceted-search semantics).
+    """
+    counts = Counter()
+    for row in rows:
+        if _matches(row, filters, skip=dimension):
+            counts[row[dimension]] += row[-1]
+    return dict(counts)
+
+
+async def _count_by_status(db: AsyncSession, model) -> dict:
+    rows = await db.execute(select(model.status, sql_func.count(model.id)).group_by(model.status))
+    return dict(rows.all())
+
+
+KPI_TABLES = ("vehicles", "trips", "drivers", "maintenance_logs")
+
+
+@cached(*KPI_TABLES)
+async def get_dashboard_kpis(db: AsyncSession, vehicle_type: str = None, status_filter: str = None, region: str = None) -> dict:
     """
     Compute all Command Center KPIs:
       - Active Fleet: vehicles with status "On Trip"
@@ -14,40 +42,47 @@ def get_dashboard_kpis(db: Session, vehicle_type: str = None, status_filter: str
       - Utilization Rate: (Assigned / Total) × 100
       - Pending Cargo: trips in Draft
       - Total vehicles, drivers, trips
+    Each table is read with a single GROUP BY; vehicle filters and facet
+    counts are then derived from the grouped rows in memory.
     """
-    # Base vehicle query with optional filters
-    v_query = db.query(Vehicle)
-    if vehicle_type:
-        v_query = v_query.filter(Vehicle.vehicle_type == vehicle_type)
-    if region:
-        v_query = v_query.filter(Vehicle.region == region)
-
-    total_vehicles = v_query.count()
-    active_fleet = v_query.filter(Vehicle.status == VehicleStatus.ON_TRIP.value).count()
-    maintenance_alerts = v_query.filter(Vehicle.status == VehicleStatus.IN_SHOP.value).count()
-    available_vehicles = v_query.filter(Vehicle.status == VehicleStatus.AVAILABLE.value).count()
-    retired_vehicles = v_query.filter(Vehicle.status == VehicleStatus.RETIRED.value).count()
+    # (status, vehicle_type, region, count) – one row per combination
+    vehicle_rows = (await db.execute(
+        select(Vehicle.status, Vehicle.vehicle_type, Vehicle.region, sql_func.count(Vehicle.id))
+        .group_by(Vehicle.status, Vehicle.vehicle_type, Vehicle.region)
+    )).all()
+
+    filters = {0: status_filter, 1: vehicle_type, 2: region}
+    by_status = Counter()
+    for row in vehicle_rows:
+        if _matches(row, filters):
+            by_status[row[0]] += row[3]
+
+    total_vehicles = sum(by_status.values())
+    active_fleet = by_status[VehicleStatus.ON_TRIP.value]
+    maintenance_alerts = by_status[VehicleStatus.IN_SHOP.value]
+    available_vehicles = by_status[VehicleStatus.AVAILABLE.value]
+    retired_vehicles = by_status[VehicleStatus.RETIRED.value]
 
     # Assigned = On Trip + In Shop (vehicles in use)
     assigned = active_fleet + maintenance_alerts
     utilization_rate = round((assigned / total_vehicles * 100) if total_vehicles > 0 else 0, 2)
 
     # Trip stats
-    t_query = db.query(Trip)
-    pending_cargo = t_query.filter(Trip.status == TripStatus.DRAFT.value).count()
-    dispatched_trips = t_query.filter(Trip.status == TripStatus.DISPATCHED.value).count()
-    completed_trips = t_query.filter(Trip.status == TripStatus.COMPLETED.value).count()
-    total_trips = t_query.count()
+    trips_by_status = await _count_by_status(db, Trip)
+    pending_cargo = trips_by_status.get(TripStatus.DRAFT.value, 0)
+    dispatched_trips = trips_by_status.get(TripStatus.DISPATCHED.value, 0)
+    completed_trips = trips_by_status.get(TripStatus.COMPLETED.value, 0)
+    total_trips = sum(trips_by_status.values())
 
     # Driver stats
-    total_drivers = db.query(Driver).count()
-    on_duty_drivers = db.query(Driver).filter(Driver.status == "On Duty").count()
-    on_trip_drivers = db.query(Driver).filter(Driver.status == "On Trip").count()
+    drivers_by_status = await _count_by_status(db, Driver)
+    total_drivers = sum(drivers_by_status.values())
+    on_duty_drivers = drivers_by_status.get("On Duty", 0)
+    on_trip_drivers = drivers_by_status.get("On Trip", 0)
 
     # Open maintenance logs
-    open_maintenance = db.query(MaintenanceLog).filter(
-        MaintenanceLog.status != "Resolved"
-    ).count()
+    maintenance_by_status = await _count_by_status(db, MaintenanceLog)
+    open_maintenance = sum(count for s, count in maintenance_by_status.items() if s != "Resolved")
 
     return {
         "active_fleet": active_fleet,
@@ -64,4 +99,11 @@ def get_dashboard_kpis(db: Session, vehicle_type: str = None, status_filter: str
         "on_duty_drivers": on_duty_drivers,
         "on_trip_drivers": on_trip_drivers,
         "open_maintenance": open_maintenance,
+        "facets": {
+            "status": _facet(vehicle_rows, 0, filters),
+            "vehicle_type": _facet(vehicle_rows, 1, filters),
+            "region": _facet(vehicle_rows, 2, filters),
+            "trip_status": trips_by_status,
+            "driver_status": drivers_by_status,
+        },
     }
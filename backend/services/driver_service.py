@@ -1,70 +1,78 @@
 from datetime import date
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update, case, func as sql_func
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 from models.driver import Driver, DriverStatus
 from schemas.driver import DriverCreate, DriverUpdate
+from services.pagination import paginate
+from config import DEFAULT_PAGE_SIZE
 
 
-def get_all_drivers(db: Session, status_filter: str = None, search: str = None):
-    """Retrieve all drivers with optional filters."""
-    query = db.query(Driver)
+async def get_all_drivers(db: AsyncSession, status_filter: str = None, search: str = None,
+                          limit: int = DEFAULT_PAGE_SIZE, after: str = None):
+    """Retrieve one page of drivers with optional filters. Returns (drivers, next_cursor)."""
+    stmt = select(Driver)
     if status_filter:
-        query = query.filter(Driver.status == status_filter)
+        stmt = stmt.where(Driver.status == status_filter)
     if search:
-        query = query.filter(
+        stmt = stmt.where(
             (Driver.full_name.ilike(f"%{search}%")) |
             (Driver.license_number.ilike(f"%{search}%"))
         )
-    return query.order_by(Driver.id.desc()).all()
+    return await paginate(db, stmt, Driver.id, limit, after)
 
 
-def get_driver_by_id(db: Session, driver_id: int) -> Driver:
+async def get_driver_by_id(db: AsyncSession, driver_id: int) -> Driver:
     """Get a single driver or raise 404."""
-    driver = db.query(Driver).filter(Driver.id == driver_id).first()
+    driver = await db.get(Driver, driver_id)
     if not driver:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Driver not found")
     return driver
 
 
-def create_driver(db: Session, data: DriverCreate) -> Driver:
+async def create_driver(db: AsyncSession, data: DriverCreate) -> Driver:
     """Create a new driver. License number must be unique."""
-    existing = db.query(Driver).filter(Driver.license_number == data.license_number).first()
+    existing = (await db.execute(
+        select(Driver.id).where(Driver.license_number == data.license_number)
+    )).first()
     if existing:
         raise HTTPException(status_code=409, detail=f"License number '{data.license_number}' already registered")
 
     driver = Driver(**data.model_dump())
     db.add(driver)
-    db.flush()
+    await db.flush()
     return driver
 
 
-def update_driver(db: Session, driver_id: int, data: DriverUpdate) -> Driver:
+async def update_driver(db: AsyncSession, driver_id: int, data: DriverUpdate) -> Driver:
     """Update driver fields."""
-    driver = get_driver_by_id(db, driver_id)
+    driver = await get_driver_by_id(db, driver_id)
     update_data = data.model_dump(exclude_unset=True)
 
     for key, value in update_data.items():
         setattr(driver, key, value)
 
-    db.flush()
+    await db.flush()
     return driver
 
 
-def delete_driver(db: Session, driver_id: int):
+async def delete_driver(db: AsyncSession, driver_id: int):
     """Delete a driver if they have no active trips."""
     from models.trip import Trip
-    driver = get_driver_by_id(db, driver_id)
+    driver = await get_driver_by_id(db, driver_id)
 
-    active = db.query(Trip).filter(
-        Trip.driver_id == driver_id,
-        Trip.status.in_(["Draft", "Dispatched"])
-    ).count()
+    active = (await db.execute(
+        select(sql_func.count(Trip.id)).where(
+            Trip.driver_id == driver_id,
+            Trip.status.in_(["Draft", "Dispatched"])
+        )
+    )).scalar()
 
     if active > 0:
         raise HTTPException(status_code=400, detail="Cannot delete driver with active trips")
 
-    db.delete(driver)
-    db.flush()
+    await db.delete(driver)
+    await db.flush()
     return {"detail": "Driver deleted", "id": driver_id}
 
 
@@ -73,30 +81,87 @@ def is_license_expired(driver: Driver) -> bool:
     return driver.license_expiry < date.today()
 
 
-def recalculate_driver_stats(db: Session, driver: Driver):
+TRIP_COUNTERS = ("total_trips", "completed_trips", "cancelled_trips")
+
+
+def _apply_derived_stats(driver: Driver):
     """
-    Recalculate completion rate and safety score after a trip event.
+    Completion rate and safety score from the driver's trip counters.
     Safety score formula: 100 - (complaints * 5) - (cancellation_rate * 20)
     """
-    from models.trip import Trip
-    total = db.query(Trip).filter(Trip.driver_id == driver.id).count()
-    completed = db.query(Trip).filter(
-        Trip.driver_id == driver.id, Trip.status == "Completed"
-    ).count()
-    cancelled = db.query(Trip).filter(
-        Trip.driver_id == driver.id, Trip.status == "Cancelled"
-    ).count()
-
-    driver.total_trips = total
-    driver.completed_trips = completed
+    total = driver.total_trips or 0
+    completed = driver.completed_trips or 0
+    cancelled = driver.cancelled_trips or 0
     driver.completion_rate = round((completed / total * 100) if total > 0 else 0, 2)
 
     cancellation_rate = (cancelled / total) if total > 0 else 0
-    safety = 100 - (driver.complaints * 5) - (cancellation_rate * 20)
+    safety = 100 - ((driver.complaints or 0) * 5) - (cancellation_rate * 20)
     driver.safety_score = round(max(0, min(100, safety)), 2)
 
+
+async def record_trip_event(db: AsyncSession, driver: Driver, total: int = 0, completed: int = 0,
+                            cancelled: int = 0):
+    """
+    Apply trip counter deltas to a driver after a trip transition and refresh
+    completion rate / safety score. Counters are incremented in SQL
+    (col = col + n) so concurrent transitions never lose an update; no
+    query touches the trips table.
+    """
+    for name, delta in zip(TRIP_COUNTERS, (total, completed, cancelled)):
+        if delta:
+            setattr(driver, name, getattr(Driver, name) + delta)
+    await db.flush()
+    await db.refresh(driver, attribute_names=list(TRIP_COUNTERS))
+    _apply_derived_stats(driver)
+
     # flush only — caller owns the transaction boundary
-    db.flush()
+    await db.flush()
+
+
+def _clamped_score(expr):
+    """SQL version of the 0..100 clamp in _apply_derived_stats."""
+    return case((expr < 0, 0.0), (expr > 100, 100.0), else_=sql_func.round(expr, 2))
+
+
+def recompute_all_driver_stats(db) -> int:
+    """
+    Rebuild every driver's trip counters, completion rate and safety score
+    from the trips table (repair). One UPDATE ... FROM (GROUP BY) for drivers
+    with trips; drivers without trips are reset to zero with a complaints-only
+    safety score. Accepts a sync Session or Connection and does not commit.
+    Returns the number of drivers updated from trips.
+    """
+    from models.trip import Trip
+
+    counts = select(
+        Trip.driver_id.label("driver_id"),
+        sql_func.count(Trip.id).label("total"),
+        sql_func.sum(case((Trip.status == "Completed", 1), else_=0)).label("completed"),
+        sql_func.sum(case((Trip.status == "Cancelled", 1), else_=0)).label("cancelled"),
+    ).group_by(Trip.driver_id).subquery()
+
+    complaints_penalty = sql_func.coalesce(Driver.complaints, 0) * 5
+    db.execute(
+        update(Driver)
+        .where(~select(Trip.id).where(Trip.driver_id == Driver.id).exists())
+        .values(total_trips=0, completed_trips=0, cancelled_trips=0, completion_rate=0.0,
+                safety_score=_clamped_score(100 - complaints_penalty))
+    )
+
+    safety = 100 - complaints_penalty - counts.c.cancelled * 20.0 / counts.c.total
+    result = db.execute(
+        update(Driver)
+        .where(Driver.id == counts.c.driver_id)
+        .values(
+            total_trips=counts.c.total,
+            completed_trips=counts.c.completed,
+            cancelled_trips=counts.c.cancelled,
+            completion_rate=sql_func.round(counts.c.completed * 100.0 / counts.c.total, 2),
+            safety_score=_clamped_score(safety),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
 
 
 def enrich_driver(driver: Driver) -> dict:
@@ -111,6 +176,7 @@ def enrich_driver(driver: Driver) -> dict:
         "completion_rate": driver.completion_rate,
         "total_trips": driver.total_trips,
         "completed_trips": driver.completed_trips,
+        "cancelled_trips": driver.cancelled_trips,
         "complaints": driver.complaints,
         "status": driver.status,
         "created_at": driver.created_at,
@@ -0,0 +1,47 @@
+"""
+ETag service – conditional GETs for endpoints the SPA polls constantly.
+
+The ETag is a hash of the request path, its query parameters, today's date
+(license expiry flags change without a write) and the persisted versions
+(table_versions, shared by all workers) of every table the response is
+built from. When the client's If-None-Match still matches,
+the endpoint answers 304 after one primary-key read instead of running its
+service query. A write committing between the version read and the data
+read only makes the ETag older than the data, which costs the client one
+extra full response later. Versions are bumped just after a write commits,
+so only in that brief window can a revalidation still get a 304.
+"""
+import hashlib
+from datetime import date
+from typing import Optional
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from services.cache_service import persisted_versions
+
+CACHE_CONTROL = "private, no-cache"  # browsers may store it but must revalidate every time
+
+
+def _etag(request: Request, versions: tuple) -> str:
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    digest = hashlib.blake2b(f"{request.url.path}?{query}|{date.today()}|{versions}".encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison against an If-None-Match header value."""
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates or etag[2:] in candidates
+
+
+async def not_modified(db: AsyncSession, request: Request, response: Response, tables) -> Optional[Response]:
+    """
+    Put the current ETag on `response`. Returns a 304 response to send
+    instead when the client's copy is current, otherwise None.
+    """
+    etag = _etag(request, await persisted_versions(db, tables))
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,133 @@
+"""
+Export service – streams full history as CSV or NDJSON.
+Rows are read through a streamed server-side cursor (yield_per) as plain column tuples
+and encoded in small batches, so memory stays flat regardless of row count.
+"""
+import csv
+import io
+from datetime import date, timedelta
+import orjson
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from database import AsyncSessionLocal
+from models.trip import Trip
+from models.vehicle import Vehicle
+from models.driver import Driver
+from models.fuel_log import FuelLog
+from models.expense import Expense
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+EXPORT_BATCH_SIZE = 1000
+
+
+def _trips_query(date_from: date = None, date_to: date = None, vehicle_id: int = None):
+    stmt = select(
+        Trip.id, Trip.vehicle_id, Vehicle.name.label("vehicle_name"),
+        Trip.driver_id, Driver.full_name.label("driver_name"),
+        Trip.cargo_weight, Trip.origin, Trip.destination, Trip.distance,
+        Trip.estimated_fuel_cost, Trip.revenue, Trip.status,
+        Trip.scheduled_date, Trip.completed_date, Trip.created_at,
+    ).outerjoin(Vehicle, Vehicle.id == Trip.vehicle_id).outerjoin(Driver, Driver.id == Trip.driver_id)
+    if vehicle_id:
+        stmt = stmt.where(Trip.vehicle_id == vehicle_id)
+    # Trips have no business date of their own; filter on creation time.
+    if date_from:
+        stmt = stmt.where(Trip.created_at >= date_from)
+    if date_to:
+        stmt = stmt.where(Trip.created_at < date_to + timedelta(days=1))
+    return stmt.order_by(Trip.id)
+
+
+def _fuel_logs_query(date_from: date = None, date_to: date = None, vehicle_id: int = None):
+    stmt = select(
+        FuelLog.id, FuelLog.vehicle_id, Vehicle.name.label("vehicle_name"), FuelLog.trip_id,
+        FuelLog.date, FuelLog.liters, FuelLog.cost, FuelLog.odometer_reading, FuelLog.created_at,
+    ).outerjoin(Vehicle, Vehicle.id == FuelLog.vehicle_id)
+    if vehicle_id:
+        stmt = stmt.where(FuelLog.vehicle_id == vehicle_id)
+    if date_from:
+        stmt = stmt.where(FuelLog.date >= date_from)
+    if date_to:
+        stmt = stmt.where(FuelLog.date <= date_to)
+    return stmt.order_by(FuelLog.id)
+
+
+def _expenses_query(date_from: date = None, date_to: date = None, vehicle_id: int = None):
+    stmt = select(
+        Expense.id, Expense.vehicle_id, Vehicle.name.label("vehicle_name"), Expense.trip_id,
+        Expense.category, Expense.description, Expense.amount, Expense.date, Expense.created_at,
+    ).outerjoin(Vehicle, Vehicle.id == Expense.vehicle_id)
+    if vehicle_id:
+        stmt = stmt.where(Expense.vehicle_id == vehicle_id)
+    if date_from:
+        stmt = stmt.where(Expense.date >= date_from)
+    if date_to:
+        stmt = stmt.where(Expense.date <= date_to)
+    return stmt.order_by(Expense.id)
+
+
+EXPORT_QUERIES = {
+    "trips": _trips_query,
+    "fuel_logs": _fuel_logs_query,
+    "expenses": _expenses_query,
+}
+
+
+def _encode_csv(rows, columns: list, header: bool) -> str:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    if header:
+        writer.writerow(columns)
+    writer.writerows(rows)
+    return buf.getvalue()
+
+
+def _encode_ndjson(rows, columns: list) -> bytes:
+    # orjson encodes dates/datetimes natively and returns bytes, skipping a str round trip
+    return b"".join(
+        orjson.dumps(dict(zip(columns, row)), option=orjson.OPT_APPEND_NEWLINE)
+        for row in rows
+    )
+
+
+def _encode_batch(rows, columns: list, fmt: str):
+    if fmt == "csv":
+        return _encode_csv(rows, columns, header=False)
+    return _encode_ndjson(rows, columns)
+
+
+async def stream_export(dataset: str, fmt: str, date_from: date = None, date_to: date = None,
+                        vehicle_id: int = None):
+    """
+    Async generator yielding encoded export chunks for StreamingResponse.
+    Owns its own session because the request-scoped one is closed before
+    the response body is streamed.
+    """
+    stmt = EXPORT_QUERIES[dataset](date_from=date_from, date_to=date_to, vehicle_id=vehicle_id)
+    columns = [c["name"] for c in stmt.column_descriptions]
+
+    if fmt == "csv":
+        yield _encode_csv([], columns, header=True)
+
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for partition in result.partitions():
+            yield _encode_batch([tuple(row) for row in partition], columns, fmt)
+
+
+def export_response(dataset: str, fmt: str, date_from: date = None, date_to: date = None,
+                    vehicle_id: int = None) -> StreamingResponse:
+    """Build a streaming download response for one of EXPORT_QUERIES."""
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Export format must be one of: {list(EXPORT_FORMATS)}")
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must be on or before date_to")
+    return StreamingResponse(
+        stream_export(dataset, fmt, date_from=date_from, date_to=date_to, vehicle_id=vehicle_id),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{dataset}.{fmt}"'},
+    )
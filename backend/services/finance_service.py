@@ -1,6 +1,6 @@
-from datetime import date
-from sqlalchemy.orm import Session
-from sqlalchemy import func as sql_func, extract
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy import func as sql_func, select, literal, union_all, exists
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 from models.fuel_log import FuelLog
 from models.expense import Expense
@@ -8,37 +8,56 @@ from models.vehicle import Vehicle
 from models.trip import Trip
 from models.maintenance import MaintenanceLog
 from schemas.finance import FuelLogCreate, ExpenseCreate
+from services.pagination import paginate
+from services.vehicle_service import vehicle_names
+from services.cache_service import cached
+from services.rollup_service import apply_rollup_delta, MEASURES as ROLLUP_MEASURES
+from models.monthly_rollup import MonthlyRollup, ALL_VEHICLES, ALL_REGIONS
+from config import DEFAULT_PAGE_SIZE
 
 
 
-def get_all_fuel_logs(db: Session, vehicle_id: int = None):
-    query = db.query(FuelLog)
+async def get_all_fuel_logs(db: AsyncSession, vehicle_id: int = None,
+                            limit: int = DEFAULT_PAGE_SIZE, after: str = None):
+    """Retrieve one page of fuel logs. Returns (logs, next_cursor)."""
+    stmt = select(FuelLog)
     if vehicle_id:
-        query = query.filter(FuelLog.vehicle_id == vehicle_id)
-    return query.order_by(FuelLog.id.desc()).all()
+        stmt = stmt.where(FuelLog.vehicle_id == vehicle_id)
+    return await paginate(db, stmt, FuelLog.id, limit, after)
 
 
-def create_fuel_log(db: Session, data: FuelLogCreate) -> FuelLog:
-    vehicle = db.query(Vehicle).filter(Vehicle.id == data.vehicle_id).first()
+async def create_fuel_log(db: AsyncSession, data: FuelLogCreate) -> FuelLog:
+    vehicle = await db.get(Vehicle, data.vehicle_id)
     if not vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found")
     log = FuelLog(**data.model_dump())
     db.add(log)
-    db.flush()
+    await db.flush()
+    await apply_rollup_delta(db, log.vehicle_id, log.date, fuel_cost=log.cost, liters=log.liters)
     return log
 
 
-def delete_fuel_log(db: Session, log_id: int):
-    log = db.query(FuelLog).filter(FuelLog.id == log_id).first()
+async def delete_fuel_log(db: AsyncSession, log_id: int):
+    log = await db.get(FuelLog, log_id)
     if not log:
         raise HTTPException(status_code=404, detail="Fuel log not found")
-    db.delete(log)
-    db.flush()
+    await apply_rollup_delta(db, log.vehicle_id, log.date, fuel_cost=-log.cost, liters=-log.liters)
+    await db.delete(log)
+    await db.flush()
     return {"detail": "Fuel log deleted", "id": log_id}
 
 
-def enrich_fuel_log(db: Session, log: FuelLog) -> dict:
-    vehicle = db.query(Vehicle).filter(Vehicle.id == log.vehicle_id).first()
+async def enrich_fuel_log(db: AsyncSession, log: FuelLog) -> dict:
+    return (await enrich_fuel_logs(db, [log]))[0]
+
+
+async def enrich_fuel_logs(db: AsyncSession, logs: list) -> list:
+    """Fuel log output with vehicle names, looked up once for the whole list."""
+    names = await vehicle_names(db, [l.vehicle_id for l in logs])
+    return [_fuel_log_to_dict(l, names.get(l.vehicle_id)) for l in logs]
+
+
+def _fuel_log_to_dict(log: FuelLog, vehicle_name: str) -> dict:
     return {
         "id": log.id,
         "vehicle_id": log.vehicle_id,
@@ -48,41 +67,54 @@ def enrich_fuel_log(db: Session, log: FuelLog) -> dict:
         "cost": log.cost,
         "odometer_reading": log.odometer_reading,
         "created_at": log.created_at,
-        "vehicle_name": vehicle.name if vehicle else None,
+        "vehicle_name": vehicle_name,
     }
 
 
 
-def get_all_expenses(db: Session, vehicle_id: int = None, category: str = None):
-    query = db.query(Expense)
+async def get_all_expenses(db: AsyncSession, vehicle_id: int = None, category: str = None,
+                           limit: int = DEFAULT_PAGE_SIZE, after: str = None):
+    """Retrieve one page of expenses. Returns (expenses, next_cursor)."""
+    stmt = select(Expense)
     if vehicle_id:
-        query = query.filter(Expense.vehicle_id == vehicle_id)
+        stmt = stmt.where(Expense.vehicle_id == vehicle_id)
     if category:
-        query = query.filter(Expense.category == category)
-    return query.order_by(Expense.id.desc()).all()
+        stmt = stmt.where(Expense.category == category)
+    return await paginate(db, stmt, Expense.id, limit, after)
 
 
-def create_expense(db: Session, data: ExpenseCreate) -> Expense:
-    vehicle = db.query(Vehicle).filter(Vehicle.id == data.vehicle_id).first()
+async def create_expense(db: AsyncSession, data: ExpenseCreate) -> Expense:
+    vehicle = await db.get(Vehicle, data.vehicle_id)
     if not vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found")
     expense = Expense(**data.model_dump())
     db.add(expense)
-    db.flush()
+    await db.flush()
+    await apply_rollup_delta(db, expense.vehicle_id, expense.date, expenses=expense.amount)
     return expense
 
 
-def delete_expense(db: Session, expense_id: int):
-    expense = db.query(Expense).filter(Expense.id == expense_id).first()
+async def delete_expense(db: AsyncSession, expense_id: int):
+    expense = await db.get(Expense, expense_id)
     if not expense:
         raise HTTPException(status_code=404, detail="Expense not found")
-    db.delete(expense)
-    db.flush()
+    await apply_rollup_delta(db, expense.vehicle_id, expense.date, expenses=-expense.amount)
+    await db.delete(expense)
+    await db.flush()
     return {"detail": "Expense deleted", "id": expense_id}
 
 
-def enrich_expense(db: Session, expense: Expense) -> dict:
-    vehicle = db.query(Vehicle).filter(Vehicle.id == expense.vehicle_id).first()
+async def enrich_expense(db: AsyncSession, expense: Expense) -> dict:
+    return (await enrich_expenses(db, [expense]))[0]
+
+
+async def enrich_expenses(db: AsyncSession, expenses: list) -> list:
+    """Expense output with vehicle names, looked up once for the whole list."""
+    names = await vehicle_names(db, [e.vehicle_id for e in expenses])
+    return [_expense_to_dict(e, names.get(e.vehicle_id)) for e in expenses]
+
+
+def _expense_to_dict(expense: Expense, vehicle_name: str) -> dict:
     return {
         "id": expense.id,
         "vehicle_id": expense.vehicle_id,
@@ -92,23 +124,23 @@ def enrich_expense(db: Session, expense: Expense) -> dict:
         "amount": expense.amount,
         "date": expense.date,
         "created_at": expense.created_at,
-        "vehicle_name": vehicle.name if vehicle else None,
+        "vehicle_name": vehicle_name,
     }
 
 
 
-def get_financial_summary(db: Session) -> dict:
+@cached("fuel_logs", "maintenance_logs", "expenses", "trips", "vehicles")
+async def get_financial_summary(db: AsyncSession) -> dict:
     """Compute full financial summary across the fleet."""
-    total_fuel = db.query(sql_func.coalesce(sql_func.sum(FuelLog.cost), 0.0)).scalar()
-    total_maintenance = db.query(sql_func.coalesce(sql_func.sum(MaintenanceLog.cost), 0.0)).scalar()
-    total_expenses = db.query(sql_func.coalesce(sql_func.sum(Expense.amount), 0.0)).scalar()
-    total_revenue = db.query(sql_func.coalesce(sql_func.sum(Trip.revenue), 0.0)).filter(
-        Trip.status == "Completed"
-    ).scalar()
-    total_liters = db.query(sql_func.coalesce(sql_func.sum(FuelLog.liters), 0.0)).scalar()
-    total_distance = db.query(sql_func.coalesce(sql_func.sum(Trip.distance), 0.0)).filter(
-        Trip.status == "Completed"
-    ).scalar()
+    async def _total(column, *criteria):
+        return (await db.execute(select(sql_func.coalesce(sql_func.sum(column), 0.0)).where(*criteria))).scalar()
+
+    total_fuel = await _total(FuelLog.cost)
+    total_maintenance = await _total(MaintenanceLog.cost)
+    total_expenses = await _total(Expense.amount)
+    total_revenue = await _total(Trip.revenue, Trip.status == "Completed")
+    total_liters = await _total(FuelLog.liters)
+    total_distance = await _total(Trip.distance, Trip.status == "Completed")
 
     fuel_efficiency = round(float(total_distance) / float(total_liters), 2) if float(total_liters) > 0 else 0
 
@@ -116,7 +148,7 @@ def get_financial_summary(db: Session) -> dict:
     profit = float(total_revenue) - total_cost
 
     # Fleet ROI
-    total_acquisition = db.query(sql_func.coalesce(sql_func.sum(Vehicle.acquisition_cost), 0.0)).scalar()
+    total_acquisition = await _total(Vehicle.acquisition_cost)
     fleet_roi = round(profit / float(total_acquisition), 4) if float(total_acquisition) > 0 else 0
 
     return {
@@ -133,68 +165,36 @@ def get_financial_summary(db: Session) -> dict:
     }
 
 
-def get_monthly_summary(db: Session) -> list:
-    """Monthly revenue vs cost vs profit breakdown."""
-    # Get monthly fuel costs
-    months = {}
-
-    # Fuel by month
-    fuel_monthly = db.query(
-        extract('year', FuelLog.date).label('year'),
-        extract('month', FuelLog.date).label('month'),
-        sql_func.sum(FuelLog.cost).label('fuel_cost'),
-        sql_func.sum(FuelLog.liters).label('liters'),
-    ).group_by('year', 'month').all()
-
-    for row in fuel_monthly:
-        key = f"{int(row.year)}-{int(row.month):02d}"
-        months.setdefault(key, {"month": key, "fuel_cost": 0, "maintenance_cost": 0, "expenses": 0, "revenue": 0, "liters": 0, "distance": 0})
-        months[key]["fuel_cost"] = round(float(row.fuel_cost), 2)
-        months[key]["liters"] = round(float(row.liters), 2)
-
-    # Maintenance by month
-    maint_monthly = db.query(
-        extract('year', MaintenanceLog.date).label('year'),
-        extract('month', MaintenanceLog.date).label('month'),
-        sql_func.sum(MaintenanceLog.cost).label('maint_cost'),
-    ).group_by('year', 'month').all()
-
-    for row in maint_monthly:
-        key = f"{int(row.year)}-{int(row.month):02d}"
-        months.setdefault(key, {"month": key, "fuel_cost": 0, "maintenance_cost": 0, "expenses": 0, "revenue": 0, "liters": 0, "distance": 0})
-        months[key]["maintenance_cost"] = round(float(row.maint_cost), 2)
-
-    # Expenses by month
-    exp_monthly = db.query(
-        extract('year', Expense.date).label('year'),
-        extract('month', Expense.date).label('month'),
-        sql_func.sum(Expense.amount).label('exp_cost'),
-    ).group_by('year', 'month').all()
-
-    for row in exp_monthly:
-        key = f"{int(row.year)}-{int(row.month):02d}"
-        months.setdefault(key, {"month": key, "fuel_cost": 0, "maintenance_cost": 0, "expenses": 0, "revenue": 0, "liters": 0, "distance": 0})
-        months[key]["expenses"] = round(float(row.exp_cost), 2)
-
-    # Revenue by completion month
-    rev_monthly = db.query(
-        extract('year', Trip.completed_date).label('year'),
-        extract('month', Trip.completed_date).label('month'),
-        sql_func.sum(Trip.revenue).label('revenue'),
-        sql_func.sum(Trip.distance).label('distance'),
-    ).filter(Trip.status == "Completed", Trip.completed_date.isnot(None)).group_by('year', 'month').all()
-
-    for row in rev_monthly:
-        if row.year and row.month:
-            key = f"{int(row.year)}-{int(row.month):02d}"
-            months.setdefault(key, {"month": key, "fuel_cost": 0, "maintenance_cost": 0, "expenses": 0, "revenue": 0, "liters": 0, "distance": 0})
-            months[key]["revenue"] = round(float(row.revenue), 2)
-            months[key]["distance"] = round(float(row.distance), 2)
-
-    # Compute profit for each month
+@cached("monthly_rollup")
+async def get_monthly_summary(db: AsyncSession, vehicle_id: int = None, region: str = None) -> list:
+    """
+    Monthly revenue vs cost vs profit breakdown.
+    Reads the incrementally maintained monthly_rollup table: fleet-wide by
+    default, or the per-vehicle / per-region grain when filtered.
+    """
+    if vehicle_id:
+        grain = (MonthlyRollup.vehicle_id == vehicle_id, MonthlyRollup.region == ALL_REGIONS)
+    elif region:
+        grain = (MonthlyRollup.vehicle_id == ALL_VEHICLES, MonthlyRollup.region == region)
+    else:
+        grain = (MonthlyRollup.vehicle_id == ALL_VEHICLES, MonthlyRollup.region == ALL_REGIONS)
+    rows = (await db.execute(
+        select(MonthlyRollup).where(*grain).order_by(MonthlyRollup.month)
+    )).scalars().all()
+
     result = []
-    for key in sorted(months.keys()):
-        m = months[key]
+    for row in rows:
+        m = {
+            "month": row.month,
+            "fuel_cost": round(row.fuel_cost, 2),
+            "maintenance_cost": round(row.maintenance_cost, 2),
+            "expenses": round(row.expenses, 2),
+            "revenue": round(row.revenue, 2),
+            "liters": round(row.liters, 2),
+            "distance": round(row.distance, 2),
+        }
+        if not any(m[k] for k in ROLLUP_MEASURES):
+            continue  # every source row for this month was deleted
         total_cost = m["fuel_cost"] + m["maintenance_cost"] + m["expenses"]
         m["total_cost"] = round(total_cost, 2)
         m["profit"] = round(m["revenue"] - total_cost, 2)
@@ -204,45 +204,92 @@ def get_monthly_summary(db: Session) -> list:
     return result
 
 
-def get_top_expensive_vehicles(db: Session, limit: int = 5) -> list:
-    """Top N most expensive vehicles by total operational cost."""
-    vehicles = db.query(Vehicle).all()
-    costs = []
-    for v in vehicles:
-        fuel = db.query(sql_func.coalesce(sql_func.sum(FuelLog.cost), 0.0)).filter(FuelLog.vehicle_id == v.id).scalar()
-        maint = db.query(sql_func.coalesce(sql_func.sum(MaintenanceLog.cost), 0.0)).filter(MaintenanceLog.vehicle_id == v.id).scalar()
-        exp = db.query(sql_func.coalesce(sql_func.sum(Expense.amount), 0.0)).filter(Expense.vehicle_id == v.id).scalar()
-        total = float(fuel) + float(maint) + float(exp)
-        costs.append({
-            "vehicle_id": v.id,
-            "vehicle_name": v.name,
-            "license_plate": v.license_plate,
-            "total_cost": round(total, 2),
-            "fuel_cost": round(float(fuel), 2),
-            "maintenance_cost": round(float(maint), 2),
-            "expense_cost": round(float(exp), 2),
-        })
-    costs.sort(key=lambda x: x["total_cost"], reverse=True)
-    return costs[:limit]
-
-
-def get_idle_vehicles(db: Session) -> list:
-    """Dead stock: vehicles that are Available but have had no trips in the last 30 days."""
-    from datetime import timedelta
-    cutoff = date.today() - timedelta(days=30)
-    vehicles = db.query(Vehicle).filter(Vehicle.status == "Available").all()
-    idle = []
-    for v in vehicles:
-        recent = db.query(Trip).filter(
-            Trip.vehicle_id == v.id,
-            Trip.created_at >= cutoff
-        ).count()
-        if recent == 0:
-            idle.append({
-                "vehicle_id": v.id,
-                "vehicle_name": v.name,
-                "license_plate": v.license_plate,
-                "status": v.status,
-                "odometer": v.odometer,
-            })
-    return idle
+async def get_top_expensive_vehicles(db: AsyncSession, limit: int = 5, date_from: date = None, date_to: date = None,
+                                     region: str = None, vehicle_type: str = None) -> list:
+    """
+    Top N most expensive vehicles by total operational cost.
+    The three cost sources are combined with UNION ALL, summed per vehicle and
+    ranked in the database, so only `limit` rows ever leave SQL.
+    """
+    def _costs(model, amount_col, slot: str):
+        """One UNION branch: (vehicle_id, fuel, maint, exp) with the amount in `slot`, zeros elsewhere."""
+        amounts = [(amount_col if name == slot else literal(0.0)).label(name) for name in ("fuel", "maint", "exp")]
+        q = select(model.vehicle_id.label("vehicle_id"), *amounts)
+        if date_from:
+            q = q.where(model.date >= date_from)
+        if date_to:
+            q = q.where(model.date <= date_to)
+        return q
+
+    combined = union_all(
+        _costs(FuelLog, FuelLog.cost, "fuel"),
+        _costs(MaintenanceLog, MaintenanceLog.cost, "maint"),
+        _costs(Expense, Expense.amount, "exp"),
+    ).subquery()
+    per_vehicle = select(
+        combined.c.vehicle_id,
+        sql_func.sum(combined.c.fuel).label("fuel"),
+        sql_func.sum(combined.c.maint).label("maint"),
+        sql_func.sum(combined.c.exp).label("exp"),
+    ).group_by(combined.c.vehicle_id).subquery()
+
+    fuel = sql_func.coalesce(per_vehicle.c.fuel, 0.0)
+    maint = sql_func.coalesce(per_vehicle.c.maint, 0.0)
+    exp = sql_func.coalesce(per_vehicle.c.exp, 0.0)
+    total = (fuel + maint + exp).label("total")
+
+    stmt = select(Vehicle.id, Vehicle.name, Vehicle.license_plate, fuel, maint, exp, total).outerjoin(
+        per_vehicle, per_vehicle.c.vehicle_id == Vehicle.id
+    )
+    if region:
+        stmt = stmt.where(Vehicle.region == region)
+    if vehicle_type:
+        stmt = stmt.where(Vehicle.vehicle_type == vehicle_type)
+    rows = (await db.execute(stmt.order_by(total.desc(), Vehicle.id).limit(limit))).all()
+
+    return [
+        {
+            "vehicle_id": row[0],
+            "vehicle_name": row[1],
+            "license_plate": row[2],
+            "total_cost": round(float(row[6]), 2),
+            "fuel_cost": round(float(row[3]), 2),
+            "maintenance_cost": round(float(row[4]), 2),
+            "expense_cost": round(float(row[5]), 2),
+        }
+        for row in rows
+    ]
+
+
+async def get_idle_vehicles(db: AsyncSession, days: int = 30) -> list:
+    """
+    Dead stock: vehicles that are Available but have had no trips in the last `days` days.
+    Single anti-join (NOT EXISTS) query; both the existence probe and the
+    last-trip lookup are served by the (vehicle_id, created_at) index on trips.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    recent_trip = exists().where(Trip.vehicle_id == Vehicle.id, Trip.created_at >= cutoff)
+    last_trip = select(sql_func.max(Trip.created_at)).where(
+        Trip.vehicle_id == Vehicle.id
+    ).correlate(Vehicle).scalar_subquery()
+
+    rows = (await db.execute(
+        select(
+            Vehicle.id, Vehicle.name, Vehicle.license_plate, Vehicle.status, Vehicle.odometer,
+            last_trip.label("last_trip_date"),
+        ).where(
+            Vehicle.status == "Available", ~recent_trip
+        ).order_by(Vehicle.id)
+    )).all()
+
+    return [
+        {
+            "vehicle_id": row.id,
+            "vehicle_name": row.name,
+            "license_plate": row.license_plate,
+            "status": row.status,
+            "odometer": row.odometer,
+            "last_trip_date": row.last_trip_date,
+        }
+        for row in rows
+    ]
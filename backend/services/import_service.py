@@ -0,0 +1,181 @@
+"""
+Import service – bulk CSV ingestion for fuel logs and expenses.
+The upload is parsed row by row (never loaded whole) and each row is validated
+with the same schema as the single-row endpoint; vehicle ids are checked
+against one prefetched id set. Reading, parsing and validation run in a
+worker thread one chunk at a time, so only the database writes share the
+event loop with other requests. Valid rows are written in chunks – one
+executemany INSERT, one rollup upsert and one summarizing audit entry per
+chunk, committed together – so a large file never holds the write lock for
+long and a failure only affects its own chunk.
+"""
+import csv
+import io
+from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import select, insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.vehicle import Vehicle
+from models.trip import Trip
+from models.fuel_log import FuelLog
+from models.expense import Expense
+from schemas.finance import FuelLogCreate, ExpenseCreate
+from services.audit_service import log_action, Actions
+from services.rollup_service import apply_rollup_deltas
+from config import IMPORT_CHUNK_SIZE, IMPORT_MAX_ERRORS
+
+IMPORTS = {
+    "fuel_logs": {
+        "model": FuelLog,
+        "schema": FuelLogCreate,
+        "action": Actions.IMPORT_FUEL_LOGS,
+        "entity_type": "fuel_log",
+        "label": "fuel logs",
+        "rollup": lambda row: {"fuel_cost": row["cost"], "liters": row["liters"]},
+    },
+    "expenses": {
+        "model": Expense,
+        "schema": ExpenseCreate,
+        "action": Actions.IMPORT_EXPENSES,
+        "entity_type": "expense",
+        "label": "expenses",
+        "rollup": lambda row: {"expenses": row["amount"]},
+    },
+}
+
+
+class _ImportReport:
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.batches = 0
+        self.errors = []
+        self.errors_truncated = False
+
+    def fail(self, line: int, messages: list):
+        self.failed += 1
+        if len(self.errors) < IMPORT_MAX_ERRORS:
+            self.errors.append({"row": line, "errors": messages})
+        else:
+            self.errors_truncated = True
+
+    def as_dict(self) -> dict:
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "batches": self.batches,
+            "errors": self.errors,
+            "errors_truncated": self.errors_truncated,
+        }
+
+
+def _validation_messages(exc: ValidationError) -> list:
+    return [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in exc.errors()]
+
+
+def _read_chunk(reader: csv.DictReader, schema, fields: set, regions: dict, report: _ImportReport):
+    """
+    Parse and validate rows until IMPORT_CHUNK_SIZE are valid or the file ends.
+    Blocking (file reads, pydantic) – called through run_in_threadpool.
+    Returns (chunk of (line, row) pairs, whether the file is exhausted).
+    """
+    chunk = []
+    try:
+        for record in reader:
+            line = reader.line_num
+            values = {
+                key.strip(): value.strip() for key, value in record.items()
+                if key and key.strip() in fields and isinstance(value, str) and value.strip()
+            }
+            try:
+                row = schema.model_validate(values).model_dump()
+            except ValidationError as e:
+                report.fail(line, _validation_messages(e))
+                continue
+            if row["vehicle_id"] not in regions:
+                report.fail(line, [f"vehicle_id: Vehicle {row['vehicle_id']} not found"])
+                continue
+            chunk.append((line, row))
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                return chunk, False
+    except (UnicodeDecodeError, csv.Error) as e:
+        report.fail(reader.line_num + 1, [f"Unreadable CSV content, import stopped: {e}"])
+    return chunk, True
+
+
+async def _write_chunk(db: AsyncSession, spec: dict, chunk: list, regions: dict, user_id: int,
+                       filename: str, report: _ImportReport):
+    """Insert one chunk of validated (line, row) pairs with its rollup deltas and audit entry."""
+    trip_ids = {row["trip_id"] for _, row in chunk if row.get("trip_id")}
+    if trip_ids:
+        known_trips = set((await db.execute(select(Trip.id).where(Trip.id.in_(trip_ids)))).scalars())
+        valid = []
+        for line, row in chunk:
+            if row.get("trip_id") and row["trip_id"] not in known_trips:
+                report.fail(line, [f"trip_id: Trip {row['trip_id']} not found"])
+            else:
+                valid.append((line, row))
+        chunk = valid
+    if not chunk:
+        return
+
+    model = spec["model"]
+    rows = [row for _, row in chunk]
+    try:
+        ids = (await db.scalars(insert(model).returning(model.id), rows)).all()
+        await apply_rollup_deltas(
+            db, [(row["vehicle_id"], row["date"], spec["rollup"](row)) for row in rows], regions
+        )
+        await log_action(db, user_id, spec["action"], spec["entity_type"], min(ids),
+                         f"Imported {len(ids)} {spec['label']} from {filename} "
+                         f"(ids {min(ids)}-{max(ids)}, lines {chunk[0][0]}-{chunk[-1][0]})")
+        await db.commit()
+    except SQLAlchemyError as e:
+        await db.rollback()
+        for line, _ in chunk:
+            report.fail(line, [f"Database error: {e.__class__.__name__}"])
+        return
+    report.imported += len(ids)
+    report.batches += 1
+
+
+async def import_csv(db: AsyncSession, dataset: str, upload: UploadFile, user_id: int) -> dict:
+    """
+    Import a CSV upload into `dataset` (a key of IMPORTS).
+    Columns are the fields of the dataset's create schema; unknown columns
+    are ignored and empty cells count as missing. Commits per chunk and
+    returns an import report with per-row errors (CSV line numbers).
+    """
+    spec = IMPORTS[dataset]
+    schema = spec["schema"]
+    fields = set(schema.model_fields)
+    required = {name for name, field in schema.model_fields.items() if field.is_required()}
+
+    stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(stream)
+        try:
+            header = await run_in_threadpool(lambda: reader.fieldnames)
+        except (UnicodeDecodeError, csv.Error):
+            raise HTTPException(status_code=400, detail="File must be a UTF-8 encoded CSV")
+        if not header:
+            raise HTTPException(status_code=400, detail="CSV file is empty")
+        missing = required - {name.strip() for name in header}
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Missing required columns: {sorted(missing)}")
+
+        regions = dict((await db.execute(select(Vehicle.id, Vehicle.region))).all())
+        await db.commit()  # end the read transaction; each chunk commits on its own
+
+        report = _ImportReport()
+        filename = upload.filename or "upload.csv"
+        done = False
+        while not done:
+            chunk, done = await run_in_threadpool(_read_chunk, reader, schema, fields, regions, report)
+            if chunk:
+                await _write_chunk(db, spec, chunk, regions, user_id, filename, report)
+        return report.as_dict()
+    finally:
+        stream.detach()  # leave the upload's file object for FastAPI to close
@@ -1,34 +1,40 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select, func as sql_func
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 from models.maintenance import MaintenanceLog, MaintenanceStatus
 from models.vehicle import Vehicle, VehicleStatus
 from schemas.maintenance import MaintenanceLogCreate, MaintenanceLogUpdate
+from services.pagination import paginate
+from services.vehicle_service import vehicle_names
+from services.rollup_service import apply_rollup_delta
+from config import DEFAULT_PAGE_SIZE
 
 
-def get_all_logs(db: Session, vehicle_id: int = None, status_filter: str = None):
-    """Retrieve all maintenance logs with optional filters."""
-    query = db.query(MaintenanceLog)
+async def get_all_logs(db: AsyncSession, vehicle_id: int = None, status_filter: str = None,
+                       limit: int = DEFAULT_PAGE_SIZE, after: str = None):
+    """Retrieve one page of maintenance logs with optional filters. Returns (logs, next_cursor)."""
+    stmt = select(MaintenanceLog)
     if vehicle_id:
-        query = query.filter(MaintenanceLog.vehicle_id == vehicle_id)
+        stmt = stmt.where(MaintenanceLog.vehicle_id == vehicle_id)
     if status_filter:
-        query = query.filter(MaintenanceLog.status == status_filter)
-    return query.order_by(MaintenanceLog.id.desc()).all()
+        stmt = stmt.where(MaintenanceLog.status == status_filter)
+    return await paginate(db, stmt, MaintenanceLog.id, limit, after)
 
 
-def get_log_by_id(db: Session, log_id: int) -> MaintenanceLog:
+async def get_log_by_id(db: AsyncSession, log_id: int) -> MaintenanceLog:
     """Get a single maintenance log or raise 404."""
-    log = db.query(MaintenanceLog).filter(MaintenanceLog.id == log_id).first()
+    log = await db.get(MaintenanceLog, log_id)
     if not log:
         raise HTTPException(status_code=404, detail="Maintenance log not found")
     return log
 
 
-def create_log(db: Session, data: MaintenanceLogCreate) -> MaintenanceLog:
+async def create_log(db: AsyncSession, data: MaintenanceLogCreate) -> MaintenanceLog:
     """
     Create a maintenance log and automatically set vehicle to "In Shop".
     Vehicle must not be on a trip.
     """
-    vehicle = db.query(Vehicle).filter(Vehicle.id == data.vehicle_id).first()
+    vehicle = await db.get(Vehicle, data.vehicle_id)
     if not vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found")
 
@@ -41,62 +47,81 @@ def create_log(db: Session, data: MaintenanceLogCreate) -> MaintenanceLog:
     log = MaintenanceLog(**data.model_dump())
     db.add(log)
     vehicle.status = VehicleStatus.IN_SHOP.value
-    db.flush()
+    await db.flush()
+    await apply_rollup_delta(db, log.vehicle_id, log.date, maintenance_cost=log.cost)
     return log
 
 
-def update_log(db: Session, log_id: int, data: MaintenanceLogUpdate) -> MaintenanceLog:
+async def _open_log_count(db: AsyncSession, vehicle_id: int, *criteria) -> int:
+    return (await db.execute(
+        select(sql_func.count(MaintenanceLog.id)).where(
+            MaintenanceLog.vehicle_id == vehicle_id,
+            MaintenanceLog.status != MaintenanceStatus.RESOLVED.value,
+            *criteria,
+        )
+    )).scalar()
+
+
+async def update_log(db: AsyncSession, log_id: int, data: MaintenanceLogUpdate) -> MaintenanceLog:
     """
     Update maintenance log. If status changes to "Resolved",
     check if vehicle has other open logs before setting back to "Available".
     """
-    log = get_log_by_id(db, log_id)
+    log = await get_log_by_id(db, log_id)
     update_data = data.model_dump(exclude_unset=True)
 
     old_status = log.status
+    old_cost = log.cost or 0.0
 
     for key, value in update_data.items():
         setattr(log, key, value)
 
+    if (log.cost or 0.0) != old_cost:
+        await apply_rollup_delta(db, log.vehicle_id, log.date, maintenance_cost=(log.cost or 0.0) - old_cost)
+
     # If resolving the log, potentially release the vehicle
     if "status" in update_data and update_data["status"] == MaintenanceStatus.RESOLVED.value:
         if old_status != MaintenanceStatus.RESOLVED.value:
-            vehicle = db.query(Vehicle).filter(Vehicle.id == log.vehicle_id).first()
+            vehicle = await db.get(Vehicle, log.vehicle_id)
             # Check if there are other unresolved logs
-            open_count = db.query(MaintenanceLog).filter(
-                MaintenanceLog.vehicle_id == log.vehicle_id,
-                MaintenanceLog.id != log.id,
-                MaintenanceLog.status != MaintenanceStatus.RESOLVED.value,
-            ).count()
+            open_count = await _open_log_count(db, log.vehicle_id, MaintenanceLog.id != log.id)
             if open_count == 0 and vehicle.status == VehicleStatus.IN_SHOP.value:
                 vehicle.status = VehicleStatus.AVAILABLE.value
 
-    db.flush()
+    await db.flush()
     return log
 
 
-def delete_log(db: Session, log_id: int):
+async def delete_log(db: AsyncSession, log_id: int):
     """Delete a maintenance log."""
-    log = get_log_by_id(db, log_id)
+    log = await get_log_by_id(db, log_id)
     vehicle_id = log.vehicle_id
-    db.delete(log)
+    await apply_rollup_delta(db, vehicle_id, log.date, maintenance_cost=-(log.cost or 0.0))
+    await db.delete(log)
+    await db.flush()
 
     # Check if vehicle should be released
-    open_count = db.query(MaintenanceLog).filter(
-        MaintenanceLog.vehicle_id == vehicle_id,
-        MaintenanceLog.status != MaintenanceStatus.RESOLVED.value,
-    ).count()
-    vehicle = db.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
+    open_count = await _open_log_count(db, vehicle_id)
+    vehicle = await db.get(Vehicle, vehicle_id)
     if open_count == 0 and vehicle and vehicle.status == VehicleStatus.IN_SHOP.value:
         vehicle.status = VehicleStatus.AVAILABLE.value
 
-    db.flush()
+    await db.flush()
     return {"detail": "Maintenance log deleted", "id": log_id}
 
 
-def enrich_log(db: Session, log: MaintenanceLog) -> dict:
+async def enrich_log(db: AsyncSession, log: MaintenanceLog) -> dict:
     """Add vehicle name to maintenance log output."""
-    vehicle = db.query(Vehicle).filter(Vehicle.id == log.vehicle_id).first()
+    return (await enrich_logs(db, [log]))[0]
+
+
+async def enrich_logs(db: AsyncSession, logs: list) -> list:
+    """Batch version of enrich_log: one vehicle name lookup for the whole list."""
+    names = await vehicle_names(db, [l.vehicle_id for l in logs])
+    return [_log_to_dict(l, names.get(l.vehicle_id)) for l in logs]
+
+
+def _log_to_dict(log: MaintenanceLog, vehicle_name: str) -> dict:
     return {
         "id": log.id,
         "vehicle_id": log.vehicle_id,
@@ -106,5 +131,5 @@ def enrich_log(db: Session, log: MaintenanceLog) -> dict:
         "cost": log.cost,
         "status": log.status,
         "created_at": log.created_at,
-        "vehicle_name": vehicle.name if vehicle else None,
+        "vehicle_name": vehicle_name,
     }
@@ -0,0 +1,86 @@
+"""
+Keyset (cursor) pagination helpers.
+Most list endpoints order by `id desc`, so the cursor is simply the id of the
+last row on the page, encoded so clients treat it as opaque. Time-ordered
+feeds (audit trail) page on `(timestamp, id)` instead.
+"""
+import base64
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def encode_cursor(last_id: int) -> str:
+    """Encode a row id into an opaque, URL-safe cursor."""
+    return base64.urlsafe_b64encode(f"id:{last_id}".encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str, expected_prefix: str) -> str:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        prefix, _, value = base64.urlsafe_b64decode(padded.encode()).decode().partition(":")
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    if prefix != expected_prefix:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    return value
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a cursor produced by encode_cursor(). Raises 400 on garbage input."""
+    try:
+        return int(_decode(cursor, "id"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def encode_time_cursor(timestamp: datetime, last_id: int) -> str:
+    """Encode a (timestamp, id) position into an opaque cursor."""
+    return base64.urlsafe_b64encode(f"ts:{timestamp.isoformat()}|{last_id}".encode()).decode().rstrip("=")
+
+
+def decode_time_cursor(cursor: str) -> tuple:
+    """Decode a cursor produced by encode_time_cursor() into (timestamp, id)."""
+    try:
+        timestamp, _, last_id = _decode(cursor, "ts").rpartition("|")
+        return datetime.fromisoformat(timestamp), int(last_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+async def paginate(db: AsyncSession, stmt, id_column, limit: int, after: str = None):
+    """
+    Apply keyset pagination on `id desc` to a select() of one entity.
+    Fetches one extra row to know whether another page exists.
+    Returns (rows, next_cursor) – next_cursor is None on the last page.
+    """
+    if after:
+        stmt = stmt.where(id_column < decode_cursor(after))
+    rows = (await db.execute(stmt.order_by(id_column.desc()).limit(limit + 1))).scalars().all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].id)
+    return rows, None
+
+
+async def paginate_by_time(db: AsyncSession, stmt, time_column, id_column, limit: int, after: str = None,
+                           descending: bool = True):
+    """
+    Keyset pagination on `(time_column, id_column)`, newest first by default.
+    The id breaks ties between rows sharing a timestamp.
+    Returns (rows, next_cursor) like paginate().
+    """
+    if after:
+        ts, last_id = decode_time_cursor(after)
+        if descending:
+            stmt = stmt.where(or_(time_column < ts, and_(time_column == ts, id_column < last_id)))
+        else:
+            stmt = stmt.where(or_(time_column > ts, and_(time_column == ts, id_column > last_id)))
+    order = (time_column.desc(), id_column.desc()) if descending else (time_column.asc(), id_column.asc())
+    rows = (await db.execute(stmt.order_by(*order).limit(limit + 1))).scalars().all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        return rows, encode_time_cursor(getattr(last, time_column.key), getattr(last, id_column.key))
+    return rows, None
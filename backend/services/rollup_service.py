@@ -0,0 +1,164 @@
+"""
+Rollup service – keeps the monthly_rollup table in step with source writes.
+Deltas are applied with an INSERT ... ON CONFLICT DO UPDATE in the caller's
+transaction, so the rollup commits (or rolls back) with the business write.
+"""
+import logging
+from datetime import date
+from sqlalchemy import extract, func as sql_func, delete, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.monthly_rollup import MonthlyRollup, ALL_VEHICLES, ALL_REGIONS
+from models.vehicle import Vehicle
+from models.fuel_log import FuelLog
+from models.maintenance import MaintenanceLog
+from models.expense import Expense
+from models.trip import Trip
+
+logger = logging.getLogger("fleet.rollup")
+
+MEASURES = ("fuel_cost", "liters", "maintenance_cost", "expenses", "revenue", "distance")
+_INSERTS = {"sqlite": sqlite_insert, "postgresql": pg_insert}
+
+
+def month_key(value: date) -> str:
+    """'YYYY-MM' bucket for a date or datetime."""
+    return f"{value.year}-{value.month:02d}"
+
+
+async def _upsert(db: AsyncSession, rows: list):
+    """Add each row's measures onto existing rollup rows, creating them if missing."""
+    insert = _INSERTS.get(db.bind.dialect.name)
+    if insert is None:
+        # Generic fallback: read-modify-write through the identity map.
+        for row in rows:
+            key = (row["month"], row["vehicle_id"], row["region"])
+            existing = await db.get(MonthlyRollup, key)
+            if existing is None:
+                existing = MonthlyRollup(**{**{m: 0.0 for m in MEASURES}, "month": key[0],
+                                            "vehicle_id": key[1], "region": key[2]})
+                db.add(existing)
+            for m in MEASURES:
+                setattr(existing, m, getattr(existing, m) + row[m])
+        await db.flush()
+        return
+    stmt = insert(MonthlyRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["month", "vehicle_id", "region"],
+        set_={m: getattr(MonthlyRollup, m) + getattr(stmt.excluded, m) for m in MEASURES},
+    )
+    await db.execute(stmt, rows)
+
+
+def _grains(vehicle_id: int, region: str) -> list:
+    """(vehicle_id, region) keys a single source row contributes to."""
+    keys = [(vehicle_id, ALL_REGIONS), (ALL_VEHICLES, ALL_REGIONS)]
+    if region != ALL_REGIONS:
+        keys.append((ALL_VEHICLES, region))
+    return keys
+
+
+async def apply_rollup_delta(db: AsyncSession, vehicle_id: int, on_date: date, **deltas):
+    """
+    Apply measure deltas (e.g. fuel_cost=+12.5, liters=+5) for one vehicle/month.
+    Negative deltas reverse a previous write (deletes, cost edits).
+    """
+    if on_date is None or not any(deltas.values()):
+        return
+    vehicle = await db.get(Vehicle, vehicle_id)
+    region = vehicle.region if vehicle and vehicle.region else ALL_REGIONS
+    month = month_key(on_date)
+    measures = {m: float(deltas.get(m, 0.0) or 0.0) for m in MEASURES}
+    await _upsert(db, [{"month": month, "vehicle_id": v, "region": r, **measures} for v, r in _grains(vehicle_id, region)])
+
+
+async def apply_rollup_deltas(db: AsyncSession, entries, regions: dict):
+    """
+    Batch form of apply_rollup_delta for bulk writes: `entries` are
+    (vehicle_id, on_date, deltas) tuples, `regions` maps vehicle_id -> region.
+    Deltas are summed per rollup key first, so a whole chunk costs one upsert.
+    """
+    totals = {}
+    for vehicle_id, on_date, deltas in entries:
+        region = regions.get(vehicle_id) or ALL_REGIONS
+        for v, r in _grains(vehicle_id, region):
+            bucket = totals.setdefault((month_key(on_date), v, r), dict.fromkeys(MEASURES, 0.0))
+            for name, delta in deltas.items():
+                bucket[name] += float(delta or 0.0)
+    if totals:
+        await _upsert(db, [{"month": m, "vehicle_id": v, "region": r, **measures}
+                           for (m, v, r), measures in totals.items()])
+
+
+async def move_rollup_region(db: AsyncSession, vehicle_id: int, old_region: str, new_region: str):
+    """
+    Move a vehicle's history between regional grains after a region change:
+    its per-vehicle monthly totals come off (ALL_VEHICLES, old_region) and
+    go onto (ALL_VEHICLES, new_region), in the caller's transaction.
+    """
+    old_region, new_region = old_region or ALL_REGIONS, new_region or ALL_REGIONS
+    if old_region == new_region:
+        return
+    history = (await db.execute(
+        select(MonthlyRollup).where(MonthlyRollup.vehicle_id == vehicle_id, MonthlyRollup.region == ALL_REGIONS)
+    )).scalars().all()
+    rows = []
+    for month_row in history:
+        measures = {m: getattr(month_row, m) for m in MEASURES}
+        if old_region != ALL_REGIONS:
+            rows.append({"month": month_row.month, "vehicle_id": ALL_VEHICLES, "region": old_region,
+                         **{m: -value for m, value in measures.items()}})
+        if new_region != ALL_REGIONS:
+            rows.append({"month": month_row.month, "vehicle_id": ALL_VEHICLES, "region": new_region, **measures})
+    if rows:
+        await _upsert(db, rows)
+
+
+def rebuild_monthly_rollup(db: Session) -> int:
+    """
+    Recompute monthly_rollup from source tables (backfill / repair).
+    Flushes only — caller owns the transaction. Returns number of rows written.
+    """
+    regions = dict(db.query(Vehicle.id, Vehicle.region).all())
+    sources = [
+        (FuelLog.date, FuelLog.vehicle_id, {"fuel_cost": FuelLog.cost, "liters": FuelLog.liters}, ()),
+        (MaintenanceLog.date, MaintenanceLog.vehicle_id, {"maintenance_cost": MaintenanceLog.cost}, ()),
+        (Expense.date, Expense.vehicle_id, {"expenses": Expense.amount}, ()),
+        (Trip.completed_date, Trip.vehicle_id, {"revenue": Trip.revenue, "distance": Trip.distance},
+         (Trip.status == "Completed", Trip.completed_date.isnot(None))),
+    ]
+
+    totals = {}
+    for date_col, vehicle_col, measures, criteria in sources:
+        year, month = extract("year", date_col).label("year"), extract("month", date_col).label("month")
+        query = db.query(
+            year, month, vehicle_col, *(sql_func.sum(col).label(name) for name, col in measures.items())
+        ).filter(*criteria).group_by(year, month, vehicle_col)
+        for row in query.all():
+            key_month = f"{int(row.year)}-{int(row.month):02d}"
+            for v, r in _grains(row[2], regions.get(row[2]) or ALL_REGIONS):
+                bucket = totals.setdefault((key_month, v, r), dict.fromkeys(MEASURES, 0.0))
+                for name in measures:
+                    bucket[name] += float(getattr(row, name) or 0.0)
+
+    db.execute(delete(MonthlyRollup))
+    if totals:
+        db.execute(MonthlyRollup.__table__.insert(), [
+            {"month": m, "vehicle_id": v, "region": r, **measures} for (m, v, r), measures in totals.items()
+        ])
+    db.flush()
+    logger.info("Monthly rollup rebuilt: %d rows", len(totals))
+    return len(totals)
+
+
+def ensure_monthly_rollup(db: Session):
+    """Backfill the rollup for databases that predate it (empty rollup, existing data)."""
+    if db.query(MonthlyRollup.month).first() is not None:
+        return
+    if db.query(FuelLog.id).first() is None and db.query(MaintenanceLog.id).first() is None \
+            and db.query(Expense.id).first() is None and db.query(Trip.id).first() is None:
+        return
+    rebuild_monthly_rollup(db)
+    db.commit()
@@ -1,113 +1,115 @@
 import logging
 from datetime import datetime, timezone
-from sqlalchemy.orm import Session
+from collections import Counter
+from sqlalchemy import select, or_
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 from models.trip import Trip, TripStatus
 from models.vehicle import Vehicle, VehicleStatus
 from models.driver import Driver, DriverStatus
 from schemas.trip import TripCreate, TripUpdate, TripComplete
-from services.driver_service import is_license_expired, recalculate_driver_stats
+from services.driver_service import is_license_expired, record_trip_event
+from services.vehicle_service import names_by_id, vehicle_names
 from services.audit_service import log_action, Actions
+from services.pagination import paginate
+from services.rollup_service import apply_rollup_delta
+from config import DEFAULT_PAGE_SIZE
 
 logger = logging.getLogger("fleet.trips")
 
 
-def get_all_trips(db: Session, status_filter: str = None, search: str = None):
-    """Retrieve all trips with optional filters, joined with vehicle/driver names."""
-    query = db.query(Trip)
+async def get_all_trips(db: AsyncSession, status_filter: str = None, search: str = None,
+                        limit: int = DEFAULT_PAGE_SIZE, after: str = None):
+    """Retrieve one page of trips with optional filters. Returns (trips, next_cursor)."""
+    stmt = select(Trip)
     if status_filter:
-        query = query.filter(Trip.status == status_filter)
+        stmt = stmt.where(Trip.status == status_filter)
     if search:
-        query = query.filter(
+        stmt = stmt.where(
             (Trip.origin.ilike(f"%{search}%")) |
             (Trip.destination.ilike(f"%{search}%"))
         )
-    trips = query.order_by(Trip.id.desc()).all()
-    return trips
+    return await paginate(db, stmt, Trip.id, limit, after)
 
 
-def get_trip_by_id(db: Session, trip_id: int) -> Trip:
+async def get_trip_by_id(db: AsyncSession, trip_id: int) -> Trip:
     """Get a single trip or raise 404."""
-    trip = db.query(Trip).filter(Trip.id == trip_id).first()
+    trip = await db.get(Trip, trip_id)
     if not trip:
         raise HTTPException(status_code=404, detail="Trip not found")
     return trip
 
 
-def create_trip(db: Session, data: TripCreate) -> Trip:
+def _assignment_errors(vehicle: Vehicle, driver: Driver, cargo_weight: float) -> list:
+    """Capacity, license and availability rules for putting `driver` on `vehicle`."""
+    errors = []
+    if cargo_weight > vehicle.max_capacity:
+        errors.append(f"Cargo weight ({cargo_weight}kg) exceeds vehicle capacity ({vehicle.max_capacity}kg)")
+    if is_license_expired(driver):
+        errors.append(f"Driver '{driver.full_name}' has an expired license (expired {driver.license_expiry})")
+    if driver.status != DriverStatus.ON_DUTY.value:
+        errors.append(f"Driver '{driver.full_name}' is not On Duty (current: {driver.status})")
+    if vehicle.status != VehicleStatus.AVAILABLE.value:
+        errors.append(f"Vehicle '{vehicle.name}' is not Available (current: {vehicle.status})")
+    return errors
+
+
+async def create_trip(db: AsyncSession, data: TripCreate) -> Trip:
     """
     Create a trip in DRAFT status.
     Validates vehicle capacity and driver eligibility but does NOT
     change vehicle/driver status until dispatch.
     """
-    vehicle = db.query(Vehicle).filter(Vehicle.id == data.vehicle_id).first()
+    vehicle = await db.get(Vehicle, data.vehicle_id)
     if not vehicle:
         raise HTTPException(status_code=404, detail="Vehicle not found")
 
-    driver = db.query(Driver).filter(Driver.id == data.driver_id).first()
+    driver = await db.get(Driver, data.driver_id)
     if not driver:
         raise HTTPException(status_code=404, detail="Driver not found")
 
-    if data.cargo_weight > vehicle.max_capacity:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Cargo weight ({data.cargo_weight}kg) exceeds vehicle capacity ({vehicle.max_capacity}kg)"
-        )
-
-    if is_license_expired(driver):
-        raise HTTPException(
-            status_code=400,
-            detail=f"Driver '{driver.full_name}' has an expired license (expired {driver.license_expiry})"
-        )
-
-    if driver.status != DriverStatus.ON_DUTY.value:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Driver '{driver.full_name}' is not On Duty (current: {driver.status})"
-        )
+    errors = _assignment_errors(vehicle, driver, data.cargo_weight)
+    if errors:
+        raise HTTPException(status_code=400, detail=errors[0])
 
-    if vehicle.status != VehicleStatus.AVAILABLE.value:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Vehicle '{vehicle.name}' is not Available (current: {vehicle.status})"
-        )
-
-    active_vehicle_trip = db.query(Trip).filter(
+    active_vehicle_trip = (await db.execute(select(Trip.id).where(
         Trip.vehicle_id == data.vehicle_id,
         Trip.status.in_([TripStatus.DISPATCHED.value])
-    ).first()
+    ).limit(1))).first()
     if active_vehicle_trip:
         raise HTTPException(status_code=400, detail="Vehicle is already assigned to an active trip")
 
-    active_driver_trip = db.query(Trip).filter(
+    active_driver_trip = (await db.execute(select(Trip.id).where(
         Trip.driver_id == data.driver_id,
         Trip.status.in_([TripStatus.DISPATCHED.value])
-    ).first()
+    ).limit(1))).first()
     if active_driver_trip:
         raise HTTPException(status_code=400, detail="Driver is already assigned to an active trip")
 
     trip = Trip(**data.model_dump())
     trip.status = TripStatus.DRAFT.value
     db.add(trip)
-    db.flush()  # get trip.id for audit log
+    await db.flush()  # get trip.id for audit log
+
+    await record_trip_event(db, driver, total=1)
 
     logger.info("Trip created: id=%d vehicle=%d driver=%d cargo=%.0fkg",
                 trip.id, trip.vehicle_id, trip.driver_id, trip.cargo_weight)
     return trip
 
 
-def dispatch_trip(db: Session, trip_id: int) -> Trip:
+async def dispatch_trip(db: AsyncSession, trip_id: int) -> Trip:
     """
     Transition trip from Draft → Dispatched.
     ATOMIC: sets vehicle to "On Trip" and driver to "On Trip".
     """
-    trip = get_trip_by_id(db, trip_id)
+    trip = await get_trip_by_id(db, trip_id)
 
     if trip.status != TripStatus.DRAFT.value:
         raise HTTPException(status_code=400, detail=f"Can only dispatch trips in Draft status (current: {trip.status})")
 
-    vehicle = db.query(Vehicle).filter(Vehicle.id == trip.vehicle_id).first()
-    driver = db.query(Driver).filter(Driver.id == trip.driver_id).first()
+    vehicle = await db.get(Vehicle, trip.vehicle_id)
+    driver = await db.get(Driver, trip.driver_id)
 
     # Re-validate at dispatch time
     if vehicle.status != VehicleStatus.AVAILABLE.value:
@@ -123,26 +125,26 @@ def dispatch_trip(db: Session, trip_id: int) -> Trip:
     vehicle.status = VehicleStatus.ON_TRIP.value
     driver.status = DriverStatus.ON_TRIP.value
 
-    db.flush()  # write — single commit happens in router
+    await db.flush()  # write — single commit happens in router
 
     logger.info("Trip dispatched: id=%d vehicle=%s→On Trip driver=%s→On Trip",
                 trip.id, vehicle.name, driver.full_name)
     return trip
 
 
-def complete_trip(db: Session, trip_id: int, data: TripComplete) -> Trip:
+async def complete_trip(db: AsyncSession, trip_id: int, data: TripComplete) -> Trip:
     """
     Transition trip from Dispatched → Completed.
     ATOMIC: resets vehicle to "Available", driver to "On Duty",
     updates odometer, recalculates driver stats.
     """
-    trip = get_trip_by_id(db, trip_id)
+    trip = await get_trip_by_id(db, trip_id)
 
     if trip.status != TripStatus.DISPATCHED.value:
         raise HTTPException(status_code=400, detail=f"Can only complete trips in Dispatched status (current: {trip.status})")
 
-    vehicle = db.query(Vehicle).filter(Vehicle.id == trip.vehicle_id).first()
-    driver = db.query(Driver).filter(Driver.id == trip.driver_id).first()
+    vehicle = await db.get(Vehicle, trip.vehicle_id)
+    driver = await db.get(Driver, trip.driver_id)
 
     trip.status = TripStatus.COMPLETED.value
     trip.distance = data.distance
@@ -155,28 +157,30 @@ def complete_trip(db: Session, trip_id: int, data: TripComplete) -> Trip:
 
     driver.status = DriverStatus.ON_DUTY.value
 
-    # Recalculate driver stats (uses flush internally)
-    recalculate_driver_stats(db, driver)
+    # Update driver counters and derived stats (uses flush internally)
+    await record_trip_event(db, driver, completed=1)
+
+    await apply_rollup_delta(db, trip.vehicle_id, trip.completed_date, revenue=trip.revenue, distance=trip.distance)
 
-    db.flush()  # write all changes — single commit happens in router
+    await db.flush()  # write all changes — single commit happens in router
 
     logger.info("Trip completed: id=%d distance=%.1fkm revenue=%.2f",
                 trip.id, data.distance, trip.revenue)
     return trip
 
 
-def cancel_trip(db: Session, trip_id: int) -> Trip:
+async def cancel_trip(db: AsyncSession, trip_id: int) -> Trip:
     """
     Cancel a trip (Draft or Dispatched).
     If dispatched, resets vehicle and driver status.
     """
-    trip = get_trip_by_id(db, trip_id)
+    trip = await get_trip_by_id(db, trip_id)
 
     if trip.status not in [TripStatus.DRAFT.value, TripStatus.DISPATCHED.value]:
         raise HTTPException(status_code=400, detail=f"Cannot cancel a trip with status '{trip.status}'")
 
-    vehicle = db.query(Vehicle).filter(Vehicle.id == trip.vehicle_id).first()
-    driver = db.query(Driver).filter(Driver.id == trip.driver_id).first()
+    vehicle = await db.get(Vehicle, trip.vehicle_id)
+    driver = await db.get(Driver, trip.driver_id)
 
     # If dispatched, reverse status changes
     was_dispatched = trip.status == TripStatus.DISPATCHED.value
@@ -186,20 +190,169 @@ def cancel_trip(db: Session, trip_id: int) -> Trip:
 
     trip.status = TripStatus.CANCELLED.value
 
-    # Recalculate driver stats (uses flush internally)
-    recalculate_driver_stats(db, driver)
+    # Update driver counters and derived stats (uses flush internally)
+    await record_trip_event(db, driver, cancelled=1)
 
-    db.flush()  # write all changes — single commit happens in router
+    await db.flush()  # write all changes — single commit happens in router
 
     logger.info("Trip cancelled: id=%d was_dispatched=%s",
                 trip.id, was_dispatched)
     return trip
 
 
-def enrich_trip(db: Session, trip: Trip) -> dict:
+async def _load_by_id(db: AsyncSession, model, ids) -> dict:
+    """One IN query; also puts the rows in the identity map for later db.get() calls."""
+    if not ids:
+        return {}
+    rows = (await db.execute(select(model).where(model.id.in_(set(ids))))).scalars().all()
+    return {row.id: row for row in rows}
+
+
+async def _dispatched_assignments(db: AsyncSession, vehicle_ids, driver_ids) -> tuple:
+    """(vehicle ids, driver ids) currently on a Dispatched trip, in one query."""
+    rows = (await db.execute(
+        select(Trip.vehicle_id, Trip.driver_id).where(
+            Trip.status == TripStatus.DISPATCHED.value,
+            or_(Trip.vehicle_id.in_(set(vehicle_ids)), Trip.driver_id.in_(set(driver_ids))),
+        )
+    )).all()
+    return {r.vehicle_id for r in rows}, {r.driver_id for r in rows}
+
+
+def _reject_batch(errors: dict):
+    """Abort the whole batch with every item's errors (index -> [messages])."""
+    raise HTTPException(status_code=400, detail={
+        "message": "Batch rejected; no trips were changed",
+        "errors": [{"index": i, "errors": errors[i]} for i in sorted(errors)],
+    })
+
+
+async def create_trips_batch(db: AsyncSession, items: list) -> list:
+    """
+    Create several Draft trips atomically.
+    Vehicles, drivers and active-trip state are loaded with three set-based
+    queries; a vehicle or driver may appear only once per scheduled date
+    within the batch. Any failing item rejects the whole batch.
+    """
+    vehicles = await _load_by_id(db, Vehicle, [item.vehicle_id for item in items])
+    drivers = await _load_by_id(db, Driver, [item.driver_id for item in items])
+    busy_vehicles, busy_drivers = await _dispatched_assignments(
+        db, [item.vehicle_id for item in items], [item.driver_id for item in items]
+    )
+
+    errors = {}
+    seen_vehicles, seen_drivers = {}, {}
+    for i, item in enumerate(items):
+        item_errors = []
+        vehicle, driver = vehicles.get(item.vehicle_id), drivers.get(item.driver_id)
+        if not vehicle:
+            item_errors.append("Vehicle not found")
+        if not driver:
+            item_errors.append("Driver not found")
+        if vehicle and driver:
+            item_errors += _assignment_errors(vehicle, driver, item.cargo_weight)
+        if item.vehicle_id in busy_vehicles:
+            item_errors.append("Vehicle is already assigned to an active trip")
+        if item.driver_id in busy_drivers:
+            item_errors.append("Driver is already assigned to an active trip")
+
+        slot = item.scheduled_date
+        if (item.vehicle_id, slot) in seen_vehicles:
+            item_errors.append(f"Vehicle also assigned by item {seen_vehicles[(item.vehicle_id, slot)]} for the same date")
+        if (item.driver_id, slot) in seen_drivers:
+            item_errors.append(f"Driver also assigned by item {seen_drivers[(item.driver_id, slot)]} for the same date")
+        seen_vehicles.setdefault((item.vehicle_id, slot), i)
+        seen_drivers.setdefault((item.driver_id, slot), i)
+
+        if item_errors:
+            errors[i] = item_errors
+    if errors:
+        _reject_batch(errors)
+
+    trips = [Trip(**item.model_dump(), status=TripStatus.DRAFT.value) for item in items]
+    db.add_all(trips)
+    await db.flush()
+    # load server defaults (created_at) for all new rows at once instead of one refresh per trip
+    await db.execute(
+        select(Trip).where(Trip.id.in_([t.id for t in trips])).execution_options(populate_existing=True)
+    )
+
+    for driver_id, count in Counter(item.driver_id for item in items).items():
+        await record_trip_event(db, drivers[driver_id], total=count)
+
+    logger.info("Batch created %d trips: ids=%s", len(trips), [t.id for t in trips])
+    return trips
+
+
+async def dispatch_trips_batch(db: AsyncSession, trip_ids: list) -> list:
+    """
+    Dispatch several Draft trips atomically (Draft → Dispatched, vehicle and
+    driver → On Trip). Trips, vehicles and drivers are loaded with three
+    set-based queries; a trip, vehicle or driver may appear only once in the
+    batch. Any failing item rejects the whole batch.
+    """
+    trips = await _load_by_id(db, Trip, trip_ids)
+    vehicles = await _load_by_id(db, Vehicle, [t.vehicle_id for t in trips.values()])
+    drivers = await _load_by_id(db, Driver, [t.driver_id for t in trips.values()])
+
+    errors = {}
+    seen_trips, seen_vehicles, seen_drivers = {}, {}, {}
+    for i, trip_id in enumerate(trip_ids):
+        trip = trips.get(trip_id)
+        if not trip:
+            errors[i] = ["Trip not found"]
+            continue
+        item_errors = []
+        if trip_id in seen_trips:
+            item_errors.append(f"Trip also listed as item {seen_trips[trip_id]}")
+        if trip.status != TripStatus.DRAFT.value:
+            item_errors.append(f"Can only dispatch trips in Draft status (current: {trip.status})")
+
+        vehicle, driver = vehicles.get(trip.vehicle_id), drivers.get(trip.driver_id)
+        if vehicle.status != VehicleStatus.AVAILABLE.value:
+            item_errors.append(f"Vehicle is no longer available (current: {vehicle.status})")
+        if is_license_expired(driver):
+            item_errors.append("Driver's license has expired since trip creation")
+        if driver.status != DriverStatus.ON_DUTY.value:
+            item_errors.append(f"Driver is not On Duty (current: {driver.status})")
+        if trip.vehicle_id in seen_vehicles:
+            item_errors.append(f"Vehicle is also dispatched by item {seen_vehicles[trip.vehicle_id]}")
+        if trip.driver_id in seen_drivers:
+            item_errors.append(f"Driver is also dispatched by item {seen_drivers[trip.driver_id]}")
+        seen_trips.setdefault(trip_id, i)
+        seen_vehicles.setdefault(trip.vehicle_id, i)
+        seen_drivers.setdefault(trip.driver_id, i)
+
+        if item_errors:
+            errors[i] = item_errors
+    if errors:
+        _reject_batch(errors)
+
+    dispatched = [trips[trip_id] for trip_id in trip_ids]
+    for trip in dispatched:
+        trip.status = TripStatus.DISPATCHED.value
+        vehicles[trip.vehicle_id].status = VehicleStatus.ON_TRIP.value
+        drivers[trip.driver_id].status = DriverStatus.ON_TRIP.value
+
+    await db.flush()  # write — single commit happens in router
+
+    logger.info("Batch dispatched %d trips: ids=%s", len(dispatched), trip_ids)
+    return dispatched
+
+
+async def enrich_trip(db: AsyncSession, trip: Trip) -> dict:
     """Add joined vehicle/driver names to trip output."""
-    vehicle = db.query(Vehicle).filter(Vehicle.id == trip.vehicle_id).first()
-    driver = db.query(Driver).filter(Driver.id == trip.driver_id).first()
+    return (await enrich_trips(db, [trip]))[0]
+
+
+async def enrich_trips(db: AsyncSession, trips: list) -> list:
+    """Batch version of enrich_trip: one name lookup per table for the whole list."""
+    vehicles = await vehicle_names(db, [t.vehicle_id for t in trips])
+    drivers = await names_by_id(db, Driver.id, Driver.full_name, [t.driver_id for t in trips])
+    return [_trip_to_dict(t, vehicles.get(t.vehicle_id), drivers.get(t.driver_id)) for t in trips]
+
+
+def _trip_to_dict(trip: Trip, vehicle_name: str, driver_name: str) -> dict:
     return {
         "id": trip.id,
         "vehicle_id": trip.vehicle_id,
@@ -214,6 +367,6 @@ def enrich_trip(db: Session, trip: Trip) -> dict:
         "scheduled_date": trip.scheduled_date,
         "completed_date": trip.completed_date,
         "created_at": trip.created_at,
-        "vehicle_name": vehicle.name if vehicle else None,
-        "driver_name": driver.full_name if driver else None,
+        "vehicle_name": vehicle_name,
+        "driver_name": driver_name,
     }
@@ -5,8 +5,8 @@ Enforces:
   - Status transition rules
   - Prevents modification of retired vehicles
 """
-from sqlalchemy.orm import Session
-from sqlalchemy import func as sql_func
+from sqlalchemy import select, func as sql_func
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 from models.vehicle import Vehicle, VehicleStatus
 from models.trip import Trip
@@ -14,38 +14,44 @@ from models.fuel_log import FuelLog
 from models.maintenance import MaintenanceLog
 from models.expense import Expense
 from schemas.vehicle import VehicleCreate, VehicleUpdate
+from services.pagination import paginate
+from services.rollup_service import move_rollup_region
+from config import DEFAULT_PAGE_SIZE
 
 
-def get_all_vehicles(db: Session, vehicle_type: str = None, status_filter: str = None, region: str = None, search: str = None):
-    """Retrieve all vehicles with optional filters."""
-    query = db.query(Vehicle)
+async def get_all_vehicles(db: AsyncSession, vehicle_type: str = None, status_filter: str = None, region: str = None,
+                           search: str = None, limit: int = DEFAULT_PAGE_SIZE, after: str = None):
+    """Retrieve one page of vehicles with optional filters. Returns (vehicles, next_cursor)."""
+    stmt = select(Vehicle)
     if vehicle_type:
-        query = query.filter(Vehicle.vehicle_type == vehicle_type)
+        stmt = stmt.where(Vehicle.vehicle_type == vehicle_type)
     if status_filter:
-        query = query.filter(Vehicle.status == status_filter)
+        stmt = stmt.where(Vehicle.status == status_filter)
     if region:
-        query = query.filter(Vehicle.region == region)
+        stmt = stmt.where(Vehicle.region == region)
     if search:
-        query = query.filter(
+        stmt = stmt.where(
             (Vehicle.name.ilike(f"%{search}%")) |
             (Vehicle.license_plate.ilike(f"%{search}%")) |
             (Vehicle.model.ilike(f"%{search}%"))
         )
-    return query.order_by(Vehicle.id.desc()).all()
+    return await paginate(db, stmt, Vehicle.id, limit, after)
 
 
-def get_vehicle_by_id(db: Session, vehicle_id: int) -> Vehicle:
+async def get_vehicle_by_id(db: AsyncSession, vehicle_id: int) -> Vehicle:
     """Get a single vehicle or raise 404."""
-    vehicle = db.query(Vehicle).filter(Vehicle.id == vehicle_id).first()
+    vehicle = await db.get(Vehicle, vehicle_id)
     if not vehicle:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Vehicle not found")
     return vehicle
 
 
-def create_vehicle(db: Session, data: VehicleCreate) -> Vehicle:
+async def create_vehicle(db: AsyncSession, data: VehicleCreate) -> Vehicle:
     """Create a new vehicle. Enforces unique license plate."""
     # Check unique license plate
-    existing = db.query(Vehicle).filter(Vehicle.license_plate == data.license_plate).first()
+    existing = (await db.execute(
+        select(Vehicle.id).where(Vehicle.license_plate == data.license_plate)
+    )).first()
     if existing:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -58,13 +64,13 @@ def create_vehicle(db: Session, data: VehicleCreate) -> Vehicle:
 
     vehicle = Vehicle(**data.model_dump())
     db.add(vehicle)
-    db.flush()
+    await db.flush()
     return vehicle
 
 
-def update_vehicle(db: Session, vehicle_id: int, data: VehicleUpdate) -> Vehicle:
+async def update_vehicle(db: AsyncSession, vehicle_id: int, data: VehicleUpdate) -> Vehicle:
     """Update vehicle fields. Cannot modify retired vehicles."""
-    vehicle = get_vehicle_by_id(db, vehicle_id)
+    vehicle = await get_vehicle_by_id(db, vehicle_id)
 
     if vehicle.status == VehicleStatus.RETIRED.value and (data.status is None or data.status == VehicleStatus.RETIRED.value):
         raise HTTPException(status_code=400, detail="Cannot modify a retired vehicle")
@@ -75,57 +81,116 @@ def update_vehicle(db: Session, vehicle_id: int, data: VehicleUpdate) -> Vehicle
     if "status" in update_data:
         _validate_status_transition(vehicle.status, update_data["status"])
 
+    # Regional rollups follow the vehicle: move its history to the new region
+    if "region" in update_data and update_data["region"] != vehicle.region:
+        await move_rollup_region(db, vehicle.id, vehicle.region, update_data["region"])
+
     for key, value in update_data.items():
         setattr(vehicle, key, value)
 
-    db.flush()
+    await db.flush()
     return vehicle
 
 
-def retire_vehicle(db: Session, vehicle_id: int) -> Vehicle:
+async def retire_vehicle(db: AsyncSession, vehicle_id: int) -> Vehicle:
     """Retire a vehicle. Cannot retire if on trip."""
-    vehicle = get_vehicle_by_id(db, vehicle_id)
+    vehicle = await get_vehicle_by_id(db, vehicle_id)
     if vehicle.status == VehicleStatus.ON_TRIP.value:
         raise HTTPException(status_code=400, detail="Cannot retire a vehicle that is currently on a trip")
     if vehicle.status == VehicleStatus.RETIRED.value:
         raise HTTPException(status_code=400, detail="Vehicle is already retired")
     vehicle.status = VehicleStatus.RETIRED.value
-    db.flush()
+    await db.flush()
     return vehicle
 
 
-def delete_vehicle(db: Session, vehicle_id: int):
+async def delete_vehicle(db: AsyncSession, vehicle_id: int):
     """Delete a vehicle (soft-delete by retiring, or hard delete if no trips)."""
-    vehicle = get_vehicle_by_id(db, vehicle_id)
-    trip_count = db.query(Trip).filter(Trip.vehicle_id == vehicle_id).count()
+    vehicle = await get_vehicle_by_id(db, vehicle_id)
+    trip_count = (await db.execute(
+        select(sql_func.count(Trip.id)).where(Trip.vehicle_id == vehicle_id)
+    )).scalar()
     if trip_count > 0:
         # Soft delete – retire instead
         vehicle.status = VehicleStatus.RETIRED.value
-        db.flush()
+        await db.flush()
         return {"detail": "Vehicle retired (has trip history)", "id": vehicle_id}
-    db.delete(vehicle)
-    db.flush()
+    await db.delete(vehicle)
+    await db.flush()
     return {"detail": "Vehicle deleted", "id": vehicle_id}
 
 
-def enrich_vehicle(db: Session, vehicle: Vehicle) -> dict:
+async def enrich_vehicle(db: AsyncSession, vehicle: Vehicle) -> dict:
     """Add computed financial fields to a vehicle."""
-    fuel_cost = db.query(sql_func.coalesce(sql_func.sum(FuelLog.cost), 0.0)).filter(
-        FuelLog.vehicle_id == vehicle.id
-    ).scalar()
-    maint_cost = db.query(sql_func.coalesce(sql_func.sum(MaintenanceLog.cost), 0.0)).filter(
-        MaintenanceLog.vehicle_id == vehicle.id
-    ).scalar()
-    revenue = db.query(sql_func.coalesce(sql_func.sum(Trip.revenue), 0.0)).filter(
-        Trip.vehicle_id == vehicle.id, Trip.status == "Completed"
-    ).scalar()
-    expense_cost = db.query(sql_func.coalesce(sql_func.sum(Expense.amount), 0.0)).filter(
-        Expense.vehicle_id == vehicle.id
-    ).scalar()
-
-    total_cost = float(fuel_cost) + float(maint_cost) + float(expense_cost)
+    return (await enrich_vehicles(db, [vehicle]))[0]
+
+
+# SQLite caps bound parameters per statement; keep IN lists well below it.
+_ENRICH_CHUNK_SIZE = 900
+
+
+async def _sum_by_vehicle(db: AsyncSession, column, vehicle_col, vehicle_ids: list, *criteria) -> dict:
+    """SUM(column) grouped by vehicle for the given ids → {vehicle_id: total}."""
+    totals = {}
+    for i in range(0, len(vehicle_ids), _ENRICH_CHUNK_SIZE):
+        chunk = vehicle_ids[i:i + _ENRICH_CHUNK_SIZE]
+        rows = (await db.execute(
+            select(vehicle_col, sql_func.coalesce(sql_func.sum(column), 0.0)).where(
+                vehicle_col.in_(chunk), *criteria
+            ).group_by(vehicle_col)
+        )).all()
+        totals.update({vid: float(total) for vid, total in rows})
+    return totals
+
+
+async def names_by_id(db: AsyncSession, id_col, name_col, ids) -> dict:
+    """{id: name} for the given ids (one IN query per chunk), for joined name columns of list pages."""
+    ids = list(set(ids))
+    names = {}
+    for i in range(0, len(ids), _ENRICH_CHUNK_SIZE):
+        rows = (await db.execute(select(id_col, name_col).where(id_col.in_(ids[i:i + _ENRICH_CHUNK_SIZE])))).all()
+        names.update(rows)
+    return names
+
+
+async def vehicle_names(db: AsyncSession, vehicle_ids) -> dict:
+    """{vehicle_id: name} for the given ids."""
+    return await names_by_id(db, Vehicle.id, Vehicle.name, vehicle_ids)
+
+
+async def enrich_vehicles(db: AsyncSession, vehicles: list) -> list:
+    """
+    Batch version of enrich_vehicle.
+    Computes fuel, maintenance, revenue, expense and ROI for the whole result
+    set with one grouped aggregate query per cost source instead of four
+    queries per vehicle.
+    """
+    if not vehicles:
+        return []
+    ids = [v.id for v in vehicles]
+
+    fuel = await _sum_by_vehicle(db, FuelLog.cost, FuelLog.vehicle_id, ids)
+    maint = await _sum_by_vehicle(db, MaintenanceLog.cost, MaintenanceLog.vehicle_id, ids)
+    revenue = await _sum_by_vehicle(db, Trip.revenue, Trip.vehicle_id, ids, Trip.status == "Completed")
+    expenses = await _sum_by_vehicle(db, Expense.amount, Expense.vehicle_id, ids)
+
+    return [
+        _vehicle_to_dict(
+            v,
+            fuel_cost=fuel.get(v.id, 0.0),
+            maint_cost=maint.get(v.id, 0.0),
+            revenue=revenue.get(v.id, 0.0),
+            expense_cost=expenses.get(v.id, 0.0),
+        )
+        for v in vehicles
+    ]
+
+
+def _vehicle_to_dict(vehicle: Vehicle, fuel_cost: float, maint_cost: float,
+                     revenue: float, expense_cost: float) -> dict:
+    total_cost = fuel_cost + maint_cost + expense_cost
     acq = vehicle.acquisition_cost if vehicle.acquisition_cost > 0 else 1
-    roi = (float(revenue) - total_cost) / acq
+    roi = (revenue - total_cost) / acq
 
     result = {
         "id": vehicle.id,
@@ -139,9 +204,9 @@ def enrich_vehicle(db: Session, vehicle: Vehicle) -> dict:
         "status": vehicle.status,
         "region": vehicle.region,
         "created_at": vehicle.created_at,
-        "total_fuel_cost": round(float(fuel_cost), 2),
-        "total_maintenance_cost": round(float(maint_cost), 2),
-        "total_revenue": round(float(revenue), 2),
+        "total_fuel_cost": round(fuel_cost, 2),
+        "total_maintenance_cost": round(maint_cost, 2),
+        "total_revenue": round(revenue, 2),
         "roi": round(roi, 4),
     }
     return result
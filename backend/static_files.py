@@ -0,0 +1,162 @@
+"""
+SPA static serving for the built frontend (frontend/dist).
+
+The dist tree is indexed once at startup: path, stat, media type and ETag of
+every file, plus any precompressed .br / .gz siblings. Requests are answered
+from that index without touching the filesystem: Vite's content-hashed files
+under assets/ are sent with a one-year immutable Cache-Control, other files
+revalidate by ETag, and index.html – the fallback for every client-side
+route – is held in memory together with its compressed variants. Variants
+are chosen by Accept-Encoding. Create the siblings once per build with
+
+    python static_files.py ../frontend/dist
+"""
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+from fastapi import Request, Response
+from fastapi.responses import FileResponse
+
+from compression import brotli, compressible, negotiate_encoding
+from config import COMPRESSION_MINIMUM_SIZE
+from services.etag_service import etag_matches
+
+logger = logging.getLogger("fleet.static")
+
+HASHED_DIR = "assets/"  # Vite's assetsDir: every file name there carries a content hash
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+SIBLINGS = {"br": ".br", "gzip": ".gz"}  # preference order for negotiate_encoding
+
+
+@dataclass(frozen=True)
+class StaticFile:
+    """One indexed file and its precompressed siblings ({coding: (path, stat)})."""
+    path: str
+    stat: os.stat_result
+    media_type: str
+    etag: str
+    cache_control: str
+    variants: dict
+
+
+def _media_type(name: str) -> str:
+    return mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+
+def _compress(coding: str, data: bytes) -> bytes:
+    if coding == "br":
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _codings() -> dict:
+    return SIBLINGS if brotli else {"gzip": SIBLINGS["gzip"]}
+
+
+class SPAStatic:
+    """In-memory index of a built SPA; `response` answers one request from it."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.files = {}
+        for dirpath, _, names in os.walk(root):
+            for name in names:
+                path = os.path.join(dirpath, name)
+                if name.endswith((".br", ".gz")) and os.path.isfile(path[:-3]):
+                    continue  # a sibling, indexed with its source file
+                rel = Path(path).relative_to(root).as_posix()
+                if rel != "index.html":
+                    self.files[rel] = self._index_file(rel, path)
+
+        self.index = (root / "index.html").read_bytes()
+        self.index_etag = f'W/"{hashlib.blake2b(self.index, digest_size=12).hexdigest()}"'
+        self.index_variants = {}
+        for coding in _codings():
+            body = _compress(coding, self.index)
+            if len(body) < len(self.index):
+                self.index_variants[coding] = body
+        logger.info("Static index: %d files (%d precompressed) from %s",
+                    len(self.files), sum(1 for f in self.files.values() if f.variants), root)
+
+    def _index_file(self, rel: str, path: str) -> StaticFile:
+        stat = os.stat(path)
+        variants = {}
+        for coding, suffix in _codings().items():
+            try:
+                sibling = os.stat(path + suffix)
+            except FileNotFoundError:
+                continue
+            if sibling.st_mtime >= stat.st_mtime:  # ignore siblings left over from an older build
+                variants[coding] = (path + suffix, sibling)
+        return StaticFile(
+            path=path,
+            stat=stat,
+            media_type=_media_type(rel),
+            etag=f'W/"{int(stat.st_mtime):x}-{stat.st_size:x}"',
+            cache_control=IMMUTABLE if rel.startswith(HASHED_DIR) else REVALIDATE,
+            variants=variants,
+        )
+
+    def response(self, request: Request, full_path: str) -> Response:
+        """Serve `full_path`; unknown paths outside assets/ get index.html (client-side routing)."""
+        entry = self.files.get(full_path)
+        if entry is None:
+            if full_path.startswith(HASHED_DIR):
+                # a hash from an older build: answering with HTML would break the page
+                return Response(status_code=404)
+            return self._index_response(request)
+
+        headers = {"ETag": entry.etag, "Cache-Control": entry.cache_control}
+        if entry.variants:
+            headers["Vary"] = "Accept-Encoding"
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, entry.etag):
+            return Response(status_code=304, headers=headers)
+
+        coding = negotiate_encoding(request.headers.get("accept-encoding", ""), entry.variants)
+        path, stat = entry.variants[coding] if coding else (entry.path, entry.stat)
+        if coding:
+            headers["Content-Encoding"] = coding
+        return FileResponse(path, stat_result=stat, media_type=entry.media_type, headers=headers)
+
+    def _index_response(self, request: Request) -> Response:
+        headers = {"ETag": self.index_etag, "Cache-Control": REVALIDATE, "Vary": "Accept-Encoding"}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and etag_matches(if_none_match, self.index_etag):
+            return Response(status_code=304, headers=headers)
+        coding = negotiate_encoding(request.headers.get("accept-encoding", ""), self.index_variants)
+        if coding is None:
+            return Response(self.index, media_type="text/html", headers=headers)
+        headers["Content-Encoding"] = coding
+        return Response(self.index_variants[coding], media_type="text/html", headers=headers)
+
+
+def precompress(root: Path) -> int:
+    """Write .br/.gz siblings for compressible files of `root`; returns the number written."""
+    written = 0
+    for dirpath, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(dirpath, name)
+            if name.endswith((".br", ".gz")) or not compressible(_media_type(name)):
+                continue
+            data = Path(path).read_bytes()
+            if len(data) < COMPRESSION_MINIMUM_SIZE:
+                continue
+            for coding, suffix in _codings().items():
+                body = _compress(coding, data)
+                if len(body) < len(data):  # keep a sibling only when it saves bytes
+                    Path(path + suffix).write_bytes(body)
+                    written += 1
+    return written
+
+
+if __name__ == "__main__":
+    target = Path(sys.argv[1] if len(sys.argv) > 1 else "../frontend/dist")
+    print(f"Wrote {precompress(target)} precompressed files under {target}")
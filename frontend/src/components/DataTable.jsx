@@ -1,8 +1,9 @@
 import { useState, useMemo } from 'react';
 import { Search, ChevronUp, ChevronDown, ChevronsUpDown } from 'lucide-react';
 
-export default function DataTable({ columns, data, searchPlaceholder = 'Search...', onRowClick }) {
+export default function DataTable({ columns, data, searchPlaceholder = 'Search...', onRowClick, hasMore = false, onLoadMore }) {
   const [search, setSearch] = useState('');
+  const [loadingMore, setLoadingMore] = useState(false);
   const [sortCol, setSortCol] = useState(null);
   const [sortDir, setSortDir] = useState('asc');
 
@@ -35,6 +36,17 @@ export default function DataTable({ columns, data, searchPlaceholder = 'Search..
     });
   }, [filtered, sortCol, sortDir, columns]);
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      await onLoadMore();
+    } catch (err) {
+      console.error(err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const toggleSort = (key) => {
     if (sortCol === key) {
       setSortDir(d => d === 'asc' ? 'desc' : 'asc');
@@ -116,8 +128,14 @@ export default function DataTable({ columns, data, searchPlaceholder = 'Search..
       </div>
 
       {/* Footer */}
-      <div className="px-4 py-3 border-t border-slate-100 bg-slate-50 text-xs text-slate-500">
-        Showing {sorted.length} of {data.length} records
+      <div className="px-4 py-3 border-t border-slate-100 bg-slate-50 text-xs text-slate-500 flex items-center justify-between">
+        <span>Showing {sorted.length} of {data.length}{hasMore ? '+' : ''} records</span>
+        {hasMore && onLoadMore && (
+          <button onClick={loadMore} disabled={loadingMore}
+            className="px-3 py-1.5 border border-slate-200 rounded-lg bg-white text-slate-600 font-medium hover:bg-slate-100 disabled:opacity-50">
+            {loadingMore ? 'Loading...' : 'Load more'}
+          </button>
+        )}
       </div>
     </div>
   );
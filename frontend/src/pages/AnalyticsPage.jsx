@@ -1,5 +1,5 @@
 import { useState, useEffect, useRef } from 'react';
-import { financeAPI, vehiclesAPI } from '../services/api';
+import { financeAPI, vehiclesAPI, fetchAllPages } from '../services/api';
 import PageHeader from '../components/PageHeader';
 import LoadingSpinner from '../components/LoadingSpinner';
 import {
@@ -36,18 +36,18 @@ export default function AnalyticsPage() {
   useEffect(() => {
     (async () => {
       try {
-        const [sumRes, monRes, topRes, idleRes, vehRes] = await Promise.all([
+        const [sumRes, monRes, topRes, idleRes, allVehicles] = await Promise.all([
           financeAPI.summary(),
           financeAPI.monthly(),
           financeAPI.topExpensive(),
           financeAPI.idleVehicles(),
-          vehiclesAPI.list(),
+          fetchAllPages(vehiclesAPI.list),
         ]);
         setSummary(sumRes.data);
         setMonthly(monRes.data);
         setTopExpensive(topRes.data);
         setIdleVehicles(idleRes.data);
-        setVehicles(vehRes.data);
+        setVehicles(allVehicles);
       } catch (err) {
         console.error(err);
       } finally {
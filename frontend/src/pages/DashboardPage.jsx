@@ -18,6 +18,7 @@ export default function DashboardPage() {
     try {
       const params = {};
       if (filters.vehicle_type) params.vehicle_type = filters.vehicle_type;
+      if (filters.status) params.status = filters.status;
       if (filters.region) params.region = filters.region;
       const res = await dashboardAPI.getKPIs(params);
       setKpis(res.data);
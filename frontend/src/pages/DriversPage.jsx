@@ -13,6 +13,7 @@ export default function DriversPage() {
   const canWrite = hasRole(['safety_officer']);
 
   const [drivers, setDrivers] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
   const [showModal, setShowModal] = useState(false);
   const [editItem, setEditItem] = useState(null);
@@ -26,11 +27,13 @@ export default function DriversPage() {
     full_name: '', license_expiry: '', phone: '', safety_score: '', complaints: '', status: '',
   });
 
+  const listParams = () => (statusFilter ? { status: statusFilter } : {});
+
   const fetchDrivers = async () => {
     try {
-      const params = statusFilter ? { status: statusFilter } : {};
-      const res = await driversAPI.list(params);
-      setDrivers(res.data);
+      const res = await driversAPI.list(listParams());
+      setDrivers(res.data.items);
+      setNextCursor(res.data.next_cursor);
     } catch (err) {
       console.error(err);
     } finally {
@@ -40,6 +43,12 @@ export default function DriversPage() {
 
   useEffect(() => { fetchDrivers(); }, [statusFilter]);
 
+  const loadMore = async () => {
+    const res = await driversAPI.list({ ...listParams(), after: nextCursor });
+    setDrivers(d => [...d, ...res.data.items]);
+    setNextCursor(res.data.next_cursor);
+  };
+
   const handleCreate = async (e) => {
     e.preventDefault();
     setError('');
@@ -158,7 +167,8 @@ export default function DriversPage() {
         </div>
       </PageHeader>
 
-      <DataTable columns={columns} data={drivers} searchPlaceholder="Search drivers..." />
+      <DataTable columns={columns} data={drivers} searchPlaceholder="Search drivers..."
+        hasMore={!!nextCursor} onLoadMore={loadMore} />
 
       <Modal isOpen={showModal} onClose={() => { setShowModal(false); setEditItem(null); }} title={editItem ? 'Edit Driver' : 'Add Driver'}>
         {error && <div className="bg-red-50 border border-red-200 text-red-700 text-sm rounded-lg px-4 py-3 mb-4">{error}</div>}
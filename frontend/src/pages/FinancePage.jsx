@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import { financeAPI, vehiclesAPI } from '../services/api';
+import { financeAPI, vehiclesAPI, fetchAllPages } from '../services/api';
 import { useAuth } from '../context/AuthContext';
 import DataTable from '../components/DataTable';
 import Modal from '../components/Modal';
@@ -14,6 +14,8 @@ export default function FinancePage() {
 
   const [fuelLogs, setFuelLogs] = useState([]);
   const [expenses, setExpenses] = useState([]);
+  const [fuelCursor, setFuelCursor] = useState(null);
+  const [expenseCursor, setExpenseCursor] = useState(null);
   const [vehicles, setVehicles] = useState([]);
   const [summary, setSummary] = useState(null);
   const [loading, setLoading] = useState(true);
@@ -27,15 +29,17 @@ export default function FinancePage() {
 
   const fetchData = async () => {
     try {
-      const [fuelRes, expRes, vehRes, sumRes] = await Promise.all([
+      const [fuelRes, expRes, allVehicles, sumRes] = await Promise.all([
         financeAPI.fuelLogs(),
         financeAPI.expenses(),
-        vehiclesAPI.list().catch(() => ({ data: [] })),
+        fetchAllPages(vehiclesAPI.list).catch(() => []),
         financeAPI.summary().catch(() => ({ data: {} })),
       ]);
-      setFuelLogs(fuelRes.data);
-      setExpenses(expRes.data);
-      setVehicles(vehRes.data);
+      setFuelLogs(fuelRes.data.items);
+      setFuelCursor(fuelRes.data.next_cursor);
+      setExpenses(expRes.data.items);
+      setExpenseCursor(expRes.data.next_cursor);
+      setVehicles(allVehicles);
       setSummary(sumRes.data);
     } catch (err) {
       console.error(err);
@@ -46,6 +50,18 @@ export default function FinancePage() {
 
   useEffect(() => { fetchData(); }, []);
 
+  const loadMoreFuel = async () => {
+    const res = await financeAPI.fuelLogs({ after: fuelCursor });
+    setFuelLogs(l => [...l, ...res.data.items]);
+    setFuelCursor(res.data.next_cursor);
+  };
+
+  const loadMoreExpenses = async () => {
+    const res = await financeAPI.expenses({ after: expenseCursor });
+    setExpenses(e => [...e, ...res.data.items]);
+    setExpenseCursor(res.data.next_cursor);
+  };
+
   const handleCreateFuel = async (e) => {
     e.preventDefault();
     setError('');
@@ -162,9 +178,11 @@ export default function FinancePage() {
       </div>
 
       {activeTab === 'fuel' ? (
-        <DataTable columns={fuelColumns} data={fuelLogs} searchPlaceholder="Search fuel logs..." />
+        <DataTable columns={fuelColumns} data={fuelLogs} searchPlaceholder="Search fuel logs..."
+          hasMore={!!fuelCursor} onLoadMore={loadMoreFuel} />
       ) : (
-        <DataTable columns={expenseColumns} data={expenses} searchPlaceholder="Search expenses..." />
+        <DataTable columns={expenseColumns} data={expenses} searchPlaceholder="Search expenses..."
+          hasMore={!!expenseCursor} onLoadMore={loadMoreExpenses} />
       )}
 
       {/* Fuel Log Modal */}
@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import { maintenanceAPI, vehiclesAPI } from '../services/api';
+import { maintenanceAPI, vehiclesAPI, fetchAllPages } from '../services/api';
 import { useAuth } from '../context/AuthContext';
 import DataTable from '../components/DataTable';
 import StatusBadge from '../components/StatusBadge';
@@ -13,6 +13,7 @@ export default function MaintenancePage() {
   const canWrite = hasRole(['fleet_manager']);
 
   const [logs, setLogs] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [vehicles, setVehicles] = useState([]);
   const [loading, setLoading] = useState(true);
   const [showModal, setShowModal] = useState(false);
@@ -28,12 +29,13 @@ export default function MaintenancePage() {
 
   const fetchData = async () => {
     try {
-      const [logsRes, vehiclesRes] = await Promise.all([
+      const [logsRes, allVehicles] = await Promise.all([
         maintenanceAPI.list(),
-        vehiclesAPI.list().catch(() => ({ data: [] })),
+        fetchAllPages(vehiclesAPI.list).catch(() => []),
       ]);
-      setLogs(logsRes.data);
-      setVehicles(vehiclesRes.data);
+      setLogs(logsRes.data.items);
+      setNextCursor(logsRes.data.next_cursor);
+      setVehicles(allVehicles);
     } catch (err) {
       console.error(err);
     } finally {
@@ -43,6 +45,12 @@ export default function MaintenancePage() {
 
   useEffect(() => { fetchData(); }, []);
 
+  const loadMore = async () => {
+    const res = await maintenanceAPI.list({ after: nextCursor });
+    setLogs(l => [...l, ...res.data.items]);
+    setNextCursor(res.data.next_cursor);
+  };
+
   const handleCreate = async (e) => {
     e.preventDefault();
     setError('');
@@ -131,7 +139,8 @@ export default function MaintenancePage() {
         )}
       </PageHeader>
 
-      <DataTable columns={columns} data={logs} searchPlaceholder="Search maintenance logs..." />
+      <DataTable columns={columns} data={logs} searchPlaceholder="Search maintenance logs..."
+        hasMore={!!nextCursor} onLoadMore={loadMore} />
 
       {/* Create / Edit Modal */}
       <Modal isOpen={showModal} onClose={() => { setShowModal(false); setEditItem(null); }} title={editItem ? 'Edit Maintenance Log' : 'Create Maintenance Log'}>
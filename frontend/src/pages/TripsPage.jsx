@@ -1,5 +1,5 @@
 import { useState, useEffect } from 'react';
-import { tripsAPI, vehiclesAPI, driversAPI } from '../services/api';
+import { tripsAPI, vehiclesAPI, driversAPI, fetchAllPages } from '../services/api';
 import { useAuth } from '../context/AuthContext';
 import DataTable from '../components/DataTable';
 import StatusBadge from '../components/StatusBadge';
@@ -13,6 +13,7 @@ export default function TripsPage() {
   const canWrite = hasRole(['dispatcher']);
 
   const [trips, setTrips] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [vehicles, setVehicles] = useState([]);
   const [drivers, setDrivers] = useState([]);
   const [loading, setLoading] = useState(true);
@@ -29,17 +30,19 @@ export default function TripsPage() {
 
   const [completeForm, setCompleteForm] = useState({ distance: '', revenue: '' });
 
+  const listParams = () => (statusFilter ? { status: statusFilter } : {});
+
   const fetchData = async () => {
     try {
-      const params = statusFilter ? { status: statusFilter } : {};
-      const [tripsRes, vehiclesRes, driversRes] = await Promise.all([
-        tripsAPI.list(params),
-        vehiclesAPI.list({ status: 'Available' }).catch(() => ({ data: [] })),
-        driversAPI.list({ status: 'On Duty' }).catch(() => ({ data: [] })),
+      const [tripsRes, availableVehicles, onDutyDrivers] = await Promise.all([
+        tripsAPI.list(listParams()),
+        fetchAllPages(vehiclesAPI.list, { status: 'Available' }).catch(() => []),
+        fetchAllPages(driversAPI.list, { status: 'On Duty' }).catch(() => []),
       ]);
-      setTrips(tripsRes.data);
-      setVehicles(vehiclesRes.data);
-      setDrivers(driversRes.data.filter(d => !d.license_expired));
+      setTrips(tripsRes.data.items);
+      setNextCursor(tripsRes.data.next_cursor);
+      setVehicles(availableVehicles);
+      setDrivers(onDutyDrivers.filter(d => !d.license_expired));
     } catch (err) {
       console.error(err);
     } finally {
@@ -47,6 +50,12 @@ export default function TripsPage() {
     }
   };
 
+  const loadMore = async () => {
+    const res = await tripsAPI.list({ ...listParams(), after: nextCursor });
+    setTrips(t => [...t, ...res.data.items]);
+    setNextCursor(res.data.next_cursor);
+  };
+
   useEffect(() => { fetchData(); }, [statusFilter]);
 
   const handleCreateTrip = async (e) => {
@@ -179,7 +188,8 @@ export default function TripsPage() {
         </div>
       </PageHeader>
 
-      <DataTable columns={columns} data={trips} searchPlaceholder="Search trips..." />
+      <DataTable columns={columns} data={trips} searchPlaceholder="Search trips..."
+        hasMore={!!nextCursor} onLoadMore={loadMore} />
 
       {/* Create Trip Modal */}
       <Modal isOpen={showCreateModal} onClose={() => setShowCreateModal(false)} title="Create New Trip" size="lg">
@@ -13,6 +13,7 @@ export default function VehiclesPage() {
   const canWrite = hasRole(['fleet_manager']);
 
   const [vehicles, setVehicles] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
   const [showModal, setShowModal] = useState(false);
   const [editItem, setEditItem] = useState(null);
@@ -23,13 +24,18 @@ export default function VehiclesPage() {
   });
   const [error, setError] = useState('');
 
+  const listParams = () => {
+    const params = {};
+    if (filters.vehicle_type) params.vehicle_type = filters.vehicle_type;
+    if (filters.status) params.status = filters.status;
+    return params;
+  };
+
   const fetchVehicles = async () => {
     try {
-      const params = {};
-      if (filters.vehicle_type) params.vehicle_type = filters.vehicle_type;
-      if (filters.status) params.status = filters.status;
-      const res = await vehiclesAPI.list(params);
-      setVehicles(res.data);
+      const res = await vehiclesAPI.list(listParams());
+      setVehicles(res.data.items);
+      setNextCursor(res.data.next_cursor);
     } catch (err) {
       console.error(err);
     } finally {
@@ -39,6 +45,12 @@ export default function VehiclesPage() {
 
   useEffect(() => { fetchVehicles(); }, [filters]);
 
+  const loadMore = async () => {
+    const res = await vehiclesAPI.list({ ...listParams(), after: nextCursor });
+    setVehicles(v => [...v, ...res.data.items]);
+    setNextCursor(res.data.next_cursor);
+  };
+
   const openCreate = () => {
     setEditItem(null);
     setForm({ name: '', model: '', license_plate: '', max_capacity: '', odometer: '0', vehicle_type: 'Truck', acquisition_cost: '0', region: 'Default' });
@@ -171,7 +183,8 @@ export default function VehiclesPage() {
         </div>
       </PageHeader>
 
-      <DataTable columns={columns} data={vehicles} searchPlaceholder="Search vehicles..." />
+      <DataTable columns={columns} data={vehicles} searchPlaceholder="Search vehicles..."
+        hasMore={!!nextCursor} onLoadMore={loadMore} />
 
       {/* Create/Edit Modal */}
       <Modal isOpen={showModal} onClose={() => setShowModal(false)} title={editItem ? 'Edit Vehicle' : 'Add Vehicle'}>
@@ -29,6 +29,23 @@ api.interceptors.response.use(
   }
 );
 
+// ── Pagination ───────────────────────────────────────────────────────────────
+// List endpoints return one page as { items, next_cursor }; pass next_cursor
+// back as `after` for the next page (null on the last one).
+const MAX_PAGE_SIZE = 1000;  // the backend default MAX_PAGE_SIZE
+
+// Follow next_cursor until the end – for dropdowns and reports that need every row.
+export const fetchAllPages = async (listFn, params = {}) => {
+  const items = [];
+  let after = null;
+  do {
+    const res = await listFn({ ...params, limit: MAX_PAGE_SIZE, ...(after ? { after } : {}) });
+    items.push(...res.data.items);
+    after = res.data.next_cursor;
+  } while (after);
+  return items;
+};
+
 // ── Auth ─────────────────────────────────────────────────────────────────────
 export const authAPI = {
   login: (data) => api.post('/auth/login', data),